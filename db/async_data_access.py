@@ -0,0 +1,302 @@
+from db.database_utils import DatabaseUtils, TOMBSTONES_COLLECTION, is_deleted
+from db.document_decoder import get_decoder
+from db.firebase_config import FirebaseConfig
+from db.data_cache import data_cache
+from db.sync_manager import sync_manager
+from typing import List, Dict, Any, Optional, Awaitable, Iterable
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+# Documents requested per multi-document get; the chunks are sent concurrently
+GET_MANY_CHUNK = 100
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Event loop shared by every async read, running in a daemon thread"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="firestore-async", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def submit(coro: Awaitable) -> concurrent.futures.Future:
+    """
+    Run a coroutine on the shared event loop without waiting for it
+
+    Args:
+        coro (Awaitable): Coroutine to run
+
+    Returns:
+        concurrent.futures.Future: Future of its result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+def run(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared event loop and wait for its result
+
+    Must not be called from the event loop itself.
+
+    Args:
+        coro (Awaitable): Coroutine to run
+        timeout (Optional[float]): Seconds to wait
+
+    Returns:
+        Any: Result of the coroutine
+    """
+    return submit(coro).result(timeout)
+
+async def gather_reads(reads: Dict[str, Awaitable]) -> Dict[str, Any]:
+    """
+    Run several reads concurrently
+
+    Args:
+        reads (Dict[str, Awaitable]): Name -> read coroutine
+
+    Returns:
+        Dict[str, Any]: Name -> result, None for a read that failed
+    """
+    names = list(reads)
+    results = await asyncio.gather(*reads.values(), return_exceptions=True)
+    gathered = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            print(f"Error reading {name}: {result}")
+            result = None
+        gathered[name] = result
+    return gathered
+
+def read_all(**reads: Awaitable) -> Dict[str, Any]:
+    """
+    Run several reads concurrently from synchronous code and wait for all of them
+
+    Example:
+        data = read_all(students=async_students_data.get_all(),
+                        counts=async_main_data.get_by_id('count_data'))
+
+    Args:
+        **reads: Name -> read coroutine
+
+    Returns:
+        Dict[str, Any]: Name -> result, None for a read that failed
+    """
+    return run(gather_reads(reads))
+
+async def _in_thread(func, *args) -> Any:
+    """Run a blocking call in a worker thread (asyncio.to_thread needs Python 3.9)"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+async def _stream(collection_name: str, query, limit: int, include_deleted: bool = False) -> List[Dict[str, Any]]:
+    """Read and decode the documents of an async query"""
+    decoder = get_decoder(collection_name)
+    result = []
+    async for doc in query.stream():
+        if len(result) >= limit:
+            break
+        data = decoder.decode(doc)
+        if include_deleted or not is_deleted(data):
+            result.append(data)
+    return result
+
+class AsyncDataAccess:
+    """
+    asyncio variant of DataAccess for issuing many reads at once.
+
+    Reads use Firestore's AsyncClient. With the mock implementation, which
+    has no async client, the synchronous DatabaseUtils calls run in worker
+    threads instead, so callers behave the same either way. Collections
+    kept in the data cache are read through the sync manager exactly like
+    DataAccess.get_all does.
+    """
+
+    def __init__(self, collection_name: str):
+        """
+        Initialize the data access for a specific collection
+
+        Args:
+            collection_name (str): Name of the collection to access
+        """
+        self.collection_name = collection_name
+
+    async def get_all(self, limit: int = 100000) -> List[Dict[str, Any]]:
+        """
+        Get all documents from the collection
+
+        Args:
+            limit (int): Maximum number of documents to fetch
+
+        Returns:
+            List[Dict[str, Any]]: List of documents
+        """
+        name = self.collection_name
+        try:
+            if sync_manager.is_fresh(name):
+                return (data_cache.get(name) or [])[:limit]
+
+            if data_cache.has(name):
+                # Same lock as sync_manager.refresh, so a sync and an async
+                # refresh cannot apply overlapping change sets out of order.
+                # It is acquired in a worker thread to keep the loop free.
+                lock = sync_manager._lock_for(name)
+                await _in_thread(lock.acquire)
+                try:
+                    changes = await self.changes_since(sync_manager.since(name))
+                    sync_manager.apply(name, changes)
+                finally:
+                    lock.release()
+                return (data_cache.get(name) or [])[:limit]
+
+            docs = await self._read_collection(limit)
+            sync_manager.seed(name, docs, limit)
+            return docs
+        except Exception as e:
+            print(f"Error getting data from collection {name}: {e}")
+            return []
+
+    async def get_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a document by ID
+
+        Args:
+            doc_id (str): Document ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Document or None if not found
+        """
+        db = FirebaseConfig.get_async_db()
+        if db is None:
+            return await _in_thread(DatabaseUtils.get_document_by_id, self.collection_name, doc_id)
+
+        try:
+            doc = await db.collection(self.collection_name).document(doc_id).get()
+            if doc.exists:
+                data = get_decoder(self.collection_name).decode(doc)
+                if not is_deleted(data):
+                    return data
+            return None
+        except Exception as e:
+            print(f"Error getting document {doc_id}: {e}")
+            return None
+
+    async def get_many(self, doc_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several documents by ID with multi-document gets
+
+        Args:
+            doc_ids (Iterable[str]): Document IDs
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Document ID -> document, for the
+                documents that exist
+        """
+        doc_ids = list(dict.fromkeys(str(doc_id) for doc_id in doc_ids))
+        if not doc_ids:
+            return {}
+
+        db = FirebaseConfig.get_async_db()
+        if db is None:
+            docs = await asyncio.gather(*(
+                _in_thread(DatabaseUtils.get_document_by_id, self.collection_name, doc_id)
+                for doc_id in doc_ids
+            ))
+            return {doc_id: doc for doc_id, doc in zip(doc_ids, docs) if doc}
+
+        collection = db.collection(self.collection_name)
+        decoder = get_decoder(self.collection_name)
+
+        async def fetch(chunk):
+            return [snapshot async for snapshot in db.get_all([collection.document(doc_id) for doc_id in chunk])]
+
+        try:
+            chunks = [doc_ids[start:start + GET_MANY_CHUNK] for start in range(0, len(doc_ids), GET_MANY_CHUNK)]
+            found = {}
+            for snapshots in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+                for snapshot in snapshots:
+                    if snapshot.exists:
+                        data = decoder.decode(snapshot)
+                        if not is_deleted(data):
+                            found[snapshot.id] = data
+            return found
+        except Exception as e:
+            print(f"Error getting documents of {self.collection_name}: {e}")
+            return {}
+
+    async def query(self, field: str, operator: str, value: Any, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Query the collection
+
+        Args:
+            field (str): Field to filter on
+            operator (str): Comparison operator ('==', '>', '<', '>=', '<=', '!=')
+            value (Any): Value to compare against
+            limit (int): Maximum number of documents to fetch
+
+        Returns:
+            List[Dict[str, Any]]: List of matching documents
+        """
+        return await self._query(field, operator, value, limit)
+
+    async def changes_since(self, watermark: Optional[str] = None, limit: int = 100000) -> Dict[str, Any]:
+        """
+        Get the documents added, updated or deleted since a watermark
+
+        The changed documents and the tombstones are read concurrently.
+
+        Args:
+            watermark (Optional[str]): Latest updated_at already seen
+            limit (int): Maximum number of changed documents to fetch
+
+        Returns:
+            Dict[str, Any]: Change set (see DatabaseUtils.get_changes)
+        """
+        since = DatabaseUtils.change_window(watermark)
+        if since is None:
+            changed = await self._read_collection(limit)
+            tombstones = []
+        else:
+            changed, tombstones = await asyncio.gather(
+                self._query('updated_at', '>=', since, limit, include_deleted=True),
+                AsyncDataAccess(TOMBSTONES_COLLECTION)._query('updated_at', '>=', since, limit)
+            )
+        return DatabaseUtils.build_change_set(self.collection_name, changed, tombstones, since, limit)
+
+    async def _read_collection(self, limit: int) -> List[Dict[str, Any]]:
+        """Read every (not deleted) document of the collection"""
+        db = FirebaseConfig.get_async_db()
+        if db is None:
+            return await _in_thread(DatabaseUtils.get_collection_data, self.collection_name, limit)
+
+        try:
+            return await _stream(self.collection_name, db.collection(self.collection_name), limit)
+        except Exception as e:
+            print(f"Error getting data from collection {self.collection_name}: {e}")
+            return []
+
+    async def _query(self, field, operator, value, limit, include_deleted=False) -> List[Dict[str, Any]]:
+        """Run a single-filter query"""
+        db = FirebaseConfig.get_async_db()
+        if db is None:
+            return await _in_thread(
+                DatabaseUtils.query_collection, self.collection_name, field, operator, value, limit, include_deleted
+            )
+
+        try:
+            query = db.collection(self.collection_name).where(field, operator, value)
+            return await _stream(self.collection_name, query, limit, include_deleted)
+        except Exception as e:
+            print(f"Error querying collection {self.collection_name}: {e}")
+            return []
+
+# Async counterparts of the common data access objects
+async_students_data = AsyncDataAccess("students")
+async_teachers_data = AsyncDataAccess("teachers")
+async_courses_data = AsyncDataAccess("courses")
+async_results_data = AsyncDataAccess("result_data")
+async_main_data = AsyncDataAccess("main_data")
+async_student_results_data = AsyncDataAccess("student_results")
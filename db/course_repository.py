@@ -1,4 +1,5 @@
 from db.data_access import DataAccess
+from db.models import Course, to_data
 from firebase_admin import firestore
 import datetime
 
@@ -16,9 +17,9 @@ class CourseRepository:
         Get all courses from the database
         
         Returns:
-            list: List of course dictionaries
+            list: List of Course records
         """
-        return self.data_access.get_all()
+        return self._to_models(self.data_access.get_all())
     
     def get_by_id(self, course_id):
         """
@@ -28,22 +29,23 @@ class CourseRepository:
             course_id (str): Course ID
             
         Returns:
-            dict: Course data or None if not found
+            Course: Course record or None if not found
         """
-        return self.data_access.get_by_id(course_id)
+        data = self.data_access.get_by_id(course_id)
+        return Course.from_firestore(data) if data else None
     
     def add(self, course_data):
         """
         Add a new course
         
         Args:
-            course_data (dict): Course data
+            course_data (Course or dict): Course data
             
         Returns:
             str: ID of the created course or None if failed
         """
         # Timestamps are automatically added by the DataAccess class
-        return self.data_access.add(course_data)
+        return self.data_access.add(to_data(course_data))
     
     def update(self, course_id, course_data):
         """
@@ -51,13 +53,13 @@ class CourseRepository:
         
         Args:
             course_id (str): Course ID
-            course_data (dict): Course data to update
+            course_data (Course or dict): Course data to update
             
         Returns:
             bool: True if updated successfully, False otherwise
         """
         # Timestamps are automatically updated by the DataAccess class
-        return self.data_access.update(course_id, course_data)
+        return self.data_access.update(course_id, to_data(course_data))
     
     def delete(self, course_id):
         """
@@ -79,7 +81,7 @@ class CourseRepository:
             query (str): Search query
             
         Returns:
-            list: List of matching course dictionaries
+            list: List of matching Course records
         """
         try:
             # Convert query to lowercase for case-insensitive search
@@ -113,20 +115,20 @@ class CourseRepository:
             teacher_name (str): Teacher name
             
         Returns:
-            list: List of course dictionaries taught by the specified teacher
+            list: List of Course records taught by the specified teacher
         """
         # Use the query method to filter by teacher
-        return self.data_access.query('teacher', '==', teacher_name)
+        return self._to_models(self.data_access.query('teacher', '==', teacher_name))
     
     def get_active_courses(self):
         """
         Get all active courses
         
         Returns:
-            list: List of active course dictionaries
+            list: List of active Course records
         """
         # Use the query method to filter by status
-        return self.data_access.query('status', '==', 'Active')
+        return self._to_models(self.data_access.query('status', '==', 'Active'))
             
     def count_courses(self):
         """
@@ -153,15 +155,21 @@ class CourseRepository:
             print(f"Error counting students in courses: {e}")
             return 0
             
-    def subscribe_to_changes(self, callback):
+    def subscribe_to_changes(self, callback, filters=None):
         """
         Subscribe to real-time updates of course data
         
         Args:
             callback (function): Callback function to be called when data changes
+            filters (list): Optional (field, operator, value) filters, e.g.
+                [('status', '==', 'Active')], to only follow matching documents
             
         Returns:
             function: Unsubscribe function to stop listening for changes
         """
         # Use the watch method to subscribe to changes
-        return self.data_access.watch(callback) 
\ No newline at end of file
+        return self.data_access.watch(lambda docs: callback(self._to_models(docs)), filters=filters)
+    
+    def _to_models(self, docs):
+        """Convert decoded documents to Course records"""
+        return [Course.from_firestore(doc) for doc in docs or []] 
\ No newline at end of file
@@ -1,6 +1,15 @@
-from db.database_utils import DatabaseUtils
-from typing import List, Dict, Any, Optional, Callable
+from db.database_utils import DatabaseUtils, WriteConflict
+from db.document_decoder import get_decoder
+from db.subscription_hub import subscription_hub
+from db.data_cache import data_cache
+from db.sync_manager import sync_manager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
 import datetime
+import uuid
+
+# Optimistic writes are sent one at a time, in the order they were made
+_write_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix="optimistic-writes")
 
 class DataAccess:
     """
@@ -20,6 +29,9 @@ class DataAccess:
         """
         Get all documents from the collection
         
+        Collections kept in the warm-start cache are served from it and
+        only the documents changed since its watermark are fetched.
+        
         Args:
             limit (int): Maximum number of documents to fetch
             
@@ -27,7 +39,22 @@ class DataAccess:
             List[Dict[str, Any]]: List of documents
         """
         # print(self.collection_name)
-        return DatabaseUtils.get_collection_data(self.collection_name, limit)
+        return sync_manager.sync(self.collection_name, limit)
+    
+    def changes_since(self, watermark: Optional[str] = None, limit: int = 100000) -> Dict[str, Any]:
+        """
+        Get the documents added, updated or deleted since a watermark
+        
+        Args:
+            watermark (Optional[str]): Latest updated_at already seen (a
+                decoded timestamp); None reads the whole collection
+            limit (int): Maximum number of changed documents to fetch
+            
+        Returns:
+            Dict[str, Any]: 'changed' (documents), 'deleted' (document IDs)
+                and 'watermark' (to pass to the next call)
+        """
+        return DatabaseUtils.get_changes(self.collection_name, watermark, limit)
     
     def get_by_id(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -72,20 +99,118 @@ class DataAccess:
         Returns:
             Optional[str]: New document ID or None if failed
         """
+        sync_manager.invalidate(self.collection_name)
         return DatabaseUtils.add_document(self.collection_name, data)
     
-    def update(self, doc_id: str, data: Dict[str, Any]) -> bool:
+    def create(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        """
+        Create a document with a known ID, never replacing an existing one
+        
+        Args:
+            doc_id (str): ID of the new document
+            data (Dict[str, Any]): Document data
+            
+        Returns:
+            bool: True if created, False otherwise
+            
+        Raises:
+            DocumentExists: If a document with the ID already exists
+        """
+        sync_manager.invalidate(self.collection_name)
+        return DatabaseUtils.create_document(self.collection_name, doc_id, dict(data))
+    
+    def set_many(
+        self,
+        documents: Dict[str, Dict[str, Any]],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        merge: bool = False
+    ) -> int:
+        """
+        Create or overwrite many documents with known IDs in batches
+        
+        Args:
+            documents (Dict[str, Dict[str, Any]]): Document ID -> document data
+            on_progress (Callable): Called with (written, total) after each batch
+            merge (bool): Merge into existing documents instead of replacing them
+            
+        Returns:
+            int: Number of documents written
+        """
+        sync_manager.invalidate(self.collection_name)
+        return DatabaseUtils.batch_set(self.collection_name, documents, on_progress=on_progress, merge=merge)
+    
+    def get_ids(self) -> List[str]:
+        """
+        Get the IDs of every document in the collection
+        
+        Returns:
+            List[str]: Document IDs
+        """
+        return DatabaseUtils.get_document_ids(self.collection_name)
+    
+    def edit_version(self, doc_id: str) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Get the version of a document to base an edit on
+        
+        Call this when a record is loaded for editing and pass both values
+        to update, so the save only sends what the user changed and fails
+        if someone else saved the document in between.
+        
+        Args:
+            doc_id (str): Document ID
+            
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Any]: The document (None if not
+                found) and the update time it was read at
+        """
+        decoder = get_decoder(self.collection_name)
+        base = data_cache.get_document(self.collection_name, doc_id)
+        if base is None or decoder.update_time(doc_id) is None:
+            # Not read in this session (e.g. a warm-start copy), so its version is unknown
+            base = DatabaseUtils.get_document_by_id(self.collection_name, doc_id)
+        return base, decoder.update_time(doc_id)
+    
+    def update(
+        self,
+        doc_id: str,
+        data: Dict[str, Any],
+        base: Optional[Dict[str, Any]] = None,
+        update_time: Any = None
+    ) -> bool:
         """
         Update a document
         
+        Only the fields that differ from base, the version the changes were
+        made to (see edit_version), are sent, and the write fails with
+        WriteConflict instead of overwriting a newer version saved by
+        someone else since update_time. Without a base, the cached version
+        and the update time it was read at are used; if its version is not
+        known, the data is written as it is.
+        
         Args:
             doc_id (str): Document ID
             data (Dict[str, Any]): Updated data
+            base (Optional[Dict[str, Any]]): Version the changes were made to
+            update_time: Update time base was read at
             
         Returns:
             bool: True if successful, False otherwise
+            
+        Raises:
+            WriteConflict: If the document changed since update_time
         """
-        return DatabaseUtils.update_document(self.collection_name, doc_id, data)
+        sync_manager.invalidate(self.collection_name)
+        if base is None:
+            update_time = get_decoder(self.collection_name).update_time(doc_id)
+            if update_time is not None:
+                base = data_cache.get_document(self.collection_name, doc_id)
+        if base is None:
+            update_time = None
+        
+        updated = DatabaseUtils.update_document(self.collection_name, doc_id, dict(data), base, update_time)
+        if updated:
+            data_cache.patch(self.collection_name, doc_id, data)
+        return updated
     
     def delete(self, doc_id: str) -> bool:
         """
@@ -97,22 +222,143 @@ class DataAccess:
         Returns:
             bool: True if successful, False otherwise
         """
-        return DatabaseUtils.delete_document(self.collection_name, doc_id)
+        sync_manager.invalidate(self.collection_name)
+        deleted = DatabaseUtils.delete_document(self.collection_name, doc_id)
+        if deleted:
+            data_cache.discard(self.collection_name, doc_id)
+        return deleted
+    
+    def add_optimistic(
+        self,
+        data: Dict[str, Any],
+        on_done: Optional[Callable[[bool], None]] = None,
+        doc_id: Optional[str] = None,
+        on_conflict: Optional[Callable[[], None]] = None
+    ) -> str:
+        """
+        Add a document, showing it to watchers before the server confirms it
+        
+        The document ID is chosen here (unless given) so the new document
+        can be shown straight away. An existing document with the same ID
+        is never replaced. Callbacks are called from a background thread.
+        
+        Args:
+            data (Dict[str, Any]): Document data
+            on_done (Callable): Called with True once saved, False if rejected
+                (the document then disappears again)
+            doc_id (Optional[str]): ID to give the document, a new one if None
+            on_conflict (Callable): Called instead of on_done if the ID is
+                already taken (the existing document is shown again)
+            
+        Returns:
+            str: ID of the new document
+        """
+        doc_id = doc_id or uuid.uuid4().hex
+        data = dict(data, created_at=datetime.datetime.now())
+        write = lambda: DatabaseUtils.create_document(self.collection_name, doc_id, dict(data))
+        self._write_optimistic(doc_id, data, False, write, on_done, on_conflict)
+        return doc_id
+    
+    def update_optimistic(
+        self,
+        doc_id: str,
+        data: Dict[str, Any],
+        on_done: Optional[Callable[[bool], None]] = None,
+        base: Optional[Dict[str, Any]] = None,
+        update_time: Any = None,
+        on_conflict: Optional[Callable[[], None]] = None
+    ):
+        """
+        Update a document, showing the change to watchers before the server confirms it
+        
+        Args:
+            doc_id (str): Document ID
+            data (Dict[str, Any]): Updated data
+            on_done (Callable): Called with True once saved, False if rejected
+                (the change is then rolled back); called from a background thread
+            base (Optional[Dict[str, Any]]): Version the changes were made to
+                (see update)
+            update_time: Update time base was read at
+            on_conflict (Callable): Called instead of on_done if someone else
+                changed the document since update_time (the change is rolled back)
+        """
+        data = dict(data)
+        write = lambda: self.update(doc_id, dict(data), base, update_time)
+        self._write_optimistic(doc_id, data, True, write, on_done, on_conflict)
+    
+    def delete_optimistic(self, doc_id: str, on_done: Optional[Callable[[bool], None]] = None):
+        """
+        Delete a document, hiding it from watchers before the server confirms it
+        
+        Args:
+            doc_id (str): Document ID
+            on_done (Callable): Called with True once deleted, False if rejected
+                (the document then reappears); called from a background thread
+        """
+        self._write_optimistic(doc_id, None, False, lambda: self.delete(doc_id), on_done)
     
-    def watch(self, callback: Callable[[List[Dict[str, Any]]], None]) -> Callable[[], None]:
+    def pending_writes(self) -> int:
         """
-        Watch for changes in the collection
+        Count the optimistic writes of the collection not answered by the server yet
+        
+        Returns:
+            int: Number of pending writes
+        """
+        return subscription_hub.pending_writes(self.collection_name)
+    
+    def _write_optimistic(self, doc_id, data, merge, write, on_done, on_conflict=None):
+        """Show a write to the watchers now and send it in the background"""
+        write_id = subscription_hub.begin_write(self.collection_name, doc_id, data, merge)
+        
+        def run():
+            succeeded = conflict = False
+            try:
+                succeeded = bool(write())
+            except WriteConflict as e:
+                print(e)
+                conflict = True
+            except Exception as e:
+                print(f"Error writing document {doc_id} of {self.collection_name}: {e}")
+            finally:
+                sync_manager.invalidate(self.collection_name)
+                subscription_hub.end_write(self.collection_name, write_id, succeeded)
+            if conflict and on_conflict:
+                on_conflict()
+            elif on_done:
+                on_done(succeeded)
+        
+        _write_queue.submit(run)
+    
+    def watch(
+        self,
+        callback: Callable[..., None],
+        include_changes: bool = False,
+        filters: Optional[Sequence[Tuple[str, str, Any]]] = None
+    ) -> Callable[[], None]:
+        """
+        Watch for changes in the collection, or in the part of it a screen shows
+        
+        All watchers of a collection with the same filters share one
+        Firestore listener through the process-wide subscription hub.
+        Filtered watches only receive and decode matching documents, e.g.
+        filters=[('class', '==', '11'), ('status', '==', 'Active')], or
+        [(DOCUMENT_ID, 'in', ['app_data'])] for single documents.
         
         Args:
             callback (Callable): Function to call with updated data
+            include_changes (bool): Also pass the list of document changes
+            filters (Sequence[Tuple[str, str, Any]]): Optional (field, operator,
+                value) filters
             
         Returns:
             Callable[[], None]: Function to call to stop watching
         """
-        return DatabaseUtils.watch_collection(self.collection_name, callback)
+        return subscription_hub.subscribe(self.collection_name, callback, include_changes, filters)
 
 # Create some common data access objects
 students_data = DataAccess("students")
 teachers_data = DataAccess("teachers")
 courses_data = DataAccess("courses")
-results_data = DataAccess("result_data") 
\ No newline at end of file
+results_data = DataAccess("result_data")
+main_data = DataAccess("main_data")
+student_results_data = DataAccess("student_results") 
\ No newline at end of file
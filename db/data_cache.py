@@ -0,0 +1,310 @@
+from db.document_decoder import format_timestamp
+from typing import List, Dict, Any, Optional, Iterable
+import copy
+import datetime
+import json
+import os
+import threading
+import uuid
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), "Documents", "SmartResultSystem", ".cache", "data_cache.bin"
+)
+
+# Collections kept on disk between launches
+WARM_COLLECTIONS = ('students', 'teachers', 'courses', 'result_data')
+
+# Bump when the layout of the cached documents changes so old files are ignored
+CACHE_VERSION = 1
+
+# First bytes of the file: magic, then one byte naming the codec
+MAGIC = b'SRSC'
+CODEC_MSGPACK_ZSTD = 1
+CODEC_JSON_ZLIB = 2
+
+def _plain(value):
+    """Make values the codecs cannot handle (stray timestamps) serializable"""
+    if isinstance(value, datetime.datetime):
+        return format_timestamp(value)
+    return str(value)
+
+def encode_snapshot(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a cache snapshot
+
+    msgpack + zstd is used when both are installed, otherwise JSON + zlib.
+
+    Args:
+        payload (Dict[str, Any]): Snapshot to serialize
+
+    Returns:
+        bytes: File contents
+    """
+    if msgpack is not None and zstandard is not None:
+        packed = msgpack.packb(payload, default=_plain, use_bin_type=True)
+        return MAGIC + bytes([CODEC_MSGPACK_ZSTD]) + zstandard.ZstdCompressor(level=3).compress(packed)
+
+    packed = json.dumps(payload, default=_plain, separators=(',', ':')).encode('utf-8')
+    return MAGIC + bytes([CODEC_JSON_ZLIB]) + zlib.compress(packed, 6)
+
+def decode_snapshot(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Read a cache snapshot written by encode_snapshot
+
+    Args:
+        data (bytes): File contents
+
+    Returns:
+        Optional[Dict[str, Any]]: Snapshot, or None if it cannot be read here
+    """
+    if data[:len(MAGIC)] != MAGIC or len(data) <= len(MAGIC):
+        return None
+    codec, body = data[len(MAGIC)], data[len(MAGIC) + 1:]
+    if codec == CODEC_MSGPACK_ZSTD:
+        if msgpack is None or zstandard is None:
+            return None
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(body), raw=False)
+    if codec == CODEC_JSON_ZLIB:
+        return json.loads(zlib.decompress(body).decode('utf-8'))
+    return None
+
+def watermark_of(docs: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """
+    Get the latest updated_at of some decoded documents
+
+    Decoded timestamps use TIMESTAMP_FORMAT, so they compare as text.
+
+    Args:
+        docs (Iterable[Dict[str, Any]]): Decoded documents
+
+    Returns:
+        Optional[str]: Latest updated_at, or None if no document has one
+    """
+    stamps = [doc.get('updated_at') for doc in docs]
+    stamps = [stamp for stamp in stamps if isinstance(stamp, str)]
+    return max(stamps) if stamps else None
+
+class DataCache:
+    """
+    Warm-start cache of the main collections.
+
+    The documents of WARM_COLLECTIONS are written to disk when the
+    application closes, together with the latest updated_at of each
+    collection (its watermark). On the next launch they are read back
+    first, so screens can show data straight away, and the sync manager
+    then fetches only the documents changed since the watermark.
+
+    Documents are copied on the way in and out, so callers editing the
+    records they were given never change the cached versions, which
+    DataAccess.update diffs against.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, collections: Iterable[str] = WARM_COLLECTIONS):
+        """
+        Initialize the cache
+
+        Args:
+            path (str): File holding the snapshot
+            collections (Iterable[str]): Collections to keep
+        """
+        self.path = path
+        self.collections = tuple(collections)
+        self._docs = {}
+        self._watermarks = {}
+        self._lock = threading.RLock()
+
+    def load(self) -> int:
+        """
+        Read the snapshot written by the previous session
+
+        Returns:
+            int: Number of documents loaded
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                payload = decode_snapshot(f.read())
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            print(f"Error reading data cache: {e}")
+            return 0
+
+        if not payload or payload.get('version') != CACHE_VERSION:
+            return 0
+
+        count = 0
+        with self._lock:
+            for name, entry in (payload.get('collections') or {}).items():
+                if name not in self.collections:
+                    continue
+                docs = entry.get('docs') or []
+                self._docs[name] = {doc['id']: doc for doc in docs if doc.get('id')}
+                self._watermarks[name] = entry.get('watermark')
+                count += len(docs)
+        return count
+
+    def save(self) -> bool:
+        """
+        Write the cached collections to disk
+
+        The file is written under a temporary name and then moved into
+        place, so a crash never leaves a half-written snapshot behind.
+
+        Returns:
+            bool: True if the snapshot was written
+        """
+        with self._lock:
+            payload = {
+                'version': CACHE_VERSION,
+                'saved_at': format_timestamp(datetime.datetime.now()),
+                'collections': {
+                    name: {'watermark': self._watermarks.get(name), 'docs': list(docs.values())}
+                    for name, docs in self._docs.items()
+                },
+            }
+
+        temp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(encode_snapshot(payload))
+            os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"Error writing data cache: {e}")
+            return False
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def has(self, collection_name: str) -> bool:
+        """Whether documents of a collection are cached"""
+        with self._lock:
+            return collection_name in self._docs
+
+    def get(self, collection_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached documents of a collection without touching the database
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Documents or None if not cached
+        """
+        with self._lock:
+            docs = self._docs.get(collection_name)
+            return copy.deepcopy(list(docs.values())) if docs is not None else None
+
+    def get_document(self, collection_name: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached version of one document
+
+        Args:
+            collection_name (str): Name of the collection
+            doc_id (str): Document ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Document or None if it is not cached
+        """
+        with self._lock:
+            return copy.deepcopy((self._docs.get(collection_name) or {}).get(doc_id))
+
+    def patch(self, collection_name: str, doc_id: str, data: Dict[str, Any]):
+        """
+        Apply a local update to a cached document without waiting for a listener
+
+        Args:
+            collection_name (str): Name of the collection
+            doc_id (str): Document ID
+            data (Dict[str, Any]): Top-level fields written
+        """
+        with self._lock:
+            cached = self._docs.get(collection_name)
+            if cached is not None and doc_id in cached:
+                cached[doc_id] = dict(cached[doc_id], **copy.deepcopy(data))
+
+    def watermark(self, collection_name: str) -> Optional[str]:
+        """Latest updated_at seen for a collection"""
+        with self._lock:
+            return self._watermarks.get(collection_name)
+
+    def put(self, collection_name: str, docs: List[Dict[str, Any]]):
+        """
+        Replace the cached documents of a collection with a full snapshot
+
+        Args:
+            collection_name (str): Name of the collection
+            docs (List[Dict[str, Any]]): Every document of the collection
+        """
+        if collection_name not in self.collections:
+            return
+        with self._lock:
+            self._docs[collection_name] = {doc['id']: copy.deepcopy(doc) for doc in docs}
+            self._watermarks[collection_name] = watermark_of(docs)
+
+    def apply_changes(self, collection_name: str, changes: Dict[str, Any]):
+        """
+        Apply a change set from DatabaseUtils.get_changes to a cached collection
+
+        A 'full' change set holds the whole collection and replaces the
+        cached copy, so documents deleted and purged meanwhile are dropped;
+        a full read cut off by its limit is ignored.
+
+        Args:
+            collection_name (str): Name of the collection
+            changes (Dict[str, Any]): 'changed' documents, 'deleted' IDs,
+                the new 'watermark' and the 'full'/'complete' flags
+        """
+        if changes.get('full'):
+            if changes.get('complete', True):
+                self.put(collection_name, changes.get('changed') or [])
+            return
+
+        with self._lock:
+            cached = self._docs.get(collection_name)
+            if cached is None:
+                return
+            for doc in changes.get('changed') or []:
+                cached[doc['id']] = copy.deepcopy(doc)
+            for doc_id in changes.get('deleted') or []:
+                cached.pop(doc_id, None)
+            latest = changes.get('watermark')
+            current = self._watermarks.get(collection_name)
+            if latest and (current is None or latest > current):
+                self._watermarks[collection_name] = latest
+
+    def discard(self, collection_name: str, doc_id: str):
+        """Drop one document from the cache (after it was deleted)"""
+        with self._lock:
+            cached = self._docs.get(collection_name)
+            if cached is not None:
+                cached.pop(doc_id, None)
+
+    def clear(self):
+        """Forget every cached document and delete the snapshot file"""
+        with self._lock:
+            self._docs.clear()
+            self._watermarks.clear()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error deleting data cache: {e}")
+
+# Shared cache used by every DataAccess object in the process
+data_cache = DataCache()
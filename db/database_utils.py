@@ -1,20 +1,64 @@
 from db.firebase_config import FirebaseConfig
-from typing import List, Dict, Any, Optional, Union, Callable
+from db.document_decoder import get_decoder, format_timestamp, TIMESTAMP_FORMAT
+from firebase_admin import firestore
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1.field_path import FieldPath
+from typing import List, Dict, Any, Optional, Union, Callable, Sequence, Tuple, Iterable
+import copy
 import datetime
 
+# Field name that filters on the document ID in watch filters
+DOCUMENT_ID = FieldPath.document_id()
+
+# Collection recording deleted documents, so delta reads can see deletions
+TOMBSTONES_COLLECTION = 'deleted_documents'
+
+# Deleted documents are kept, flagged with 'deleted' and 'deleted_at', so
+# delta reads and listeners see deletions like any other change
+SOFT_DELETES = True
+
+# How long flagged documents and tombstones are kept before compaction
+# purges them; a replica that has not synced for longer reads everything again
+TOMBSTONE_RETENTION = datetime.timedelta(days=30)
+
+def tombstone_id(collection_name: str, document_id: str) -> str:
+    """ID of the tombstone of a hard-deleted document"""
+    return f"{collection_name}__{document_id}"
+
+# Fields maintained by DatabaseUtils itself, never taken from edited data
+MANAGED_FIELDS = ('id', 'created_at', 'updated_at')
+
+# Marks a field missing from the base version in diff_fields
+_MISSING = object()
+
+def is_deleted(data: Optional[Dict[str, Any]]) -> bool:
+    """Whether a document has been soft deleted"""
+    return bool(data and data.get('deleted'))
+
+class WriteConflict(Exception):
+    """A conditional write failed because someone else changed the document first"""
+
+class DocumentExists(WriteConflict):
+    """A document could not be created because its ID is already taken"""
+
 class DatabaseUtils:
     """
     Utility class for common database operations
     """
     
     @staticmethod
-    def get_collection_data(collection_name: str, limit: int = 100000) -> List[Dict[str, Any]]:
+    def get_collection_data(
+        collection_name: str,
+        limit: int = 100000,
+        include_deleted: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Get data from a collection with optional limit
         
         Args:
             collection_name (str): Name of the collection to fetch data from
             limit (int): Maximum number of documents to fetch
+            include_deleted (bool): Also return soft-deleted documents
             
         Returns:
             List[Dict[str, Any]]: List of documents as dictionaries
@@ -23,6 +67,8 @@ class DatabaseUtils:
             db = FirebaseConfig.get_db()
             collection = db.collection(collection_name)
             
+            decoder = get_decoder(collection_name)
+            
             # Get the documents
             docs = collection.stream()
             
@@ -35,16 +81,11 @@ class DatabaseUtils:
                 if count >= limit:
                     break
                     
-                data = doc.to_dict()
-                data['id'] = doc.id
-                
-                # Convert timestamp fields to readable strings
-                for key, value in data.items():
-                    if isinstance(value, datetime.datetime):
-                        data[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                
-                result.append(data)
-                count += 1
+                # Convert to a dictionary with readable timestamps
+                data = decoder.decode(doc)
+                if include_deleted or not is_deleted(data):
+                    result.append(data)
+                    count += 1
             
             return result
         except Exception as e:
@@ -69,18 +110,12 @@ class DatabaseUtils:
             doc = doc_ref.get()
             
             if doc.exists:
-                data = doc.to_dict()
-                data['id'] = doc.id
-                
-                # Convert timestamp fields to readable strings
-                for key, value in data.items():
-                    if isinstance(value, datetime.datetime):
-                        data[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                        
-                return data
-            else:
-                print(f"Document {document_id} not found in collection {collection_name}")
-                return None
+                # Convert to a dictionary with readable timestamps
+                data = get_decoder(collection_name).decode(doc)
+                if not is_deleted(data):
+                    return data
+            print(f"Document {document_id} not found in collection {collection_name}")
+            return None
         except Exception as e:
             print(f"Error getting document {document_id}: {e}")
             return None
@@ -91,7 +126,8 @@ class DatabaseUtils:
         field: str,
         operator: str,
         value: Any,
-        limit: int = 100
+        limit: int = 100,
+        include_deleted: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Query a collection with a simple filter
@@ -102,6 +138,7 @@ class DatabaseUtils:
             operator (str): Comparison operator ('==', '>', '<', '>=', '<=', '!=')
             value (Any): Value to compare against
             limit (int): Maximum number of documents to fetch
+            include_deleted (bool): Also return soft-deleted documents
             
         Returns:
             List[Dict[str, Any]]: List of documents matching the query
@@ -113,6 +150,8 @@ class DatabaseUtils:
             # Create the query
             query = collection.where(field, operator, value)
             
+            decoder = get_decoder(collection_name)
+            
             # Execute the query
             docs = query.stream()
             
@@ -124,16 +163,11 @@ class DatabaseUtils:
                 if count >= limit:
                     break
                     
-                data = doc.to_dict()
-                data['id'] = doc.id
-                
-                # Convert timestamp fields to readable strings
-                for key, value in data.items():
-                    if isinstance(value, datetime.datetime):
-                        data[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                
-                result.append(data)
-                count += 1
+                # Convert to a dictionary with readable timestamps
+                data = decoder.decode(doc)
+                if include_deleted or not is_deleted(data):
+                    result.append(data)
+                    count += 1
             
             return result
         except Exception as e:
@@ -168,93 +202,736 @@ class DatabaseUtils:
             return None
     
     @staticmethod
-    def update_document(collection_name: str, document_id: str, data: Dict[str, Any]) -> bool:
+    def create_document(collection_name: str, document_id: str, data: Dict[str, Any]) -> bool:
+        """
+        Create a document with a known ID, failing if the ID is already taken
+        
+        Args:
+            collection_name (str): Name of the collection
+            document_id (str): ID of the new document
+            data (Dict[str, Any]): Document data
+            
+        Returns:
+            bool: True if created, False on other errors
+            
+        Raises:
+            DocumentExists: If a document with the ID already exists
+        """
+        try:
+            db = FirebaseConfig.get_db()
+            doc_ref = db.collection(collection_name).document(document_id)
+            
+            # Add timestamps
+            now = datetime.datetime.now()
+            data.setdefault('created_at', now)
+            data['updated_at'] = now
+            
+            # Create the document; unlike set, this never replaces an existing one
+            result = doc_ref.create(data)
+            get_decoder(collection_name).remember_update_time(document_id, getattr(result, 'update_time', None))
+            return True
+        except gcp_exceptions.Conflict:
+            raise DocumentExists(f"Document {document_id} already exists in {collection_name}")
+        except Exception as e:
+            print(f"Error creating document {document_id}: {e}")
+            return False
+    
+    @staticmethod
+    def set_document(collection_name: str, document_id: str, data: Dict[str, Any], merge: bool = False) -> bool:
+        """
+        Create or overwrite a document with a known ID
+        
+        Args:
+            collection_name (str): Name of the collection
+            document_id (str): ID of the document to write
+            data (Dict[str, Any]): Document data
+            merge (bool): Merge into an existing document instead of replacing it
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            db = FirebaseConfig.get_db()
+            doc_ref = db.collection(collection_name).document(document_id)
+            
+            # Add update timestamp
+            data['updated_at'] = datetime.datetime.now()
+            
+            # Write the document
+            if merge:
+                doc_ref.set(data, merge=True)
+            else:
+                doc_ref.set(data)
+            return True
+        except Exception as e:
+            print(f"Error setting document {document_id}: {e}")
+            return False
+    
+    @staticmethod
+    def set_document_if_changed(
+        collection_name: str,
+        document_id: str,
+        data: Dict[str, Any],
+        version_field: str
+    ) -> bool:
+        """
+        Overwrite a document unless the stored one already has the same version
+        
+        The stored version is read and the document written in one
+        transaction, so when several clients store the same derived
+        document only the first one writes it.
+        
+        Args:
+            collection_name (str): Name of the collection
+            document_id (str): ID of the document to write
+            data (Dict[str, Any]): Document data, including version_field
+            version_field (str): Field identifying the contents (e.g. a digest)
+            
+        Returns:
+            bool: True if written or already current, False otherwise
+        """
+        try:
+            db = FirebaseConfig.get_db()
+            doc_ref = db.collection(collection_name).document(document_id)
+            data['updated_at'] = datetime.datetime.now()
+            
+            if FirebaseConfig.is_mock():
+                # The mock has no transactions, compare and write directly
+                stored = doc_ref.get().to_dict() or {}
+                if stored.get(version_field) != data[version_field]:
+                    doc_ref.set(data)
+                return True
+            
+            @firestore.transactional
+            def apply(transaction):
+                snapshot = doc_ref.get(field_paths=[version_field], transaction=transaction)
+                stored = snapshot.to_dict() if snapshot.exists else None
+                if not stored or stored.get(version_field) != data[version_field]:
+                    transaction.set(doc_ref, data)
+            
+            apply(db.transaction())
+            return True
+        except Exception as e:
+            print(f"Error setting document {document_id}: {e}")
+            return False
+    
+    @staticmethod
+    def batch_set(
+        collection_name: str,
+        documents: Dict[str, Dict[str, Any]],
+        batch_size: int = 500,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        merge: Union[bool, Sequence[str]] = False
+    ) -> int:
+        """
+        Create or overwrite many documents with known IDs using batched commits
+        
+        Args:
+            collection_name (str): Name of the collection
+            documents (Dict[str, Dict[str, Any]]): Document ID -> document data
+            batch_size (int): Writes per commit (Firestore allows at most 500)
+            on_progress (Callable): Called with (written, total) after each commit
+            merge (Union[bool, Sequence[str]]): Merge into existing documents
+                instead of replacing them, or the field paths to replace
+                (each as a whole; updated_at is always written)
+            
+        Returns:
+            int: Number of documents written
+        """
+        written = 0
+        total = len(documents)
+        try:
+            db = FirebaseConfig.get_db()
+            collection = db.collection(collection_name)
+            batch_size = max(1, min(batch_size, 500))
+            
+            now = datetime.datetime.now()
+            items = list(documents.items())
+            for start in range(0, total, batch_size):
+                batch = db.batch()
+                chunk = items[start:start + batch_size]
+                for document_id, data in chunk:
+                    # Add timestamps (merged documents keep their created_at)
+                    if not merge:
+                        data.setdefault('created_at', now)
+                    data['updated_at'] = now
+                    fields = list(merge) + ['updated_at'] if isinstance(merge, (list, tuple)) else merge
+                    batch.set(collection.document(document_id), data, merge=fields)
+                batch.commit()
+                
+                written += len(chunk)
+                if on_progress:
+                    on_progress(written, total)
+            return written
+        except Exception as e:
+            print(f"Error writing batch to {collection_name}: {e}")
+            return written
+    
+    @staticmethod
+    def get_document_ids(collection_name: str) -> List[str]:
+        """
+        Get the IDs of every document in a collection without reading their data
+        
+        Args:
+            collection_name (str): Name of the collection
+            
+        Returns:
+            List[str]: Document IDs
+        """
+        try:
+            db = FirebaseConfig.get_db()
+            return [doc_ref.id for doc_ref in db.collection(collection_name).list_documents()]
+        except Exception as e:
+            print(f"Error listing documents of {collection_name}: {e}")
+            return []
+    
+    @staticmethod
+    def update_document(
+        collection_name: str,
+        document_id: str,
+        data: Dict[str, Any],
+        base: Optional[Dict[str, Any]] = None,
+        update_time: Any = None
+    ) -> bool:
         """
         Update an existing document
         
+        When the version of the document the changes were made to is given
+        as base, only the fields that differ from it are sent, and nothing
+        is written at all if none do. With update_time (the version base was
+        read at) the update only succeeds if nobody else changed the
+        document since.
+        
         Args:
             collection_name (str): Name of the collection
             document_id (str): ID of the document to update
             data (Dict[str, Any]): New data to update
+            base (Optional[Dict[str, Any]]): Version the changes were made to
+            update_time: Update time the base version was read at
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful (or nothing changed), False otherwise
+            
+        Raises:
+            WriteConflict: If the document changed since update_time
         """
         try:
             db = FirebaseConfig.get_db()
             doc_ref = db.collection(collection_name).document(document_id)
             
+            if base is not None:
+                data = DatabaseUtils.diff_fields(base, data, get_decoder(collection_name).derived_fields)
+                if not data:
+                    # Nothing to write, but a newer version means the edit was made to a stale copy
+                    if update_time is not None and doc_ref.get(field_paths=['updated_at']).update_time != update_time:
+                        raise gcp_exceptions.FailedPrecondition(f"Document {document_id} was modified")
+                    return True
+            
             # Add update timestamp
             data['updated_at'] = datetime.datetime.now()
             
-            # Update the document
-            doc_ref.update(data)
+            # Update the document, unless it changed since it was read
+            if update_time is not None:
+                result = doc_ref.update(data, option=db.write_option(last_update_time=update_time))
+            else:
+                result = doc_ref.update(data)
+            get_decoder(collection_name).remember_update_time(document_id, getattr(result, 'update_time', None))
             return True
+        except gcp_exceptions.FailedPrecondition:
+            raise WriteConflict(f"Document {document_id} was changed by someone else; reload it and try again")
         except Exception as e:
             print(f"Error updating document {document_id}: {e}")
             return False
     
     @staticmethod
-    def delete_document(collection_name: str, document_id: str) -> bool:
+    def diff_fields(
+        base: Dict[str, Any],
+        data: Dict[str, Any],
+        ignore: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Get the field paths of data whose values differ from base
+        
+        Maps are compared key by key, so a change deep inside one yields a
+        single nested field path. A map that lost keys is sent whole, since
+        an update replaces the map it is given. Fields missing from data
+        are left alone, as with any update.
+        
+        Args:
+            base (Dict[str, Any]): Last-known version of the document
+            data (Dict[str, Any]): New data
+            ignore (Iterable[str]): Top-level fields never sent (derived fields)
+            
+        Returns:
+            Dict[str, Any]: Field path -> new value (see field_path)
+        """
+        skipped = set(MANAGED_FIELDS) | set(ignore)
+        changes = {}
+        
+        def walk(old, new, parts):
+            for key, value in new.items():
+                if not parts and key in skipped:
+                    continue
+                path = parts + (key,)
+                current = old.get(key, _MISSING)
+                if isinstance(value, dict) and isinstance(current, dict) and current.keys() <= value.keys():
+                    walk(current, value, path)
+                elif current is _MISSING or current != value:
+                    changes[DatabaseUtils.field_path(*path)] = value
+        
+        walk(base or {}, data, ())
+        return changes
+    
+    @staticmethod
+    def apply_updates(data: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get a document as it is after field path updates, without writing anything
+        
+        Args:
+            data (Dict[str, Any]): Current document data
+            updates (Dict[str, Any]): Field path -> new value (see field_path)
+            
+        Returns:
+            Dict[str, Any]: Updated copy of the data
+        """
+        updated = copy.deepcopy(data)
+        for key, value in updates.items():
+            parts = FieldPath.from_api_repr(key).parts
+            node = updated
+            for part in parts[:-1]:
+                if not isinstance(node.get(part), dict):
+                    node[part] = {}
+                node = node[part]
+            if value is firestore.DELETE_FIELD:
+                node.pop(parts[-1], None)
+            else:
+                node[parts[-1]] = value
+        return updated
+    
+    @staticmethod
+    def field_path(*parts: Any) -> str:
+        """
+        Build a field path for use as a key in update_fields
+        
+        Parts that are not plain identifiers (roll numbers, 'pak-studies')
+        are quoted so they are not split or rejected by Firestore.
+        
+        Args:
+            *parts: Names of the nested fields, outermost first
+            
+        Returns:
+            str: Field path such as marks.`12`.result.`pak-studies`
+        """
+        return FieldPath(*[str(part) for part in parts]).to_api_repr()
+    
+    @staticmethod
+    def update_fields(
+        collection_name: str,
+        document_id: str,
+        build_updates: Callable[[Dict[str, Any]], Dict[str, Any]],
+        max_attempts: int = 5,
+        related_writes: Optional[Callable[[Dict[str, Any]], Iterable[Tuple[str, str, Dict[str, Any], Sequence[str]]]]] = None
+    ) -> bool:
+        """
+        Update individual fields of a document inside a transaction
+        
+        build_updates is called with the current document data and returns
+        the field paths to write (see field_path). Only those fields are
+        sent, so writers touching different fields of the same document do
+        not overwrite each other. When the transaction loses a race
+        Firestore retries it with fresh data, up to max_attempts times;
+        other errors are not retried. build_updates can raise ValueError to
+        abort without writing.
+        
+        Documents derived from this one (such as indexes) can be written in
+        the same transaction: related_writes is called with the document as
+        it is after the updates and returns (collection, document ID, data,
+        field paths) writes, each replacing only the named fields.
+        
+        Args:
+            collection_name (str): Name of the collection
+            document_id (str): ID of the document to update
+            build_updates (Callable): Function from current data to updates
+            max_attempts (int): Maximum number of attempts
+            related_writes (Callable): Function from the updated data to
+                writes of other documents
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            db = FirebaseConfig.get_db()
+            doc_ref = db.collection(collection_name).document(document_id)
+            
+            if FirebaseConfig.is_mock():
+                # The mock has no transactions, apply the update directly
+                snapshot = doc_ref.get()
+                current = dict(snapshot.to_dict() or {})
+                updates = build_updates(current)
+                updates['updated_at'] = datetime.datetime.now()
+                related = related_writes(DatabaseUtils.apply_updates(current, updates)) if related_writes else ()
+                doc_ref.update(updates)
+                for related_collection, related_id, data, fields in related:
+                    db.collection(related_collection).document(related_id).set(data, merge=list(fields))
+                return True
+            
+            @firestore.transactional
+            def apply(transaction):
+                snapshot = doc_ref.get(transaction=transaction)
+                if not snapshot.exists:
+                    return f"Document {document_id} not found in collection {collection_name}"
+                
+                current = snapshot.to_dict() or {}
+                try:
+                    updates = build_updates(current)
+                except ValueError as e:
+                    # Rejected, nothing is written
+                    return str(e)
+                
+                updates['updated_at'] = datetime.datetime.now()
+                related = related_writes(DatabaseUtils.apply_updates(current, updates)) if related_writes else ()
+                transaction.update(doc_ref, updates)
+                for related_collection, related_id, data, fields in related:
+                    related_ref = db.collection(related_collection).document(related_id)
+                    transaction.set(related_ref, data, merge=list(fields))
+                return None
+            
+            rejection = apply(db.transaction(max_attempts=max_attempts))
+            if rejection:
+                print(f"Update of document {document_id} rejected: {rejection}")
+                return False
+            return True
+        except ValueError as e:
+            print(f"Update of document {document_id} rejected: {e}")
+            return False
+        except Exception as e:
+            print(f"Error updating fields of document {document_id}: {e}")
+            return False
+    
+    @staticmethod
+    def delete_document(collection_name: str, document_id: str, hard: Optional[bool] = None) -> bool:
         """
         Delete a document
         
+        With SOFT_DELETES the document is only flagged as deleted, which
+        every read and listener honors; purge_deleted removes it for good
+        once the retention period has passed.
+        
         Args:
             collection_name (str): Name of the collection
             document_id (str): ID of the document to delete
+            hard (Optional[bool]): Remove the document right away; defaults
+                to the opposite of SOFT_DELETES
             
         Returns:
             bool: True if successful, False otherwise
         """
+        if hard is None:
+            hard = not SOFT_DELETES
         try:
             db = FirebaseConfig.get_db()
             doc_ref = db.collection(collection_name).document(document_id)
-            doc_ref.delete()
+            now = datetime.datetime.now()
+            
+            if not hard:
+                # Fails if the document does not exist
+                doc_ref.update({'deleted': True, 'deleted_at': now, 'updated_at': now})
+                return True
+            
+            # Delete and leave a tombstone in one batch so delta reads
+            # (get_changes) never miss a deletion
+            tombstone_ref = db.collection(TOMBSTONES_COLLECTION).document(
+                tombstone_id(collection_name, document_id)
+            )
+            batch = db.batch()
+            batch.delete(doc_ref)
+            batch.set(tombstone_ref, {
+                'collection': collection_name,
+                'document_id': document_id,
+                'deleted_at': now,
+                'updated_at': now,
+            })
+            batch.commit()
             return True
         except Exception as e:
             print(f"Error deleting document {document_id}: {e}")
             return False
     
     @staticmethod
-    def watch_collection(collection_name: str, callback: Callable[[List[Dict[str, Any]]], None]) -> Callable[[], None]:
+    def purge_deleted(
+        collection_name: str,
+        retention: datetime.timedelta = TOMBSTONE_RETENTION,
+        batch_size: int = 500,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> int:
         """
-        Set up a real-time listener for a collection
+        Remove soft-deleted documents and tombstones older than the retention
+        
+        Only flagged documents are read (one single-field query), and they
+        are removed with batched commits.
+        
+        Args:
+            collection_name (str): Name of the collection
+            retention (datetime.timedelta): How long deletions are kept
+            batch_size (int): Deletes per commit (Firestore allows at most 500)
+            on_progress (Callable): Called with the number purged after each commit
+            
+        Returns:
+            int: Number of documents and tombstones purged
+        """
+        purged = 0
+        try:
+            db = FirebaseConfig.get_db()
+            cutoff = datetime.datetime.now() - retention
+            batch_size = max(1, min(batch_size, 500))
+            
+            expired = [
+                doc.reference for doc in db.collection(collection_name).where('deleted', '==', True).stream()
+                if DatabaseUtils._older_than((doc.to_dict() or {}).get('deleted_at'), cutoff)
+            ]
+            # Tombstones of hard deletes, filtered here to avoid a composite index
+            expired += [
+                doc.reference for doc in db.collection(TOMBSTONES_COLLECTION).where('updated_at', '<', cutoff).stream()
+                if (doc.to_dict() or {}).get('collection') == collection_name
+            ]
+            
+            for start in range(0, len(expired), batch_size):
+                batch = db.batch()
+                chunk = expired[start:start + batch_size]
+                for doc_ref in chunk:
+                    batch.delete(doc_ref)
+                batch.commit()
+                
+                purged += len(chunk)
+                if on_progress:
+                    on_progress(purged)
+            return purged
+        except Exception as e:
+            print(f"Error purging deleted documents of {collection_name}: {e}")
+            return purged
+    
+    @staticmethod
+    def _older_than(value: Any, cutoff: datetime.datetime) -> bool:
+        """Whether a stored timestamp lies before a cutoff"""
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+            except ValueError:
+                return False
+        if not isinstance(value, datetime.datetime):
+            return False
+        return value.replace(tzinfo=None) < cutoff
+    
+    @staticmethod
+    def get_changes(
+        collection_name: str,
+        since: Optional[Union[str, datetime.datetime]] = None,
+        limit: int = 100000
+    ) -> Dict[str, Any]:
+        """
+        Get the documents added, updated or deleted since a watermark
+        
+        Reads only documents whose updated_at is at or after the watermark,
+        plus the tombstones of documents hard-deleted since then; soft
+        deletes arrive as flagged documents and are reported as deleted.
+        Without a watermark, or with one older than TOMBSTONE_RETENTION
+        (deletions may have been purged since), the whole collection is read
+        and the change set is marked 'full': it replaces the cached copy
+        rather than being merged into it.
+        
+        Args:
+            collection_name (str): Name of the collection
+            since: Watermark, a datetime or a decoded timestamp string
+            limit (int): Maximum number of changed documents to fetch
+            
+        Returns:
+            Dict[str, Any]: 'changed' (documents), 'deleted' (document IDs),
+                'watermark' (latest updated_at seen, as a string), 'full'
+                (whole collection read) and 'complete' (False if a read hit
+                the limit, in which case the watermark is not advanced)
+        """
+        since = DatabaseUtils.change_window(since)
+        
+        if since is None:
+            changed = DatabaseUtils.get_collection_data(collection_name, limit)
+            tombstones = []
+        else:
+            changed = DatabaseUtils.query_collection(
+                collection_name, 'updated_at', '>=', since, limit, include_deleted=True
+            )
+            # Tombstones are rare, so one single-field query for every
+            # collection is cheaper than needing a composite index
+            tombstones = DatabaseUtils.query_collection(TOMBSTONES_COLLECTION, 'updated_at', '>=', since, limit)
+        
+        return DatabaseUtils.build_change_set(collection_name, changed, tombstones, since, limit)
+    
+    @staticmethod
+    def change_window(since: Optional[Union[str, datetime.datetime]]) -> Optional[datetime.datetime]:
+        """
+        Get the point in time a delta read starts from
+        
+        Args:
+            since: Watermark, a datetime or a decoded timestamp string
+            
+        Returns:
+            Optional[datetime.datetime]: Start of the delta read, or None when
+                the whole collection has to be read
+        """
+        if isinstance(since, str):
+            try:
+                since = datetime.datetime.strptime(since, TIMESTAMP_FORMAT)
+            except ValueError:
+                since = None
+        
+        if since is not None and since < datetime.datetime.now() - TOMBSTONE_RETENTION:
+            since = None
+        return since
+    
+    @staticmethod
+    def build_change_set(
+        collection_name: str,
+        changed: List[Dict[str, Any]],
+        tombstones: List[Dict[str, Any]],
+        since: Optional[datetime.datetime],
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Combine the results of the delta reads of get_changes
+        
+        The queries are not ordered, so a read that hit the limit may have
+        skipped changes anywhere in the window; the change set then keeps
+        the watermark where it was, and the next read covers them again.
+        
+        Args:
+            collection_name (str): Name of the collection
+            changed (List[Dict[str, Any]]): Documents updated since the watermark,
+                soft-deleted ones included
+            tombstones (List[Dict[str, Any]]): Tombstones written since the
+                watermark, of any collection
+            since (Optional[datetime.datetime]): Start of the delta read
+            limit (Optional[int]): Limit the reads used
+            
+        Returns:
+            Dict[str, Any]: Change set (see get_changes)
+        """
+        complete = limit is None or (len(changed) < limit and len(tombstones) < limit)
+        tombstones = [tombstone for tombstone in tombstones if tombstone.get('collection') == collection_name]
+        
+        # A document re-created after its deletion is a change, not a deletion
+        changed_at = {doc['id']: str(doc.get('updated_at') or '') for doc in changed}
+        deleted = []
+        for tombstone in tombstones:
+            doc_id = tombstone.get('document_id')
+            if doc_id in changed_at and changed_at[doc_id] > str(tombstone.get('updated_at') or ''):
+                continue
+            deleted.append(doc_id)
+        deleted += [doc['id'] for doc in changed if is_deleted(doc)]
+        if deleted:
+            removed = set(deleted)
+            changed = [doc for doc in changed if doc['id'] not in removed]
+        
+        stamps = [stamp for stamp in changed_at.values() if stamp]
+        stamps += [str(tombstone.get('updated_at')) for tombstone in tombstones if tombstone.get('updated_at')]
+        if since is not None:
+            stamps.append(format_timestamp(since))
+        if not complete:
+            stamps = []
+        
+        return {
+            'changed': changed,
+            'deleted': deleted,
+            'watermark': max(stamps) if stamps else None,
+            'full': since is None,
+            'complete': complete,
+        }
+    
+    @staticmethod
+    def apply_filters(collection, filters: Optional[Sequence[Tuple[str, str, Any]]]):
+        """
+        Narrow a collection to the documents matching every filter
+        
+        Args:
+            collection: Collection reference
+            filters (Sequence[Tuple[str, str, Any]]): (field, operator, value)
+                filters; DOCUMENT_ID filters take document IDs
+            
+        Returns:
+            The collection itself without filters, otherwise a query
+        """
+        query = collection
+        for field, operator, value in filters or ():
+            if field == DOCUMENT_ID:
+                # Firestore compares document IDs as references
+                if isinstance(value, (list, tuple, set)):
+                    value = [collection.document(str(doc_id)) for doc_id in value]
+                else:
+                    value = collection.document(str(value))
+            query = query.where(field, operator, value)
+        return query
+    
+    @staticmethod
+    def watch_collection(
+        collection_name: str,
+        callback: Callable[..., None],
+        include_changes: bool = False,
+        filters: Optional[Sequence[Tuple[str, str, Any]]] = None
+    ) -> Callable[[], None]:
+        """
+        Set up a real-time listener for a collection or part of it
+        
+        Soft-deleted documents are left out of the snapshots, and a
+        document being soft deleted is reported as a 'REMOVED' change.
         
         Args:
             collection_name (str): Name of the collection to watch
             callback (Callable): Function to call when data changes
+            include_changes (bool): Also pass the list of document changes
+                (dicts with 'type', 'id' and 'data') as a second argument
+            filters (Sequence[Tuple[str, str, Any]]): Optional (field, operator,
+                value) filters; only matching documents are sent and decoded
             
         Returns:
             Callable[[], None]: Function to call to unsubscribe from updates
         """
         try:
             db = FirebaseConfig.get_db()
-            collection = db.collection(collection_name)
+            collection = DatabaseUtils.apply_filters(db.collection(collection_name), filters)
+            
+            decoder = get_decoder(collection_name)
             
             # Set up the snapshot listener
             def on_snapshot(snapshot, changes, read_time):
                 # Convert snapshot to list of dictionaries
-                docs = []
-                for doc in snapshot:
-                    data = doc.to_dict()
-                    data['id'] = doc.id
-                    
-                    # Convert timestamp fields to readable strings
-                    for key, value in data.items():
-                        if isinstance(value, datetime.datetime):
-                            data[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    docs.append(data)
+                docs = [data for data in (decoder.decode(doc) for doc in snapshot) if not is_deleted(data)]
+                
+                if not include_changes:
+                    # Call the callback with the updated data
+                    callback(docs)
+                    return
                 
-                # Call the callback with the updated data
-                callback(docs)
+                # Describe what changed since the previous snapshot
+                docs_by_id = {doc['id']: doc for doc in docs}
+                delta = []
+                for change in changes or []:
+                    doc_id = change.document.id
+                    change_type = getattr(change.type, 'name', str(change.type))
+                    if change_type != 'REMOVED' and doc_id not in docs_by_id:
+                        # Soft deleted: gone for the subscribers, or never shown
+                        if change_type == 'ADDED':
+                            continue
+                        change_type = 'REMOVED'
+                    delta.append({
+                        'type': change_type,
+                        'id': doc_id,
+                        'data': docs_by_id.get(doc_id)
+                    })
+                
+                callback(docs, delta)
             
             # Start listening and return the unsubscribe function
-            return collection.on_snapshot(on_snapshot)
+            watch = collection.on_snapshot(on_snapshot)
+            return getattr(watch, 'unsubscribe', watch)
         except Exception as e:
             print(f"Error setting up watch on collection {collection_name}: {e}")
             # Return a no-op unsubscribe function
-            return lambda: None 
-
-
-    
\ No newline at end of file
+            return lambda: None
@@ -0,0 +1,201 @@
+from db.result_summary import SUMMARY_FIELD, summarize_result
+from typing import Dict, Any, Iterable, Optional, Callable
+import datetime
+import threading
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Known timestamp fields per collection. Nested fields use dotted paths and
+# '*' matches every key of a map (e.g. every roll number in 'marks').
+COLLECTION_SCHEMAS = {
+    'students': ('created_at', 'updated_at', 'deleted_at'),
+    'teachers': ('created_at', 'updated_at', 'deleted_at'),
+    'courses': ('created_at', 'updated_at', 'deleted_at'),
+    'main_data': ('created_at', 'updated_at'),
+    'result_data': (
+        'created_at',
+        'updated_at',
+        'deleted_at',
+        'last_updated',
+        'marks.*.updated_at',
+        'uploaded_at.*',
+    ),
+}
+
+DEFAULT_SCHEMA = ('created_at', 'updated_at')
+
+# Fields computed from the document when it is decoded, per collection
+DERIVED_FIELDS = {
+    'result_data': {SUMMARY_FIELD: summarize_result},
+}
+
+def format_timestamp(value: datetime.datetime) -> str:
+    """
+    Format a timestamp as TIMESTAMP_FORMAT
+
+    isoformat is noticeably cheaper than strftime and gives the same text;
+    it is called on the base class so subclasses such as Firestore's
+    DatetimeWithNanoseconds cannot change the output.
+    """
+    return datetime.datetime.isoformat(value, ' ', 'seconds')[:19]
+
+class DocumentDecoder:
+    """
+    Converts Firestore documents to plain dictionaries for one collection.
+
+    Only the timestamp fields named in the schema are visited, so decoding
+    cost no longer grows with the number of fields in a document. Top-level
+    fields that are not in the schema are inspected once, the first time
+    they are seen, and remembered if they turn out to hold timestamps.
+    Derived fields (such as the result summary) are computed once here so
+    readers never have to recompute them. The update time of every decoded
+    snapshot is remembered, so writes can be made conditional on the
+    version last read.
+    """
+
+    def __init__(
+        self,
+        timestamp_fields: Iterable[str] = DEFAULT_SCHEMA,
+        derived_fields: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None
+    ):
+        """
+        Initialize the decoder
+
+        Args:
+            timestamp_fields (Iterable[str]): Dotted paths of timestamp fields
+            derived_fields (Optional[Dict[str, Callable]]): Field name -> function
+                computing it from the decoded document
+        """
+        self._derived = list((derived_fields or {}).items())
+
+        self._top_level = []
+        self._nested = []
+        for field in timestamp_fields:
+            path = tuple(field.split('.'))
+            if len(path) == 1:
+                self._top_level.append(field)
+            else:
+                self._nested.append(path)
+
+        # Every top-level key seen so far, used to detect schema drift cheaply
+        self._known_keys = frozenset(self._top_level) | frozenset(key for key, _ in self._derived)
+        self._lock = threading.Lock()
+        
+        # Document ID -> update time of the latest snapshot decoded
+        self._update_times = {}
+    
+    @property
+    def derived_fields(self):
+        """Names of the fields computed on decode (never stored)"""
+        return [key for key, _ in self._derived]
+    
+    def update_time(self, doc_id: str):
+        """
+        Get the update time of the latest snapshot of a document read
+
+        Args:
+            doc_id (str): Document ID
+
+        Returns:
+            Update time, or None if the document was not read in this process
+        """
+        return self._update_times.get(doc_id)
+    
+    def remember_update_time(self, doc_id: str, update_time):
+        """Record the update time of a document version (read or written)"""
+        if update_time is not None:
+            self._update_times[doc_id] = update_time
+
+    def decode(self, doc) -> Dict[str, Any]:
+        """
+        Decode a document snapshot
+
+        Args:
+            doc: Firestore document snapshot
+
+        Returns:
+            Dict[str, Any]: Document data with its ID and readable timestamps
+        """
+        data = doc.to_dict() or {}
+        data['id'] = doc.id
+        self.remember_update_time(doc.id, getattr(doc, 'update_time', None))
+        return self.decode_data(data)
+
+    def decode_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert the timestamp fields of a document dictionary in place
+
+        Args:
+            data (Dict[str, Any]): Document data
+
+        Returns:
+            Dict[str, Any]: The same dictionary with readable timestamps
+        """
+        if not data.keys() <= self._known_keys:
+            self._learn(data)
+
+        for key in self._top_level:
+            value = data.get(key)
+            if isinstance(value, datetime.datetime):
+                data[key] = format_timestamp(value)
+
+        for path in self._nested:
+            self._convert_path(data, path)
+
+        for key, derive in self._derived:
+            data[key] = derive(data)
+
+        return data
+
+    def _learn(self, data: Dict[str, Any]):
+        """Look at unseen top-level keys once and remember timestamp fields"""
+        with self._lock:
+            new_keys = data.keys() - self._known_keys
+            for key in new_keys:
+                if isinstance(data[key], datetime.datetime) and key not in self._top_level:
+                    self._top_level.append(key)
+            self._known_keys = self._known_keys | new_keys
+
+    def _convert_path(self, node: Dict[str, Any], path: tuple):
+        """Convert the timestamps found at a nested path"""
+        head, rest = path[0], path[1:]
+        if head == '*':
+            keys = list(node.keys())
+        elif head in node:
+            keys = (head,)
+        else:
+            return
+
+        for key in keys:
+            value = node[key]
+            if rest:
+                if isinstance(value, dict):
+                    self._convert_path(value, rest)
+            elif isinstance(value, datetime.datetime):
+                node[key] = format_timestamp(value)
+
+_decoders = {}
+_decoders_lock = threading.Lock()
+
+def get_decoder(collection_name: str, timestamp_fields: Optional[Iterable[str]] = None) -> DocumentDecoder:
+    """
+    Get the shared decoder for a collection
+
+    Args:
+        collection_name (str): Name of the collection
+        timestamp_fields (Optional[Iterable[str]]): Schema to use when the
+            decoder is created; defaults to COLLECTION_SCHEMAS
+
+    Returns:
+        DocumentDecoder: Decoder shared by every read path of the collection
+    """
+    decoder = _decoders.get(collection_name)
+    if decoder is None:
+        with _decoders_lock:
+            decoder = _decoders.get(collection_name)
+            if decoder is None:
+                if timestamp_fields is None:
+                    timestamp_fields = COLLECTION_SCHEMAS.get(collection_name, DEFAULT_SCHEMA)
+                decoder = DocumentDecoder(timestamp_fields, DERIVED_FIELDS.get(collection_name))
+                _decoders[collection_name] = decoder
+    return decoder
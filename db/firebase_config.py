@@ -1,6 +1,11 @@
 import firebase_admin
 from firebase_admin import credentials
 from firebase_admin import firestore
+from firebase_admin import firestore_async
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1.field_path import FieldPath
+import copy
+import itertools
 import os
 import json
 import uuid
@@ -17,6 +22,44 @@ class MockFirestore:
         if name not in self.collections:
             self.collections[name] = MockCollection(name)
         return self.collections[name]
+    
+    def batch(self):
+        return MockWriteBatch()
+    
+    def write_option(self, last_update_time=None):
+        return MockWriteOption(last_update_time)
+
+class MockWriteOption:
+    """
+    A mock implementation of a Firestore write precondition
+    """
+    def __init__(self, last_update_time=None):
+        self.last_update_time = last_update_time
+    
+    def check(self, doc):
+        if doc.update_time != self.last_update_time:
+            raise gcp_exceptions.FailedPrecondition(f"Document {doc.id} was modified")
+
+class MockWriteBatch:
+    """
+    A mock implementation of a Firestore write batch
+    """
+    def __init__(self):
+        self._writes = []
+    
+    def set(self, doc_ref, data, merge=False):
+        self._writes.append((doc_ref, data, merge))
+    
+    def delete(self, doc_ref):
+        self._writes.append((doc_ref, None, False))
+    
+    def commit(self):
+        for doc_ref, data, merge in self._writes:
+            if data is None:
+                doc_ref.delete()
+            else:
+                doc_ref.set(data, merge=merge)
+        self._writes = []
 
 class MockCollection:
     """
@@ -28,20 +71,23 @@ class MockCollection:
     
     def document(self, doc_id):
         if doc_id not in self.documents:
-            self.documents[doc_id] = MockDocument(doc_id, {})
+            self.documents[doc_id] = MockDocument(doc_id, {}, self)
         return self.documents[doc_id]
     
     def add(self, data):
         doc_id = str(uuid.uuid4())
-        doc = MockDocument(doc_id, data)
+        doc = MockDocument(doc_id, data, self)
         self.documents[doc_id] = doc
         return None, doc
     
     def stream(self):
         return list(self.documents.values())
     
+    def list_documents(self):
+        return list(self.documents.values())
+    
     def where(self, field, op, value):
-        return MockQuery(self, field, op, value)
+        return MockQuery(self, [(field, op, value)])
     
     def on_snapshot(self, callback):
         """Mock on_snapshot that just returns a no-op unsubscribe function"""
@@ -53,11 +99,24 @@ class MockDocument:
     """
     A mock implementation of a Firestore document
     """
-    def __init__(self, id, data):
+    # Update times only need to differ between versions, so a counter will do
+    _versions = itertools.count(1)
+    
+    def __init__(self, id, data, collection=None):
         self.id = id
         self._data = data
+        self._collection = collection
+        self.update_time = next(self._versions)
+    
+    def _written(self):
+        self.update_time = next(self._versions)
+        return MockWriteResult(self.update_time)
     
-    def get(self):
+    def get(self, field_paths=None):
+        return self
+    
+    @property
+    def reference(self):
         return self
     
     @property
@@ -65,34 +124,120 @@ class MockDocument:
         return True
     
     def to_dict(self):
-        return self._data
+        # A fresh copy on every read, like with the real client
+        return copy.deepcopy(self._data)
     
-    def set(self, data):
+    def create(self, data):
+        # Documents only exist once written; document() makes empty placeholders
+        if self._data:
+            raise gcp_exceptions.AlreadyExists(f"Document already exists: {self.id}")
         self._data = data
+        return self._written()
     
-    def update(self, data):
-        self._data.update(data)
+    def set(self, data, merge=False):
+        if isinstance(merge, (list, tuple)):
+            # Only the named field paths are replaced, each as a whole
+            for path in merge:
+                parts = FieldPath.from_api_repr(path).parts
+                source, node = data, self._data
+                for part in parts[:-1]:
+                    source = source[part]
+                    if not isinstance(node.get(part), dict):
+                        node[part] = {}
+                    node = node[part]
+                node[parts[-1]] = copy.deepcopy(source[parts[-1]])
+        elif merge:
+            # Nested maps are merged too, like with the real client
+            def merge_into(target, source):
+                for key, value in source.items():
+                    if value is firestore.DELETE_FIELD:
+                        target.pop(key, None)
+                    elif isinstance(value, dict) and isinstance(target.get(key), dict):
+                        merge_into(target[key], value)
+                    else:
+                        target[key] = value
+            merge_into(self._data, data)
+        else:
+            self._data = data
+        return self._written()
+    
+    def update(self, data, option=None):
+        if option is not None:
+            option.check(self)
+        # Keys are field paths, like with the real client
+        for key, value in data.items():
+            try:
+                parts = FieldPath.from_api_repr(key).parts
+            except ValueError:
+                parts = (key,)
+            node = self._data
+            for part in parts[:-1]:
+                if not isinstance(node.get(part), dict):
+                    node[part] = {}
+                node = node[part]
+            if value is firestore.DELETE_FIELD:
+                node.pop(parts[-1], None)
+            else:
+                node[parts[-1]] = value
+        return self._written()
     
     def delete(self):
-        pass
+        if self._collection is not None:
+            self._collection.documents.pop(self.id, None)
+
+class MockWriteResult:
+    """
+    A mock implementation of the result of a Firestore write
+    """
+    def __init__(self, update_time):
+        self.update_time = update_time
 
 class MockQuery:
     """
     A mock implementation of a Firestore query
     """
-    def __init__(self, collection, field, op, value):
+    OPERATORS = {
+        '==': lambda a, b: a == b,
+        '!=': lambda a, b: a != b,
+        '<': lambda a, b: a < b,
+        '<=': lambda a, b: a <= b,
+        '>': lambda a, b: a > b,
+        '>=': lambda a, b: a >= b,
+        'in': lambda a, b: a in b,
+        'not-in': lambda a, b: a not in b,
+        'array-contains': lambda a, b: isinstance(a, list) and b in a,
+    }
+    
+    def __init__(self, collection, filters):
         self.collection = collection
-        self.field = field
-        self.op = op
-        self.value = value
+        self.filters = list(filters)
+    
+    def where(self, field, op, value):
+        return MockQuery(self.collection, self.filters + [(field, op, value)])
+    
+    def _matches(self, doc):
+        for field, op, value in self.filters:
+            if field == FieldPath.document_id():
+                # Document ID filters compare references, like the real client
+                actual = doc.id
+                value = [ref.id for ref in value] if isinstance(value, list) else value.id
+            elif field in doc._data:
+                actual = doc._data[field]
+            else:
+                return False
+            try:
+                if not self.OPERATORS[op](actual, value):
+                    return False
+            except (KeyError, TypeError):
+                return False
+        return True
     
     def stream(self):
-        results = []
-        for doc in self.collection.documents.values():
-            if self.field in doc._data:
-                if self.op == '==' and doc._data[self.field] == self.value:
-                    results.append(doc)
-        return results
+        return [doc for doc in self.collection.documents.values() if self._matches(doc)]
+    
+    def on_snapshot(self, callback):
+        """Mock on_snapshot that just returns a no-op unsubscribe function"""
+        return self.collection.on_snapshot(callback)
 
 class FirebaseConfig:
     """
@@ -100,6 +245,7 @@ class FirebaseConfig:
     """
     _instance = None
     _db = None
+    _async_db = None
     _use_mock = False
     
     def __new__(cls):
@@ -187,6 +333,38 @@ class FirebaseConfig:
         
         return cls._db
     
+    @classmethod
+    def get_async_db(cls):
+        """
+        Get the asyncio Firestore client
+        
+        The client belongs to the event loop it is first used on, so it
+        should only be used from the loop of db.async_data_access.
+        
+        Returns:
+            firestore_async.AsyncClient: Client, or None with the mock
+                implementation (which has no async variant)
+        """
+        if cls._db is None and not cls._use_mock:
+            cls.initialize()
+        
+        if cls._use_mock:
+            return None
+        
+        if cls._async_db is None:
+            cls._async_db = firestore_async.client(cls._app)
+        return cls._async_db
+    
+    @classmethod
+    def is_mock(cls):
+        """
+        Check if the mock implementation is in use
+        
+        Returns:
+            bool: True if using the mock implementation, False otherwise
+        """
+        return cls._use_mock
+    
     @classmethod
     def is_initialized(cls):
         """
@@ -207,6 +385,7 @@ class FirebaseConfig:
                 firebase_admin.delete_app(cls._app)
                 cls._app = None
                 cls._db = None
+                cls._async_db = None
                 cls._cred = None
             except Exception as e:
                 print(f"Error closing Firebase connection: {e}") 
\ No newline at end of file
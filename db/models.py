@@ -0,0 +1,305 @@
+from db.result_summary import SUMMARY_FIELD, summarize_result
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Any, Optional
+import sys
+
+def slotted(cls):
+    """
+    Turn a class into a dataclass with __slots__
+
+    dataclass(slots=True) only exists on Python 3.10+, so on older versions
+    the class is rebuilt with __slots__ after the dataclass is generated.
+    """
+    if sys.version_info >= (3, 10):
+        return dataclass(slots=True)(cls)
+
+    cls = dataclass(cls)
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+class Record:
+    """
+    Base class for the record models.
+
+    Every model maps Firestore keys to attributes through FIELDS and keeps
+    unknown keys in 'extra', so documents round-trip without losing data.
+    Fields left as None are not written, so a round trip never adds fields
+    a document did not have.
+    Records also support read-only dict access (get, [] and in) so code
+    written against the raw dictionaries keeps working.
+    """
+    __slots__ = ()
+
+    # (firestore key, attribute name) pairs, 'id' is handled separately
+    FIELDS = ()
+
+    @classmethod
+    def from_firestore(cls, data: Dict[str, Any]):
+        """
+        Build a record from a decoded Firestore document
+
+        Args:
+            data (Dict[str, Any]): Document data including its 'id'
+
+        Returns:
+            Record: The record
+        """
+        data = dict(data)
+        kwargs = {'id': data.pop('id', None)}
+        for key, attr in cls.FIELDS:
+            if key in data:
+                kwargs[attr] = data.pop(key)
+        kwargs['extra'] = data or None
+        return cls(**kwargs)
+
+    def to_firestore(self, include_id: bool = False) -> Dict[str, Any]:
+        """
+        Convert the record to a Firestore document
+
+        Args:
+            include_id (bool): Whether to include the document ID
+
+        Returns:
+            Dict[str, Any]: Document data
+        """
+        data = dict(self.extra) if self.extra else {}
+        for key, attr in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        if include_id and self.id is not None:
+            data['id'] = self.id
+        return data
+
+    def _attr_for(self, key):
+        """Find the attribute name for a Firestore key"""
+        if key == 'id':
+            return 'id'
+        for field_key, attr in self.FIELDS:
+            if field_key == key:
+                return attr
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a field by its Firestore key
+
+        Args:
+            key (str): Firestore field name
+            default (Any): Value returned when the field is missing
+
+        Returns:
+            Any: Field value or default
+        """
+        attr = self._attr_for(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            return default if value is None else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return default
+
+    def keys(self) -> List[str]:
+        """
+        Get the Firestore keys that are set on the record
+
+        Returns:
+            List[str]: Field names
+        """
+        return list(self.to_firestore(include_id=True).keys())
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._attr_for(key)
+        if attr is not None:
+            return getattr(self, attr)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+@slotted
+class Student(Record):
+    """A student record from the students collection"""
+    id: Optional[str] = None
+    name: Optional[str] = None
+    class_name: Optional[str] = None
+    section: Optional[str] = None
+    roll_no: Optional[str] = None
+    phone: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[Any] = None
+    updated_at: Optional[Any] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = (
+        ('name', 'name'),
+        ('class', 'class_name'),
+        ('section', 'section'),
+        ('roll_no', 'roll_no'),
+        ('phone', 'phone'),
+        ('status', 'status'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
+@slotted
+class Teacher(Record):
+    """A teacher record from the teachers collection"""
+    id: Optional[str] = None
+    name: Optional[str] = None
+    subject: Optional[str] = None
+    phone: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[Any] = None
+    updated_at: Optional[Any] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = (
+        ('name', 'name'),
+        ('subject', 'subject'),
+        ('phone', 'phone'),
+        ('status', 'status'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
+@slotted
+class Course(Record):
+    """A course record from the courses collection"""
+    id: Optional[str] = None
+    name: Optional[str] = None
+    teacher: Optional[str] = None
+    students: Any = None
+    status: Optional[str] = None
+    created_at: Optional[Any] = None
+    updated_at: Optional[Any] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = (
+        ('name', 'name'),
+        ('teacher', 'teacher'),
+        ('students', 'students'),
+        ('status', 'status'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
+@slotted
+class StudentMarks(Record):
+    """One student's entry in the 'marks' map of a result sheet"""
+    id: Optional[str] = None
+    name: str = ''
+    result: Dict[str, Any] = field(default_factory=dict)
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = (
+        ('name', 'name'),
+        ('result', 'result'),
+    )
+
+    @property
+    def roll_no(self) -> Optional[str]:
+        """The roll number is the key of the entry in the marks map"""
+        return self.id
+
+    def total(self) -> float:
+        """
+        Sum the numeric marks of the student
+
+        Returns:
+            float: Total obtained marks
+        """
+        total = 0
+        for mark in self.result.values():
+            try:
+                total += float(mark)
+            except (ValueError, TypeError):
+                pass
+        return total
+
+@slotted
+class ResultSheet(Record):
+    """A result sheet from the result_data collection"""
+    id: Optional[str] = None
+    class_number: Any = None
+    section: Optional[str] = None
+    class_incharge: Optional[str] = None
+    test_name: Optional[str] = None
+    completed: Optional[bool] = None
+    status: Optional[Dict[str, str]] = None
+    max_marks: Optional[Dict[str, Any]] = None
+    marks: Optional[Dict[str, StudentMarks]] = None
+    uploaded_by: Optional[Dict[str, str]] = None
+    strength: Optional[int] = None
+    created_at: Optional[Any] = None
+    updated_at: Optional[Any] = None
+    summary: Optional[Dict[str, Any]] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = (
+        ('class', 'class_number'),
+        ('section', 'section'),
+        ('class_incharge', 'class_incharge'),
+        ('test_name', 'test_name'),
+        ('completed', 'completed'),
+        ('status', 'status'),
+        ('maxMarks', 'max_marks'),
+        ('marks', 'marks'),
+        ('uploaded_by', 'uploaded_by'),
+        ('strength', 'strength'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        (SUMMARY_FIELD, 'summary'),
+    )
+
+    @classmethod
+    def from_firestore(cls, data: Dict[str, Any]):
+        sheet = super(ResultSheet, cls).from_firestore(data)
+        if sheet.summary is None:
+            sheet.summary = summarize_result(data)
+        if sheet.marks is not None:
+            sheet.marks = {
+                str(roll_no): StudentMarks.from_firestore(dict(entry or {}, id=str(roll_no)))
+                for roll_no, entry in sheet.marks.items()
+            }
+        return sheet
+
+    def to_firestore(self, include_id: bool = False) -> Dict[str, Any]:
+        data = super(ResultSheet, self).to_firestore(include_id)
+        # The summary is derived when decoding and is not stored
+        data.pop(SUMMARY_FIELD, None)
+        if self.marks is not None:
+            data['marks'] = {
+                roll_no: entry.to_firestore() for roll_no, entry in self.marks.items()
+            }
+        return data
+
+    def subjects(self) -> List[str]:
+        """
+        Get the subjects of the sheet in their stored order
+
+        Returns:
+            List[str]: Subject names
+        """
+        return list((self.status or {}).keys())
+
+def to_data(record: Any) -> Dict[str, Any]:
+    """
+    Get Firestore data from a record or pass a plain dictionary through
+
+    Args:
+        record (Any): Record model or dictionary
+
+    Returns:
+        Dict[str, Any]: Document data
+    """
+    if isinstance(record, Record):
+        return record.to_firestore()
+    return record
@@ -0,0 +1,183 @@
+from db.database_utils import DOCUMENT_ID
+from db.data_access import main_data
+from db.async_data_access import run, async_main_data
+from typing import List, Dict, Any, Optional, Callable
+import threading
+
+APP_DATA_DOCUMENT = "app_data"
+CLASS_INCHARGES_DOCUMENT = "class_incharges"
+
+# Used when app_data has no class list
+DEFAULT_CLASSES = ['11', '12']
+
+class ReferenceTables:
+    """
+    Immutable lookup tables derived from main_data/app_data and
+    main_data/class_incharges. A new instance is built on every change so
+    readers never see a half-updated table.
+    """
+
+    def __init__(self, app_data: Optional[Dict[str, Any]], class_incharges: Optional[Dict[str, Any]]):
+        app_data = app_data or {}
+        class_incharges = class_incharges or {}
+
+        self.classes = [str(cls) for cls in app_data.get('classes', DEFAULT_CLASSES)]
+
+        self.sections = {
+            str(cls): list(sections or [])
+            for cls, sections in (app_data.get('sections') or {}).items()
+        }
+
+        self.subjects = {}
+        for cls, per_section in (app_data.get('section_subjects') or {}).items():
+            for section, subjects in (per_section or {}).items():
+                self.subjects[(str(cls), section)] = list(subjects or [])
+
+        self.incharges = {}
+        for cls, per_section in class_incharges.items():
+            if isinstance(per_section, dict):
+                for section, teacher_name in per_section.items():
+                    self.incharges[(str(cls), section)] = teacher_name
+
+class ReferenceDataService:
+    """
+    Keeps the classes, sections, section subjects and class incharges used
+    by the Create Result dialog in memory.
+
+    Data is read once and then kept live through a listener scoped to the
+    two reference documents, so opening the dialog and changing its
+    dropdowns needs no I/O.
+    """
+
+    def __init__(self):
+        self._tables = None
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        self._listeners = []
+
+    def start(self) -> Callable[[], None]:
+        """
+        Start following main_data for changes
+
+        Returns:
+            Callable[[], None]: Function to call to stop following changes
+        """
+        if self._unsubscribe is None:
+            # Only the two reference documents, not the rest of main_data
+            self._unsubscribe = main_data.watch(
+                self._handle_snapshot,
+                filters=[(DOCUMENT_ID, 'in', [APP_DATA_DOCUMENT, CLASS_INCHARGES_DOCUMENT])]
+            )
+        return self.stop
+
+    def stop(self):
+        """Stop following main_data"""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def ensure_loaded(self) -> ReferenceTables:
+        """
+        Get the lookup tables, reading them from the database only if no
+        snapshot has arrived yet
+
+        Returns:
+            ReferenceTables: Current lookup tables
+        """
+        tables = self._tables
+        if tables is None:
+            with self._lock:
+                if self._tables is None:
+                    # Both documents in one multi-document get
+                    docs = run(async_main_data.get_many([APP_DATA_DOCUMENT, CLASS_INCHARGES_DOCUMENT]))
+                    self._tables = ReferenceTables(
+                        docs.get(APP_DATA_DOCUMENT),
+                        docs.get(CLASS_INCHARGES_DOCUMENT)
+                    )
+                tables = self._tables
+        return tables
+
+    def refresh(self):
+        """Drop the tables so the next access reads them again"""
+        with self._lock:
+            self._tables = None
+
+    def add_listener(self, callback: Callable[[ReferenceTables], None]):
+        """
+        Register a callback called with the new tables after every change
+
+        Args:
+            callback (Callable): Function to call
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[ReferenceTables], None]):
+        """Unregister a change callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get_classes(self) -> List[str]:
+        """
+        Get the classes
+
+        Returns:
+            List[str]: Class names
+        """
+        return self.ensure_loaded().classes
+
+    def get_sections(self, class_name: str) -> List[str]:
+        """
+        Get the sections of a class
+
+        Args:
+            class_name (str): Class name
+
+        Returns:
+            List[str]: Section names
+        """
+        return self.ensure_loaded().sections.get(str(class_name), [])
+
+    def get_subjects(self, class_name: str, section: str) -> List[str]:
+        """
+        Get the subjects taught in a section
+
+        Args:
+            class_name (str): Class name
+            section (str): Section name
+
+        Returns:
+            List[str]: Subject names
+        """
+        return self.ensure_loaded().subjects.get((str(class_name), section), [])
+
+    def get_incharge(self, class_name: str, section: str) -> Optional[str]:
+        """
+        Get the class incharge of a section
+
+        Args:
+            class_name (str): Class name
+            section (str): Section name
+
+        Returns:
+            Optional[str]: Teacher name or None if none is assigned
+        """
+        return self.ensure_loaded().incharges.get((str(class_name), section))
+
+    def _handle_snapshot(self, docs: List[Dict[str, Any]]):
+        """Rebuild the tables from a main_data snapshot"""
+        try:
+            by_id = {doc.get('id'): doc for doc in docs or []}
+            if APP_DATA_DOCUMENT not in by_id and CLASS_INCHARGES_DOCUMENT not in by_id:
+                return
+
+            tables = ReferenceTables(by_id.get(APP_DATA_DOCUMENT), by_id.get(CLASS_INCHARGES_DOCUMENT))
+            with self._lock:
+                self._tables = tables
+
+            for callback in list(self._listeners):
+                callback(tables)
+        except Exception as e:
+            print(f"Error updating reference data: {e}")
+
+# Shared reference data service
+reference_data = ReferenceDataService()
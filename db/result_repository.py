@@ -0,0 +1,120 @@
+from db.data_access import DataAccess
+from db.models import ResultSheet, to_data
+
+class ResultRepository:
+    """
+    Repository class for result sheet operations
+    """
+
+    def __init__(self):
+        # Use the DataAccess class to interact with the result_data collection
+        self.data_access = DataAccess('result_data')
+
+    def get_all(self):
+        """
+        Get all result sheets from the database
+
+        Returns:
+            list: List of ResultSheet records
+        """
+        return self._to_models(self.data_access.get_all())
+
+    def get_by_id(self, result_id):
+        """
+        Get a result sheet by ID
+
+        Args:
+            result_id (str): Result sheet ID
+
+        Returns:
+            ResultSheet: Result sheet or None if not found
+        """
+        data = self.data_access.get_by_id(result_id)
+        return ResultSheet.from_firestore(data) if data else None
+
+    def add(self, result_data):
+        """
+        Add a new result sheet
+
+        Args:
+            result_data (ResultSheet or dict): Result sheet data
+
+        Returns:
+            str: ID of the created result sheet or None if failed
+        """
+        # Timestamps are automatically added by the DataAccess class
+        return self.data_access.add(to_data(result_data))
+
+    def update(self, result_id, result_data):
+        """
+        Update a result sheet
+
+        Args:
+            result_id (str): Result sheet ID
+            result_data (ResultSheet or dict): Result sheet data to update
+
+        Returns:
+            bool: True if updated successfully, False otherwise
+        """
+        # Timestamps are automatically updated by the DataAccess class
+        return self.data_access.update(result_id, to_data(result_data))
+
+    def delete(self, result_id):
+        """
+        Delete a result sheet
+
+        utils.result_helpers.delete_result also removes the sheet from the
+        student histories.
+
+        Args:
+            result_id (str): Result sheet ID
+
+        Returns:
+            bool: True if deleted successfully, False otherwise
+        """
+        return self.data_access.delete(result_id)
+
+    def get_by_class(self, class_number):
+        """
+        Get result sheets by class
+
+        Args:
+            class_number (int): Class number
+
+        Returns:
+            list: List of ResultSheet records for the class
+        """
+        # Use the query method to filter by class
+        return self._to_models(self.data_access.query('class', '==', class_number))
+
+    def get_by_test(self, test_name):
+        """
+        Get result sheets by test name
+
+        Args:
+            test_name (str): Test name
+
+        Returns:
+            list: List of ResultSheet records for the test
+        """
+        # Use the query method to filter by test name
+        return self._to_models(self.data_access.query('test_name', '==', test_name))
+
+    def subscribe_to_changes(self, callback, filters=None):
+        """
+        Subscribe to real-time updates of result sheets
+
+        Args:
+            callback (function): Callback function to be called when data changes
+            filters (list): Optional (field, operator, value) filters, e.g.
+                [('status', '==', 'Active')], to only follow matching documents
+
+        Returns:
+            function: Unsubscribe function to stop listening for changes
+        """
+        # Use the watch method to subscribe to changes
+        return self.data_access.watch(lambda docs: callback(self._to_models(docs)), filters=filters)
+
+    def _to_models(self, docs):
+        """Convert decoded documents to ResultSheet records"""
+        return [ResultSheet.from_firestore(doc) for doc in docs or []]
@@ -0,0 +1,62 @@
+from typing import Dict, Any
+
+# Key under which decoded result documents carry their summary. It is
+# derived on every decode and never written back to the database.
+SUMMARY_FIELD = 'summary'
+
+PENDING = 'Pending'
+READY = 'Ready'
+
+def summarize_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive the status summary of a result sheet
+
+    Args:
+        data (Dict[str, Any]): Result sheet data
+
+    Returns:
+        Dict[str, Any]: subjects, pending and ready counts, completed flag,
+        overall state ('Pending' or 'Ready') and the total of maxMarks
+    """
+    statuses = data.get('status')
+    if not isinstance(statuses, dict):
+        statuses = {}
+
+    pending = ready = 0
+    for value in statuses.values():
+        value = str(value).lower()
+        if value == 'pending':
+            pending += 1
+        elif value == 'ready':
+            ready += 1
+
+    max_total = 0
+    for value in (data.get('maxMarks') or {}).values():
+        try:
+            max_total += float(value)
+        except (ValueError, TypeError):
+            pass
+
+    return {
+        'subjects': len(statuses),
+        'pending': pending,
+        'ready': ready,
+        'completed': pending == 0,
+        'state': PENDING if pending else READY,
+        'max_total': int(max_total) if float(max_total).is_integer() else max_total,
+    }
+
+def get_summary(result: Any) -> Dict[str, Any]:
+    """
+    Get the summary carried by a decoded result, deriving it if missing
+
+    Args:
+        result: Result sheet dict or record
+
+    Returns:
+        Dict[str, Any]: Summary as returned by summarize_result
+    """
+    summary = result.get(SUMMARY_FIELD)
+    if summary is None:
+        summary = summarize_result(result)
+    return summary
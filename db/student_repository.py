@@ -1,7 +1,13 @@
 from db.data_access import DataAccess
+from db.models import Student, to_data
 from firebase_admin import firestore
 import datetime
 
+def student_id_of(student):
+    """Student ID of a record or dict, None if it has none"""
+    student_id = str(student.get('id') or '').strip()
+    return student_id or None
+
 class StudentRepository:
     """
     Repository class for student data operations
@@ -16,9 +22,9 @@ class StudentRepository:
         Get all students from the database
         
         Returns:
-            list: List of student dictionaries
+            list: List of Student records
         """
-        return self.data_access.get_all()
+        return self._to_models(self.data_access.get_all())
     
     def get_by_id(self, student_id):
         """
@@ -28,22 +34,61 @@ class StudentRepository:
             student_id (str): Student ID
             
         Returns:
-            dict: Student data or None if not found
+            Student: Student record or None if not found
         """
-        return self.data_access.get_by_id(student_id)
+        data = self.data_access.get_by_id(student_id)
+        return Student.from_firestore(data) if data else None
     
     def add(self, student_data):
         """
         Add a new student
         
+        A student ID in the data is used as the document ID, as with
+        add_many, so an imported roster recognizes the student.
+        
         Args:
-            student_data (dict): Student data
+            student_data (Student or dict): Student data
             
         Returns:
             str: ID of the created student or None if failed
+            
+        Raises:
+            DocumentExists: If a student with the ID already exists
         """
+        data = to_data(student_data)
+        student_id = student_id_of(student_data)
+        if student_id:
+            return student_id if self.data_access.create(student_id, dict(data, id=student_id)) else None
+        
         # Timestamps are automatically added by the DataAccess class
-        return self.data_access.add(student_data)
+        return self.data_access.add(data)
+    
+    def add_many(self, students, on_progress=None):
+        """
+        Add many students in batched writes, using each student's ID as the document ID
+        
+        Args:
+            students (list): Student records or dicts, each with an 'id'
+            on_progress (function): Called with (written, total) after each batch
+            
+        Returns:
+            int: Number of students written
+        """
+        documents = {}
+        for student in students:
+            data = dict(to_data(student))
+            data['id'] = str(student.get('id'))
+            documents[data['id']] = data
+        return self.data_access.set_many(documents, on_progress)
+    
+    def get_ids(self):
+        """
+        Get the IDs of all students without reading their data
+        
+        Returns:
+            list: Student IDs
+        """
+        return self.data_access.get_ids()
     
     def update(self, student_id, student_data):
         """
@@ -51,13 +96,29 @@ class StudentRepository:
         
         Args:
             student_id (str): Student ID
-            student_data (dict): Student data to update
+            student_data (Student or dict): Student data to update
             
         Returns:
             bool: True if updated successfully, False otherwise
+            
+        Raises:
+            WriteConflict: If someone else changed the student since it was read
         """
         # Timestamps are automatically updated by the DataAccess class
-        return self.data_access.update(student_id, student_data)
+        return self.data_access.update(student_id, to_data(student_data))
+    
+    def edit_version(self, student_id):
+        """
+        Get the version of a student to base an edit on (see update_optimistic)
+        
+        Args:
+            student_id (str): Student ID
+            
+        Returns:
+            tuple: Student record (None if not found) and the update time it was read at
+        """
+        data, update_time = self.data_access.edit_version(student_id)
+        return (Student.from_firestore(data) if data else None), update_time
     
     def delete(self, student_id):
         """
@@ -71,6 +132,58 @@ class StudentRepository:
         """
         return self.data_access.delete(student_id)
     
+    def add_optimistic(self, student_data, on_done=None, on_conflict=None):
+        """
+        Add a student, showing it on every screen before the server confirms it
+        
+        A student ID in the data is used as the document ID (see add).
+        
+        Args:
+            student_data (Student or dict): Student data
+            on_done (function): Called with True/False from a background thread
+                once the server accepted or rejected the student
+            on_conflict (function): Called instead of on_done if a student
+                with the same ID already exists
+            
+        Returns:
+            str: ID of the new student
+        """
+        return self.data_access.add_optimistic(to_data(student_data), on_done, student_id_of(student_data), on_conflict)
+    
+    def update_optimistic(self, student_id, student_data, on_done=None, base=None, update_time=None, on_conflict=None):
+        """
+        Update a student, showing the change before the server confirms it
+        
+        Args:
+            student_id (str): Student ID
+            student_data (Student or dict): Student data to update
+            on_done (function): Called with True/False from a background thread;
+                a rejected change is rolled back on every screen
+            base (Student): Version the user edited, from edit_version
+            update_time: Update time from edit_version
+            on_conflict (function): Called instead of on_done if someone else
+                changed the student since base was read
+        """
+        self.data_access.update_optimistic(
+            student_id,
+            to_data(student_data),
+            on_done,
+            to_data(base) if base is not None else None,
+            update_time,
+            on_conflict
+        )
+    
+    def delete_optimistic(self, student_id, on_done=None):
+        """
+        Delete a student, hiding it before the server confirms the deletion
+        
+        Args:
+            student_id (str): Student ID
+            on_done (function): Called with True/False from a background thread;
+                a rejected deletion brings the student back
+        """
+        self.data_access.delete_optimistic(student_id, on_done)
+    
     def search(self, query):
         """
         Search for students by name, class, or status
@@ -79,7 +192,7 @@ class StudentRepository:
             query (str): Search query
             
         Returns:
-            list: List of matching student dictionaries
+            list: List of matching Student records
         """
         try:
             # Convert query to lowercase for case-insensitive search
@@ -113,20 +226,20 @@ class StudentRepository:
             class_name (str): Class name
             
         Returns:
-            list: List of student dictionaries in the specified class
+            list: List of Student records in the specified class
         """
         # Use the query method to filter by class
-        return self.data_access.query('class', '==', class_name)
+        return self._to_models(self.data_access.query('class', '==', class_name))
     
     def get_active_students(self):
         """
         Get all active students
         
         Returns:
-            list: List of active student dictionaries
+            list: List of active Student records
         """
         # Use the query method to filter by status
-        return self.data_access.query('status', '==', 'Active')
+        return self._to_models(self.data_access.query('status', '==', 'Active'))
             
     def count_students(self):
         """
@@ -138,15 +251,21 @@ class StudentRepository:
         # Get all students and count them
         return len(self.get_all())
     
-    def subscribe_to_changes(self, callback):
+    def subscribe_to_changes(self, callback, filters=None):
         """
         Subscribe to real-time updates of student data
         
         Args:
             callback (function): Callback function to be called when data changes
+            filters (list): Optional (field, operator, value) filters, e.g.
+                [('status', '==', 'Active')], to only follow matching documents
             
         Returns:
             function: Unsubscribe function to stop listening for changes
         """
         # Use the watch method to subscribe to changes
-        return self.data_access.watch(callback) 
\ No newline at end of file
+        return self.data_access.watch(lambda docs: callback(self._to_models(docs)), filters=filters)
+    
+    def _to_models(self, docs):
+        """Convert decoded documents to Student records"""
+        return [Student.from_firestore(doc) for doc in docs or []] 
\ No newline at end of file
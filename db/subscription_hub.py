@@ -0,0 +1,343 @@
+from db.database_utils import DatabaseUtils
+from db.data_cache import data_cache
+from db.document_decoder import get_decoder
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
+import threading
+
+def channel_key(collection_name: str, filters: Optional[Sequence[Tuple[str, str, Any]]] = None):
+    """
+    Build the key identifying a listener
+
+    Watches of the same collection with the same filters (in any order)
+    share a listener; a whole-collection watch is keyed by its name.
+
+    Args:
+        collection_name (str): Name of the collection
+        filters (Sequence[Tuple[str, str, Any]]): (field, operator, value) filters
+
+    Returns:
+        Hashable key
+    """
+    if not filters:
+        return collection_name
+    normalized = []
+    for field, operator, value in filters:
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(value, key=str)) if isinstance(value, set) else tuple(value)
+        normalized.append((str(field), operator, value))
+    return (collection_name, tuple(sorted(normalized, key=repr)))
+
+class _Channel:
+    """
+    One Firestore listener and the in-process subscribers fed from it
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.subscribers = {}
+        self.next_token = 0
+        self.unsubscribe = None
+        # Latest snapshot from the server, and what subscribers were given
+        # (the snapshot with pending local writes applied)
+        self.server_docs = None
+        self.docs = None
+
+class _PendingWrite:
+    """
+    A local write shown to subscribers before the server acknowledged it
+    """
+
+    def __init__(self, doc_id, data, merge):
+        self.doc_id = doc_id
+        # None for a delete
+        self.data = data
+        self.merge = merge
+        self.acknowledged = False
+
+class SubscriptionHub:
+    """
+    Process-wide hub that opens a single Firestore listener per collection
+    (or per filtered query of a collection) and fans out every snapshot to
+    any number of in-process subscribers.
+
+    The listener is reference counted: it is opened by the first subscriber
+    and closed when the last subscriber unsubscribes.
+
+    Local writes can be shown optimistically: begin_write() applies them on
+    top of the latest snapshot of whole-collection watches straight away,
+    and they stay applied over later snapshots until end_write() reports
+    the server's answer. A rejected write is rolled back by redelivering
+    the snapshot without it; an acknowledged one is dropped with the next
+    snapshot, which already contains it.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.RLock()
+        # Collection name -> {write ID: _PendingWrite}, in write order
+        self._pending = {}
+        self._next_write = 0
+
+    def subscribe(
+        self,
+        collection_name: str,
+        callback: Callable[..., None],
+        include_changes: bool = False,
+        filters: Optional[Sequence[Tuple[str, str, Any]]] = None
+    ) -> Callable[[], None]:
+        """
+        Subscribe to real-time updates of a collection
+
+        Args:
+            collection_name (str): Name of the collection to watch
+            callback (Callable): Function called with the list of documents
+            include_changes (bool): Also pass the list of changes (dicts with
+                'type', 'id' and 'data') as a second argument
+            filters (Sequence[Tuple[str, str, Any]]): Optional (field, operator,
+                value) filters; only matching documents are delivered
+
+        Returns:
+            Callable[[], None]: Function to call to unsubscribe
+        """
+        key = channel_key(collection_name, filters)
+        with self._lock:
+            channel = self._channels.get(key)
+            is_new = channel is None
+            if is_new:
+                channel = _Channel(key)
+                self._channels[key] = channel
+
+            token = channel.next_token
+            channel.next_token += 1
+            channel.subscribers[token] = (callback, include_changes)
+            cached_docs = channel.docs
+
+        if is_new:
+            # First subscriber opens the underlying listener
+            unsubscribe = DatabaseUtils.watch_collection(
+                collection_name,
+                lambda docs, changes: self._dispatch(channel, docs, changes),
+                include_changes=True,
+                filters=filters
+            )
+            with self._lock:
+                channel.unsubscribe = unsubscribe
+                # Everyone may have left while the listener was starting
+                if not channel.subscribers:
+                    self._close(channel)
+        elif cached_docs is not None:
+            # Late subscribers get the current state straight away
+            self._deliver(callback, include_changes, cached_docs, [
+                {'type': 'ADDED', 'id': doc['id'], 'data': doc} for doc in cached_docs
+            ])
+
+        def unsubscribe():
+            self._unsubscribe(key, channel, token)
+
+        return unsubscribe
+
+    def get_cached(
+        self,
+        collection_name: str,
+        filters: Optional[Sequence[Tuple[str, str, Any]]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the latest snapshot received for a collection, if it is being watched
+
+        Args:
+            collection_name (str): Name of the collection
+            filters (Sequence[Tuple[str, str, Any]]): Filters of the watch
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Documents or None if not watched yet
+        """
+        with self._lock:
+            channel = self._channels.get(channel_key(collection_name, filters))
+            return channel.docs if channel else None
+
+    def subscriber_count(
+        self,
+        collection_name: str,
+        filters: Optional[Sequence[Tuple[str, str, Any]]] = None
+    ) -> int:
+        """
+        Count the in-process subscribers of a collection
+
+        Args:
+            collection_name (str): Name of the collection
+            filters (Sequence[Tuple[str, str, Any]]): Filters of the watch
+
+        Returns:
+            int: Number of active subscribers
+        """
+        with self._lock:
+            channel = self._channels.get(channel_key(collection_name, filters))
+            return len(channel.subscribers) if channel else 0
+
+    def begin_write(self, collection_name: str, doc_id: str, data: Optional[Dict[str, Any]], merge: bool = True) -> int:
+        """
+        Show a local write to the subscribers of a collection right away
+
+        Args:
+            collection_name (str): Name of the collection
+            doc_id (str): ID of the document written
+            data (Optional[Dict[str, Any]]): Fields written, None for a delete
+            merge (bool): Merge the fields into the document instead of
+                replacing it
+
+        Returns:
+            int: Write ID to pass to end_write
+        """
+        with self._lock:
+            write_id = self._next_write
+            self._next_write += 1
+            self._pending.setdefault(collection_name, {})[write_id] = _PendingWrite(doc_id, data, merge)
+        self._redeliver(collection_name, doc_id)
+        return write_id
+
+    def end_write(self, collection_name: str, write_id: int, succeeded: bool):
+        """
+        Record the server's answer to a write started with begin_write
+
+        Args:
+            collection_name (str): Name of the collection
+            write_id (int): ID returned by begin_write
+            succeeded (bool): Whether the server accepted the write
+        """
+        with self._lock:
+            pending = self._pending.get(collection_name) or {}
+            write = pending.get(write_id)
+            if write is None:
+                return
+            if succeeded:
+                # Keep showing it until a snapshot containing it arrives
+                write.acknowledged = True
+                return
+            del pending[write_id]
+        self._redeliver(collection_name, write.doc_id)
+
+    def pending_writes(self, collection_name: str) -> int:
+        """
+        Count the local writes of a collection the server has not answered yet
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            int: Number of unacknowledged writes
+        """
+        with self._lock:
+            return sum(1 for write in (self._pending.get(collection_name) or {}).values() if not write.acknowledged)
+
+    def close_all(self):
+        """
+        Close every open listener (used on application shutdown)
+        """
+        with self._lock:
+            channels = list(self._channels.values())
+            for channel in channels:
+                channel.subscribers.clear()
+                self._close(channel)
+
+    def _dispatch(self, channel, docs, changes):
+        """Store the snapshot and fan it out to every subscriber"""
+        server_docs = docs
+        with self._lock:
+            channel.server_docs = docs
+            if isinstance(channel.key, str) and self._pending.get(channel.key):
+                # Acknowledged writes are part of this snapshot now
+                pending = self._pending[channel.key]
+                for write_id in [write_id for write_id, write in pending.items() if write.acknowledged]:
+                    del pending[write_id]
+                docs = self._overlay(channel.key, docs)
+                docs_by_id = {doc['id']: doc for doc in docs}
+                overlaid = []
+                for change in changes:
+                    data = docs_by_id.get(change['id'])
+                    change_type = change['type'] if data is not None else 'REMOVED'
+                    overlaid.append(dict(change, type=change_type, data=data))
+                changes = overlaid
+            channel.docs = docs
+            subscribers = list(channel.subscribers.values())
+
+        if isinstance(channel.key, str):
+            # A whole-collection snapshot is authoritative for the warm cache
+            data_cache.put(channel.key, server_docs)
+
+        for callback, include_changes in subscribers:
+            self._deliver(callback, include_changes, docs, changes)
+
+    def _overlay(self, collection_name, docs):
+        """Apply the pending writes of a collection to a snapshot (lock must be held)"""
+        pending = self._pending.get(collection_name)
+        if not pending:
+            return docs
+
+        decoder = get_decoder(collection_name)
+        docs_by_id = {doc['id']: doc for doc in docs}
+        for write in pending.values():
+            current = docs_by_id.get(write.doc_id)
+            if write.data is None:
+                docs_by_id.pop(write.doc_id, None)
+            elif write.merge and current is None:
+                # Updating a document that is not there yet changes nothing
+                continue
+            else:
+                data = dict(current, **write.data) if write.merge else dict(write.data)
+                data['id'] = write.doc_id
+                docs_by_id[write.doc_id] = decoder.decode_data(data)
+        return list(docs_by_id.values())
+
+    def _redeliver(self, collection_name, doc_id):
+        """Send whole-collection subscribers the snapshot with the pending writes reapplied"""
+        with self._lock:
+            channel = self._channels.get(collection_name)
+            if channel is None or channel.server_docs is None:
+                # The writes are applied when the first snapshot arrives
+                return
+            before = {doc['id'] for doc in channel.docs or []}
+            docs = self._overlay(collection_name, channel.server_docs)
+            channel.docs = docs
+            subscribers = list(channel.subscribers.values())
+
+        data = next((doc for doc in docs if doc['id'] == doc_id), None)
+        if data is not None:
+            change_type = 'MODIFIED' if doc_id in before else 'ADDED'
+        elif doc_id in before:
+            change_type = 'REMOVED'
+        else:
+            return
+        changes = [{'type': change_type, 'id': doc_id, 'data': data}]
+        for callback, include_changes in subscribers:
+            self._deliver(callback, include_changes, docs, changes)
+
+    def _deliver(self, callback, include_changes, docs, changes):
+        """Call a single subscriber, isolating it from the others"""
+        try:
+            if include_changes:
+                callback(docs, changes)
+            else:
+                callback(docs)
+        except Exception as e:
+            print(f"Error in subscriber callback: {e}")
+
+    def _unsubscribe(self, key, channel, token):
+        """Drop one subscriber and close the listener when none remain"""
+        with self._lock:
+            channel.subscribers.pop(token, None)
+            if not channel.subscribers:
+                self._close(channel)
+
+    def _close(self, channel):
+        """Stop the Firestore listener of a channel (lock must be held)"""
+        if self._channels.get(channel.key) is channel:
+            del self._channels[channel.key]
+        if channel.unsubscribe:
+            try:
+                channel.unsubscribe()
+            except Exception as e:
+                print(f"Error closing listener on {channel.key}: {e}")
+            channel.unsubscribe = None
+
+# Shared hub used by every DataAccess object in the process
+subscription_hub = SubscriptionHub()
@@ -0,0 +1,252 @@
+from db.database_utils import DatabaseUtils, TOMBSTONE_RETENTION
+from db.data_cache import data_cache
+from db.document_decoder import TIMESTAMP_FORMAT, format_timestamp
+from typing import List, Dict, Any, Optional, Iterable
+import datetime
+import threading
+import time
+
+# Back-to-back reads of a collection synced this recently are served from
+# the cache without another round trip (e.g. screens opening right after
+# the startup prefetch)
+MIN_SYNC_INTERVAL = 2.0
+
+# updated_at is stamped with each client's own clock, so every refresh
+# reaches back this far to pick up writes from clients running slightly behind
+SYNC_OVERLAP = datetime.timedelta(seconds=60)
+
+# Compaction runs at most this often across all clients; the time of the
+# last run is kept in main_data/maintenance
+COMPACTION_INTERVAL = datetime.timedelta(days=1)
+MAINTENANCE_DOCUMENT = 'maintenance'
+
+class SyncManager:
+    """
+    Keeps cached collections up to date with delta reads.
+
+    The manager tracks a high-water mark (the latest updated_at seen) per
+    collection. A refresh reads only the documents updated since that mark
+    and the tombstones of documents deleted since then, instead of reading
+    the whole collection again. The documents and marks live in the
+    warm-start data cache, so they carry over between launches.
+    """
+
+    def __init__(
+        self,
+        cache=data_cache,
+        overlap: datetime.timedelta = SYNC_OVERLAP,
+        min_interval: float = MIN_SYNC_INTERVAL
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            cache (DataCache): Cache holding the documents and watermarks
+            overlap (datetime.timedelta): How far before the watermark to read
+            min_interval (float): Seconds a sync stays fresh enough to reuse
+        """
+        self.cache = cache
+        self.overlap = overlap
+        self.min_interval = min_interval
+        # Collection -> time.monotonic() of the last sync
+        self._synced = {}
+        # Collection -> {'changed', 'deleted', 'synced_at'} of the last refresh
+        self.stats = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock_for(self, collection_name: str) -> threading.Lock:
+        """Lock serializing the refreshes of one collection"""
+        with self._locks_lock:
+            return self._locks.setdefault(collection_name, threading.Lock())
+
+    def high_water_mark(self, collection_name: str) -> Optional[str]:
+        """
+        Get the latest updated_at synced for a collection
+
+        Args:
+            collection_name (str): Name of the collection
+
+        Returns:
+            Optional[str]: Watermark or None if the collection was never synced
+        """
+        return self.cache.watermark(collection_name)
+
+    def since(self, collection_name: str) -> Optional[datetime.datetime]:
+        """Point in time the next delta read starts from"""
+        watermark = self.high_water_mark(collection_name)
+        if not watermark:
+            return None
+        try:
+            return datetime.datetime.strptime(watermark, TIMESTAMP_FORMAT) - self.overlap
+        except ValueError:
+            return None
+
+    def refresh(self, collection_name: str, limit: int = 100000) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and apply the changes of a cached collection since its watermark
+
+        A read cut off by the limit is applied without advancing the
+        watermark, and does not count as a sync, so the next call reads
+        the same window again.
+
+        Args:
+            collection_name (str): Name of the collection
+            limit (int): Maximum number of changed documents to fetch
+
+        Returns:
+            Optional[Dict[str, Any]]: Change set ('changed', 'deleted',
+                'watermark'), or None if the collection is not cached yet
+        """
+        if not self.cache.has(collection_name):
+            return None
+
+        with self._lock_for(collection_name):
+            changes = DatabaseUtils.get_changes(collection_name, self.since(collection_name), limit)
+            self.apply(collection_name, changes)
+        return changes
+
+    def apply(self, collection_name: str, changes: Dict[str, Any]):
+        """
+        Apply a change set read by any client (sync or async) to the cache
+
+        Args:
+            collection_name (str): Name of the collection
+            changes (Dict[str, Any]): Change set from get_changes
+        """
+        self.cache.apply_changes(collection_name, changes)
+        if changes.get('complete', True):
+            self._synced[collection_name] = time.monotonic()
+        else:
+            self._synced.pop(collection_name, None)
+        self.stats[collection_name] = {
+            'changed': len(changes['changed']),
+            'deleted': len(changes['deleted']),
+            'synced_at': format_timestamp(datetime.datetime.now()),
+        }
+
+    def seed(self, collection_name: str, docs: List[Dict[str, Any]], limit: int = 100000):
+        """
+        Start tracking a collection from a full read
+
+        Args:
+            collection_name (str): Name of the collection
+            docs (List[Dict[str, Any]]): Documents read
+            limit (int): Limit the read used; a truncated read is not kept
+        """
+        if docs and len(docs) < limit and collection_name in self.cache.collections:
+            self.cache.put(collection_name, docs)
+            self._synced[collection_name] = time.monotonic()
+
+    def is_fresh(self, collection_name: str) -> bool:
+        """Whether a collection was synced less than min_interval ago"""
+        synced = self._synced.get(collection_name)
+        return (
+            synced is not None
+            and time.monotonic() - synced < self.min_interval
+            and self.cache.has(collection_name)
+        )
+
+    def invalidate(self, collection_name: str):
+        """Make the next sync of a collection read again (after a local write)"""
+        self._synced.pop(collection_name, None)
+
+    def sync(self, collection_name: str, limit: int = 100000) -> List[Dict[str, Any]]:
+        """
+        Get the up to date documents of a collection with as few reads as possible
+
+        Cached collections are refreshed with a delta read, unless they
+        were synced less than min_interval ago; anything else is read in
+        full, and seeds the cache if it is a cached collection.
+
+        Args:
+            collection_name (str): Name of the collection
+            limit (int): Maximum number of documents to fetch
+
+        Returns:
+            List[Dict[str, Any]]: Documents of the collection
+        """
+        # The delta read always uses the default limit; limit only caps
+        # what is returned, so a small page never truncates the sync
+        if self.is_fresh(collection_name) or self.refresh(collection_name) is not None:
+            return (self.cache.get(collection_name) or [])[:limit]
+
+        docs = DatabaseUtils.get_collection_data(collection_name, limit)
+        self.seed(collection_name, docs, limit)
+        return docs
+
+    def refresh_all(self, collection_names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Refresh every cached collection
+
+        Args:
+            collection_names (Iterable[str]): Collections to refresh, all
+                cached collections by default
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Collection -> change set
+        """
+        results = {}
+        for name in collection_names or self.cache.collections:
+            changes = self.refresh(name)
+            if changes is not None:
+                results[name] = changes
+        return results
+
+    def compact(
+        self,
+        retention: datetime.timedelta = TOMBSTONE_RETENTION,
+        collection_names: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Purge deletions older than the retention from the synced collections
+
+        A replica whose watermark is older than the retention may have
+        missed a purge; its next refresh reads the collection in full and
+        replaces its cached copy (see DataCache.apply_changes).
+
+        Args:
+            retention (datetime.timedelta): How long deletions are kept
+            collection_names (Iterable[str]): Collections to compact, all
+                cached collections by default
+
+        Returns:
+            int: Number of documents and tombstones purged
+        """
+        purged = 0
+        for name in collection_names or self.cache.collections:
+            purged += DatabaseUtils.purge_deleted(name, retention)
+        return purged
+
+    def compact_if_due(
+        self,
+        interval: datetime.timedelta = COMPACTION_INTERVAL,
+        retention: datetime.timedelta = TOMBSTONE_RETENTION
+    ) -> int:
+        """
+        Run compact unless any client already did within the interval
+
+        Costs a single document read when compaction is not due, instead
+        of two queries per collection on every launch.
+
+        Args:
+            interval (datetime.timedelta): Minimum time between compactions
+            retention (datetime.timedelta): How long deletions are kept
+
+        Returns:
+            int: Number of documents and tombstones purged
+        """
+        now = datetime.datetime.now()
+        marker = DatabaseUtils.get_document_by_id('main_data', MAINTENANCE_DOCUMENT) or {}
+        last_run = marker.get('last_compacted_at')
+        if isinstance(last_run, str) and last_run > format_timestamp(now - interval):
+            return 0
+
+        # Claim the run first so clients starting meanwhile skip it
+        DatabaseUtils.set_document(
+            'main_data', MAINTENANCE_DOCUMENT, {'last_compacted_at': format_timestamp(now)}, merge=True
+        )
+        return self.compact(retention)
+
+# Shared sync manager used by every DataAccess object in the process
+sync_manager = SyncManager()
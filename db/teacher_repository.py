@@ -1,4 +1,5 @@
 from db.data_access import DataAccess
+from db.models import Teacher, to_data
 from firebase_admin import firestore
 import datetime
 
@@ -16,9 +17,9 @@ class TeacherRepository:
         Get all teachers from the database
         
         Returns:
-            list: List of teacher dictionaries
+            list: List of Teacher records
         """
-        return self.data_access.get_all()
+        return self._to_models(self.data_access.get_all())
     
     def get_by_id(self, teacher_id):
         """
@@ -28,22 +29,23 @@ class TeacherRepository:
             teacher_id (str): Teacher ID
             
         Returns:
-            dict: Teacher data or None if not found
+            Teacher: Teacher record or None if not found
         """
-        return self.data_access.get_by_id(teacher_id)
+        data = self.data_access.get_by_id(teacher_id)
+        return Teacher.from_firestore(data) if data else None
     
     def add(self, teacher_data):
         """
         Add a new teacher
         
         Args:
-            teacher_data (dict): Teacher data
+            teacher_data (Teacher or dict): Teacher data
             
         Returns:
             str: ID of the created teacher or None if failed
         """
         # Timestamps are automatically added by the DataAccess class
-        return self.data_access.add(teacher_data)
+        return self.data_access.add(to_data(teacher_data))
     
     def update(self, teacher_id, teacher_data):
         """
@@ -51,13 +53,13 @@ class TeacherRepository:
         
         Args:
             teacher_id (str): Teacher ID
-            teacher_data (dict): Teacher data to update
+            teacher_data (Teacher or dict): Teacher data to update
             
         Returns:
             bool: True if updated successfully, False otherwise
         """
         # Timestamps are automatically updated by the DataAccess class
-        return self.data_access.update(teacher_id, teacher_data)
+        return self.data_access.update(teacher_id, to_data(teacher_data))
     
     def delete(self, teacher_id):
         """
@@ -79,7 +81,7 @@ class TeacherRepository:
             query (str): Search query
             
         Returns:
-            list: List of matching teacher dictionaries
+            list: List of matching Teacher records
         """
         try:
             # Convert query to lowercase for case-insensitive search
@@ -113,20 +115,20 @@ class TeacherRepository:
             subject (str): Subject name
             
         Returns:
-            list: List of teacher dictionaries teaching the specified subject
+            list: List of Teacher records teaching the specified subject
         """
         # Use the query method to filter by subject
-        return self.data_access.query('subject', '==', subject)
+        return self._to_models(self.data_access.query('subject', '==', subject))
     
     def get_active_teachers(self):
         """
         Get all active teachers
         
         Returns:
-            list: List of active teacher dictionaries
+            list: List of active Teacher records
         """
         # Use the query method to filter by status
-        return self.data_access.query('status', '==', 'Active')
+        return self._to_models(self.data_access.query('status', '==', 'Active'))
             
     def count_teachers(self):
         """
@@ -138,15 +140,21 @@ class TeacherRepository:
         # Get all teachers and count them
         return len(self.get_all())
         
-    def subscribe_to_changes(self, callback):
+    def subscribe_to_changes(self, callback, filters=None):
         """
         Subscribe to real-time updates of teacher data
         
         Args:
             callback (function): Callback function to be called when data changes
+            filters (list): Optional (field, operator, value) filters, e.g.
+                [('status', '==', 'Active')], to only follow matching documents
             
         Returns:
             function: Unsubscribe function to stop listening for changes
         """
         # Use the watch method to subscribe to changes
-        return self.data_access.watch(callback) 
\ No newline at end of file
+        return self.data_access.watch(lambda docs: callback(self._to_models(docs)), filters=filters)
+    
+    def _to_models(self, docs):
+        """Convert decoded documents to Teacher records"""
+        return [Teacher.from_firestore(doc) for doc in docs or []] 
\ No newline at end of file
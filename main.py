@@ -3,6 +3,12 @@ from tkinter import ttk, messagebox
 import customtkinter as ctk
 from ui.admin_dashboard import AdminDashboard
 from db.firebase_config import FirebaseConfig
+from db.subscription_hub import subscription_hub
+from db.data_cache import data_cache
+from db.sync_manager import sync_manager
+from utils.render_queue import render_queue
+import multiprocessing
+import threading
 import os
 import sys
 import json
@@ -15,6 +21,12 @@ class SmartResultSystem:
         # Initialize Firebase database
         self.initialize_firebase()
         
+        # Load the data saved by the previous session so screens open at once
+        self.load_data_cache()
+        
+        # Purge expired deletions without holding up the window
+        threading.Thread(target=self.compact_deleted, daemon=True).start()
+        
         # Get screen width and height
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
@@ -62,6 +74,24 @@ class SmartResultSystem:
             print("Using mock implementation instead.")
             FirebaseConfig.initialize()
     
+    def load_data_cache(self):
+        """Load the warm-start cache written when the app last closed"""
+        if FirebaseConfig.is_mock():
+            # Mock data does not outlive the process, so a snapshot would be stale
+            return
+        count = data_cache.load()
+        if count:
+            print(f"Loaded {count} cached documents.")
+    
+    def compact_deleted(self):
+        """Remove soft-deleted documents older than the retention period, once a day"""
+        try:
+            purged = sync_manager.compact_if_due()
+            if purged:
+                print(f"Purged {purged} deleted documents.")
+        except Exception as e:
+            print(f"Error compacting deleted documents: {e}")
+    
     def create_sample_firebase_credentials(self):
         """
         Create a sample Firebase credentials file for demonstration purposes.
@@ -98,6 +128,16 @@ class SmartResultSystem:
             if hasattr(self, 'admin_dashboard'):
                 self.admin_dashboard.cleanup()
             
+            # Save the latest data for the next launch
+            if not FirebaseConfig.is_mock():
+                data_cache.save()
+            
+            # Close any listeners that are still open
+            subscription_hub.close_all()
+            
+            # Stop the document rendering workers
+            render_queue.shutdown()
+            
             # Close the application
             self.root.destroy()
         except Exception as e:
@@ -105,6 +145,9 @@ class SmartResultSystem:
             self.root.destroy()
 
 if __name__ == "__main__":
+    # Needed for the rendering worker processes in the packaged app
+    multiprocessing.freeze_support()
+    
     # Create the root window
     root = ctk.CTk()
     app = SmartResultSystem(root)
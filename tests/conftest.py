@@ -0,0 +1,32 @@
+from db.firebase_config import FirebaseConfig, MockFirestore
+from db.data_cache import DataCache
+from db.sync_manager import SyncManager
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_db():
+    """Run every test against a fresh in-memory MockFirestore"""
+    FirebaseConfig()
+    previous = FirebaseConfig._use_mock, FirebaseConfig._mock_db
+    FirebaseConfig._use_mock = True
+    FirebaseConfig._mock_db = MockFirestore()
+    yield FirebaseConfig._mock_db
+    FirebaseConfig._use_mock, FirebaseConfig._mock_db = previous
+
+@pytest.fixture
+def cache(tmp_path):
+    """Data cache writing its snapshot into the test's temporary directory"""
+    return DataCache(str(tmp_path / "data_cache.bin"))
+
+@pytest.fixture
+def sync(cache):
+    """Sync manager over the temporary cache that never reuses a sync"""
+    return SyncManager(cache, min_interval=0)
+
+@pytest.fixture
+def isolated_cache(monkeypatch, cache, sync):
+    """Point DataAccess and the subscription hub at the temporary cache"""
+    monkeypatch.setattr('db.data_access.data_cache', cache)
+    monkeypatch.setattr('db.data_access.sync_manager', sync)
+    monkeypatch.setattr('db.subscription_hub.data_cache', cache)
+    return cache
@@ -0,0 +1,46 @@
+from db.database_utils import DatabaseUtils
+from db.firebase_config import FirebaseConfig
+from utils.analytics import AnalyticsEngine, ANALYTICS_COLLECTION, ANALYTICS_DOCUMENT
+from utils.marks_store import MarksStore
+
+def sheet(result_id, section, test_name, marks):
+    """Sheet of class 9 with math out of 100"""
+    return {
+        'id': result_id,
+        'class': 9,
+        'section': section,
+        'test_name': test_name,
+        'maxMarks': {'math': 100},
+        'marks': {roll_no: {'name': roll_no, 'result': {'math': mark}} for roll_no, mark in marks.items()},
+    }
+
+SHEETS = [
+    sheet('a', 'A', 'T1', {'1': 80, '2': 55}),
+    sheet('b', 'B', 'T2', {'1': 95}),
+]
+
+def engine_for(sheets):
+    store = MarksStore()
+    store.load(sheets)
+    return AnalyticsEngine(store)
+
+def stored_document():
+    return FirebaseConfig.get_db().collection(ANALYTICS_COLLECTION).document(ANALYTICS_DOCUMENT)
+
+def test_same_rollups_are_only_written_once():
+    assert engine_for(SHEETS).materialize()
+    written = stored_document().update_time
+
+    # Another client loaded the same sheets in another order
+    assert engine_for(list(reversed(SHEETS))).materialize()
+
+    assert stored_document().update_time == written
+
+def test_changed_rollups_are_written():
+    assert engine_for(SHEETS).materialize()
+    written = stored_document().update_time
+
+    assert engine_for(SHEETS[:1]).materialize()
+
+    assert stored_document().update_time != written
+    assert DatabaseUtils.get_document_by_id(ANALYTICS_COLLECTION, ANALYTICS_DOCUMENT)['tests'] == ['T1']
@@ -0,0 +1,83 @@
+from db.database_utils import DatabaseUtils, WriteConflict
+from db.data_access import DataAccess
+from db.firebase_config import MockDocument
+import pytest
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Payloads of every document update sent to the mock"""
+    payloads = []
+    original = MockDocument.update
+
+    def update(self, data, option=None):
+        payloads.append({key: value for key, value in data.items() if key != 'updated_at'})
+        return original(self, data, option)
+    monkeypatch.setattr(MockDocument, 'update', update)
+    return payloads
+
+@pytest.fixture
+def students(isolated_cache):
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali', 'phone': '111', 'marks': {'12': {'math': 40}}})
+    access = DataAccess('students')
+    access.get_all()
+    return access
+
+def test_diff_fields_sends_nested_paths():
+    base = {'id': 'A', 'name': 'Ali', 'marks': {'12': {'math': 40, 'urdu': 30}}}
+    data = {'id': 'A', 'name': 'Ali', 'marks': {'12': {'math': 45, 'urdu': 30}}}
+
+    assert DatabaseUtils.diff_fields(base, data) == {'marks.`12`.math': 45}
+
+def test_diff_fields_sends_maps_that_lost_keys_whole():
+    base = {'marks': {'12': {'math': 40, 'urdu': 30}}}
+    data = {'marks': {'12': {'math': 40}}}
+
+    assert DatabaseUtils.diff_fields(base, data) == {'marks.`12`': {'math': 40}}
+
+def test_update_sends_only_changed_fields(students, sent):
+    assert students.update('A', {'name': 'Ali', 'phone': '222'})
+
+    assert sent == [{'phone': '222'}]
+    assert DatabaseUtils.get_document_by_id('students', 'A')['phone'] == '222'
+
+def test_unchanged_update_writes_nothing(students, sent):
+    assert students.update('A', {'name': 'Ali', 'phone': '111'})
+
+    assert sent == []
+
+def test_record_edited_in_place_is_still_written(students, sent):
+    record = students.get_all()[0]
+    record['phone'] = '333'
+    record['marks']['12']['math'] = 50
+
+    assert students.update('A', record)
+
+    assert sent == [{'phone': '333', 'marks.`12`.math': 50}]
+    stored = DatabaseUtils.get_document_by_id('students', 'A')
+    assert stored['phone'] == '333' and stored['marks']['12']['math'] == 50
+
+def test_update_over_a_newer_version_is_a_conflict(students, sent):
+    # Someone else changed the phone after the cached copy was read
+    DatabaseUtils.set_document('students', 'A', {'phone': '999'}, merge=True)
+
+    with pytest.raises(WriteConflict):
+        students.update('A', {'phone': '111'})
+
+    assert DatabaseUtils.get_document_by_id('students', 'A')['phone'] == '999'
+
+def test_edit_fails_if_the_document_changed_since_it_was_opened(students):
+    base, update_time = students.edit_version('A')
+    DatabaseUtils.set_document('students', 'A', {'name': 'Alia'}, merge=True)
+
+    with pytest.raises(WriteConflict):
+        students.update('A', dict(base, phone='222'), base, update_time)
+
+    stored = DatabaseUtils.get_document_by_id('students', 'A')
+    assert stored['name'] == 'Alia' and stored['phone'] == '111'
+
+def test_edit_of_the_current_version_is_written(students, sent):
+    base, update_time = students.edit_version('A')
+
+    assert students.update('A', dict(base, phone='222'), base, update_time)
+
+    assert sent == [{'phone': '222'}]
@@ -0,0 +1,40 @@
+from utils.grading import GradingScale, DEFAULT_SCALE, grade_marks
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize('percentage, grade', [
+    (100, 'A+'), (90, 'A+'), (89.99, 'A'), (85, 'A'), (60, 'C+'),
+    (33, 'C'), (32.99, 'F'), (0, 'F'),
+])
+def test_band_boundaries_are_inclusive_minimums(percentage, grade):
+    assert DEFAULT_SCALE.grade(np.array([percentage])).tolist() == [grade]
+
+def test_missing_and_out_of_range_values_get_no_grade():
+    scale = GradingScale('pass-fail', [{'min': 50, 'grade': 'P', 'gpa': 1}, {'min': 10, 'grade': 'F'}])
+
+    assert scale.grade(np.array([np.nan, 5, 10, 50])).tolist() == ['', '', 'F', 'P']
+    assert np.isnan(scale.gpa(np.array([np.nan]))).all()
+
+def test_distribution_counts_every_grade():
+    counts = DEFAULT_SCALE.distribution(np.array([95, 91, 50, 10, np.nan]))
+
+    assert counts['A+'] == 2 and counts['C'] == 1 and counts['F'] == 1
+    assert sum(counts.values()) == 4
+    assert list(counts)[0] == 'A+'
+
+def test_invalid_bands_are_rejected():
+    with pytest.raises(ValueError):
+        GradingScale('empty', [])
+    with pytest.raises(ValueError):
+        GradingScale('broken', [{'grade': 'A'}])
+
+def test_grade_marks_ignores_missing_subjects():
+    marks = np.array([[45, np.nan], [20, 30]])
+    max_marks = np.array([50, 50])
+
+    graded = grade_marks(marks, max_marks, DEFAULT_SCALE)
+
+    assert graded['percentage'].tolist() == [90, 50]
+    assert graded['grade'].tolist() == ['A+', 'C']
+    assert graded['subject_grade'].tolist() == [['A+', ''], ['C', 'C+']]
+    assert graded['gpa'].tolist() == [4.0, pytest.approx(2.15)]
@@ -0,0 +1,121 @@
+from utils.marks_store import MarksStore
+import numpy as np
+
+def sheet(result_id, marks, max_marks=None, class_number=9, section='A', test_name='T1'):
+    """Result sheet in the result_data layout"""
+    return {
+        'id': result_id,
+        'class': class_number,
+        'section': section,
+        'test_name': test_name,
+        'marks': {
+            roll_no: {'name': f"Student {roll_no}", 'result': result}
+            for roll_no, result in marks.items()
+        },
+        'maxMarks': max_marks or {},
+    }
+
+def test_marks_are_indexed_by_student_subject_and_test():
+    store = MarksStore()
+    store.load([
+        sheet('r1', {'1': {'math': 40, 'urdu': 30}}, {'math': 50, 'urdu': 50}),
+        sheet('r2', {'1': {'math': 45}}, {'math': 50}, test_name='T2'),
+    ])
+
+    row = store.student_rows[(9, 'A', '1')]
+    math, urdu = store.subjects.codes['math'], store.subjects.codes['urdu']
+    t1, t2 = store.tests.codes['T1'], store.tests.codes['T2']
+
+    assert store.shape == (1, 2, 2)
+    assert store.marks()[row, math, t1] == 40
+    assert store.marks()[row, math, t2] == 45
+    assert np.isnan(store.marks()[row, urdu, t2])
+    assert store.max_marks()[row, urdu, t1] == 50
+
+def test_subjects_only_in_max_marks_grow_the_arrays():
+    store = MarksStore()
+    # Eight subjects fill the first capacity; the ninth appears only in maxMarks
+    subjects = [f"subject{i}" for i in range(8)]
+    max_marks = dict.fromkeys(subjects + ['extra'], 100)
+
+    store.apply_sheet(sheet('r1', {'1': dict.fromkeys(subjects, 60)}, max_marks))
+
+    extra = store.subjects.codes['extra']
+    assert store.max_marks()[0, extra, 0] == 100
+    assert np.isnan(store.marks()[0, extra, 0])
+
+def test_growth_keeps_existing_marks():
+    store = MarksStore()
+    for roll_no in range(1, 41):
+        store.apply_sheet(sheet(f"r{roll_no}", {str(roll_no): {'math': roll_no}}, test_name=f"T{roll_no}"))
+
+    marks = store.marks()
+    assert marks.shape == (40, 1, 40)
+    assert [marks[row, 0, row] for row in range(40)] == list(range(1, 41))
+
+def test_replacing_a_sheet_clears_its_old_cells():
+    store = MarksStore()
+    store.load([sheet('other', {'2': {'math': 10}}), sheet('r1', {'1': {'math': 40, 'urdu': 30}})])
+
+    store.apply_sheet(sheet('r1', {'1': {'math': 42}}))
+
+    row = store.student_rows[(9, 'A', '1')]
+    assert store.marks()[row, store.subjects.codes['math'], 0] == 42
+    assert np.isnan(store.marks()[row, store.subjects.codes['urdu'], 0])
+
+def test_removing_a_sheet_bumps_the_version():
+    store = MarksStore()
+    store.load([sheet('r1', {'1': {'math': 40}})])
+    version = store.version
+
+    store.remove_sheet('r1')
+
+    assert store.version == version + 1
+    assert np.isnan(store.marks()).all()
+
+class FakeResults:
+    """Stands in for results_data, counting the open watches"""
+
+    def __init__(self):
+        self.watches = 0
+
+    def watch(self, callback, include_changes=False):
+        self.watches += 1
+
+        def unsubscribe():
+            self.watches -= 1
+        return unsubscribe
+
+def test_attachments_share_one_watch_until_the_last_release():
+    store = MarksStore()
+    results = FakeResults()
+
+    release_results = store.attach(results)
+    release_analytics = store.attach(results)
+    assert results.watches == 1
+
+    release_analytics()
+    release_analytics()
+    assert store.attached and results.watches == 1
+
+    release_results()
+    assert not store.attached and results.watches == 0
+
+def test_sheets_for_the_same_section_and_test_are_merged():
+    store = MarksStore()
+    first = dict(sheet('r1', {'1': {'math': 40}}, {'math': 50}), created_at='2024-01-01 09:00:00')
+    second = dict(sheet('r2', {'1': {'math': 45, 'urdu': 30}}, {'math': 50, 'urdu': 40}), created_at='2024-01-02 09:00:00')
+    store.load([second, first])
+
+    row = store.student_rows[(9, 'A', '1')]
+    math, urdu = store.subjects.codes['math'], store.subjects.codes['urdu']
+    assert store.shape[2] == 1
+    assert store.marks()[row, math, 0] == 45
+    assert store.marks()[row, urdu, 0] == 30
+
+    # Removing the newer sheet brings back the older one's marks
+    store.remove_sheet('r2')
+
+    assert store.marks()[row, math, 0] == 40
+    assert np.isnan(store.marks()[row, urdu, 0])
+    assert store.max_marks()[row, math, 0] == 50
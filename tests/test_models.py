@@ -0,0 +1,20 @@
+from db.models import Student, Teacher, Course, ResultSheet
+import pytest
+
+@pytest.mark.parametrize('model', [Student, Teacher, Course])
+def test_round_trip_does_not_add_fields(model):
+    data = {'id': 'X1', 'name': 'Sana', 'custom': 1}
+
+    record = model.from_firestore(data)
+
+    assert record.to_firestore(include_id=True) == data
+    assert record.get('status') is None
+    assert 'phone' not in record
+
+def test_result_sheet_round_trip_does_not_add_fields():
+    data = {'id': 'R1', 'class': '9', 'test_name': 'Mid Term', 'custom': 1}
+
+    sheet = ResultSheet.from_firestore(data)
+
+    assert sheet.to_firestore(include_id=True) == data
+    assert sheet.get('completed') is None and sheet.subjects() == []
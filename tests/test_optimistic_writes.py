@@ -0,0 +1,149 @@
+from db.subscription_hub import SubscriptionHub, subscription_hub
+from db.data_access import DataAccess
+from db.database_utils import DatabaseUtils, DocumentExists
+from db.student_repository import StudentRepository
+import threading
+import pytest
+
+class Feed:
+    """Stands in for the Firestore listener, pushing snapshots by hand"""
+
+    def __init__(self):
+        self.dispatch = None
+
+    def watch_collection(self, collection_name, callback, include_changes=False, filters=None):
+        self.dispatch = callback
+        return lambda: None
+
+    def push(self, docs, changes=()):
+        self.dispatch([dict(doc) for doc in docs], list(changes))
+
+@pytest.fixture
+def feed(monkeypatch, isolated_cache):
+    feed = Feed()
+    monkeypatch.setattr('db.subscription_hub.DatabaseUtils.watch_collection', feed.watch_collection)
+    return feed
+
+@pytest.fixture
+def hub(feed):
+    """Hub watching students, with A and B on the server"""
+    hub = SubscriptionHub()
+    received = []
+    hub.subscribe('students', lambda docs, changes: received.append((docs, changes)), include_changes=True)
+    feed.push([{'id': 'A', 'name': 'Ali'}, {'id': 'B', 'name': 'Bilal'}])
+    hub.received = received
+    return hub
+
+def names(hub):
+    return {doc['id']: doc.get('name') for doc in hub.get_cached('students')}
+
+def last_change(hub):
+    return [(change['type'], change['id']) for change in hub.received[-1][1]]
+
+def test_update_is_shown_at_once_and_rolled_back_on_rejection(hub):
+    write_id = hub.begin_write('students', 'A', {'name': 'Ahmed'})
+    assert names(hub)['A'] == 'Ahmed'
+    assert last_change(hub) == [('MODIFIED', 'A')]
+    assert hub.pending_writes('students') == 1
+
+    hub.end_write('students', write_id, succeeded=False)
+
+    assert names(hub)['A'] == 'Ali'
+    assert hub.pending_writes('students') == 0
+
+def test_pending_write_survives_snapshots_until_acknowledged(hub, feed):
+    write_id = hub.begin_write('students', 'A', {'name': 'Ahmed'})
+
+    # A snapshot from before the write reached the server
+    feed.push([{'id': 'A', 'name': 'Ali'}, {'id': 'B', 'name': 'Bilal', 'phone': '1'}])
+    assert names(hub)['A'] == 'Ahmed'
+
+    hub.end_write('students', write_id, succeeded=True)
+    assert names(hub)['A'] == 'Ahmed'
+
+    # The next snapshot is authoritative again
+    feed.push([{'id': 'A', 'name': 'Ahmad'}, {'id': 'B', 'name': 'Bilal'}])
+    assert names(hub)['A'] == 'Ahmad'
+
+def test_rejected_add_disappears_again(hub):
+    write_id = hub.begin_write('students', 'C', {'name': 'Chand'}, merge=False)
+    assert last_change(hub) == [('ADDED', 'C')]
+
+    hub.end_write('students', write_id, succeeded=False)
+
+    assert last_change(hub) == [('REMOVED', 'C')]
+    assert 'C' not in names(hub)
+
+def test_rejected_delete_brings_the_document_back(hub):
+    write_id = hub.begin_write('students', 'B', None, merge=False)
+    assert 'B' not in names(hub)
+
+    hub.end_write('students', write_id, succeeded=False)
+
+    assert last_change(hub) == [('ADDED', 'B')]
+    assert names(hub)['B'] == 'Bilal'
+
+def test_data_access_rolls_back_a_failed_update(feed, monkeypatch):
+    received = []
+    unsubscribe = subscription_hub.subscribe('students', received.append)
+    try:
+        feed.push([{'id': 'A', 'name': 'Ali'}])
+        monkeypatch.setattr(DatabaseUtils, 'update_document', staticmethod(lambda *args, **kwargs: False))
+
+        done = threading.Event()
+        outcome = []
+        DataAccess('students').update_optimistic('A', {'name': 'Ahmed'}, lambda saved: (outcome.append(saved), done.set()))
+        assert done.wait(5)
+
+        assert outcome == [False]
+        assert [doc['name'] for doc in received[-2]] == ['Ahmed']
+        assert [doc['name'] for doc in received[-1]] == ['Ali']
+    finally:
+        unsubscribe()
+
+def test_data_access_reports_a_conflicting_update(feed):
+    received = []
+    unsubscribe = subscription_hub.subscribe('students', received.append)
+    try:
+        DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+        feed.push([{'id': 'A', 'name': 'Ali'}])
+        access = DataAccess('students')
+        base, update_time = access.edit_version('A')
+        DatabaseUtils.set_document('students', 'A', {'name': 'Alia'}, merge=True)
+
+        done = threading.Event()
+        outcome = []
+        access.update_optimistic(
+            'A', {'name': 'Ahmed'}, lambda saved: (outcome.append(saved), done.set()),
+            base, update_time, lambda: (outcome.append('conflict'), done.set())
+        )
+        assert done.wait(5)
+
+        assert outcome == ['conflict']
+        assert [doc['name'] for doc in received[-1]] == ['Ali']
+        assert DatabaseUtils.get_document_by_id('students', 'A')['name'] == 'Alia'
+    finally:
+        unsubscribe()
+
+def test_adding_a_taken_student_id_keeps_the_existing_student(feed):
+    DatabaseUtils.set_document('students', '7', {'id': '7', 'name': 'Ali'})
+
+    with pytest.raises(DocumentExists):
+        StudentRepository().add({'id': '7', 'name': 'Bilal'})
+
+    assert DatabaseUtils.get_document_by_id('students', '7')['name'] == 'Ali'
+
+def test_optimistic_add_reports_a_taken_student_id(feed):
+    DatabaseUtils.set_document('students', '7', {'id': '7', 'name': 'Ali'})
+
+    done = threading.Event()
+    outcome = []
+    StudentRepository().add_optimistic(
+        {'id': '7', 'name': 'Bilal'},
+        lambda saved: (outcome.append(saved), done.set()),
+        lambda: (outcome.append('exists'), done.set())
+    )
+    assert done.wait(5)
+
+    assert outcome == ['exists']
+    assert DatabaseUtils.get_document_by_id('students', '7')['name'] == 'Ali'
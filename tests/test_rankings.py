@@ -0,0 +1,61 @@
+from utils.analytics import AnalyticsEngine
+from utils.marks_store import MarksStore
+from utils.rankings import RankingEngine, competition_ranks
+import numpy as np
+
+def test_ties_share_a_position_and_skip_the_next():
+    ranks = competition_ranks(np.array([70, 90, 80, 90, np.nan, 60]))
+
+    assert ranks.tolist() == [4, 1, 3, 1, 0, 5]
+
+def test_values_equal_after_rounding_tie():
+    assert competition_ranks(np.array([84.999, 85.0, 80])).tolist() == [1, 1, 3]
+
+def test_positions_are_counted_within_each_group():
+    values = np.array([50, 90, 70, 90, 60])
+    groups = np.array([0, 0, 1, 1, 1])
+
+    assert competition_ranks(values, groups).tolist() == [2, 1, 2, 1, 3]
+
+def sheet(result_id, section, marks, class_number=9):
+    """T1 sheet of one section with math out of 100"""
+    return {
+        'id': result_id,
+        'class': class_number,
+        'section': section,
+        'test_name': 'T1',
+        'maxMarks': {'math': 100},
+        'marks': {roll_no: {'name': roll_no, 'result': {'math': mark}} for roll_no, mark in marks.items()},
+    }
+
+def engine_for(sheets):
+    store = MarksStore()
+    store.load(sheets)
+    return store, RankingEngine(store, AnalyticsEngine(store))
+
+def test_section_class_and_campus_positions():
+    store, engine = engine_for([
+        sheet('a', 'A', {'1': 80, '2': 95}),
+        sheet('b', 'B', {'1': 95, '2': 60}),
+        sheet('c', 'A', {'1': 99}, class_number=10),
+    ])
+
+    positions = engine.positions_for(sheet('b', 'B', {'1': 95, '2': 60}))
+
+    assert positions['1'] == {'section': 1, 'class': 1, 'campus': 2}
+    assert positions['2'] == {'section': 2, 'class': 4, 'campus': 5}
+
+def test_merit_list_follows_competition_order():
+    _, engine = engine_for([sheet('a', 'A', {'1': 70, '2': 90, '3': 90, '4': 50})])
+
+    merit = engine.merit_list('T1', 9, 'A')
+
+    assert [(entry['position'], entry['roll_no']) for entry in merit] == [(1, '2'), (1, '3'), (3, '1'), (4, '4')]
+
+def test_rankings_follow_store_changes():
+    store, engine = engine_for([sheet('a', 'A', {'1': 70, '2': 90})])
+    assert engine.positions_for(sheet('a', 'A', {'1': 0}))['1']['section'] == 2
+
+    store.apply_sheet(sheet('a', 'A', {'1': 95, '2': 90}))
+
+    assert engine.positions_for(sheet('a', 'A', {'1': 0}))['1']['section'] == 1
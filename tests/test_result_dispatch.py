@@ -0,0 +1,57 @@
+from utils.result_dispatch import build_messages, ResultDispatcher, DeliveryLog, StubTransport
+import time
+
+def result_sheet():
+    return {
+        'id': 'r1',
+        'class': 9,
+        'section': 'Blue',
+        'test_name': 'T1',
+        'maxMarks': {'math': 100},
+        'marks': {
+            '1': {'name': 'Ali', 'result': {'math': 80}},
+            '2': {'name': 'Sana', 'result': {'math': 70}},
+            '3': {'name': 'Omar', 'result': {'math': 60}},
+        },
+    }
+
+def test_sections_are_matched_ignoring_case():
+    students = [{'class': '9', 'section': ' blue', 'roll_no': '1', 'name': 'Ali', 'phone': '111'}]
+
+    messages, skipped = build_messages(result_sheet(), students, 'stub')
+
+    assert [(message.roll_no, message.phone) for message in messages] == [('1', '111')]
+    assert [roll_no for roll_no, _, _ in skipped] == ['2', '3']
+
+def test_students_without_roll_number_are_matched_by_name():
+    students = [
+        {'class': '9', 'section': 'Blue', 'name': 'sana', 'phone': '222'},
+        {'class': '9', 'section': 'Blue', 'name': 'Omar', 'phone': '333'},
+        {'class': '9', 'section': 'Blue', 'name': 'Omar', 'phone': '444'},
+    ]
+
+    messages, skipped = build_messages(result_sheet(), students, 'stub')
+
+    assert [(message.roll_no, message.phone) for message in messages] == [('2', '222')]
+    assert [roll_no for roll_no, _, _ in skipped] == ['1', '3']
+
+def test_no_backoff_after_the_last_attempt(tmp_path):
+    dispatcher = ResultDispatcher(StubTransport(failure_rate=1.0), rate_per_second=100, max_attempts=1,
+                                  log=DeliveryLog(str(tmp_path / "log.jsonl")))
+    students = [{'class': '9', 'section': 'Blue', 'roll_no': '1', 'phone': '111'}]
+
+    started = time.monotonic()
+    job = dispatcher.dispatch(result_sheet(), students)
+    assert job.done.wait(5)
+
+    assert job.failed == 1
+    assert time.monotonic() - started < 0.9
+
+def test_stub_deliveries_are_marked_simulated(tmp_path):
+    dispatcher = ResultDispatcher(log=DeliveryLog(str(tmp_path / "log.jsonl")), rate_per_second=100)
+    students = [{'class': '9', 'section': 'Blue', 'roll_no': '1', 'phone': '111'}]
+
+    job = dispatcher.dispatch(result_sheet(), students)
+    assert job.done.wait(5)
+
+    assert job.sent == 1 and job.simulated
@@ -0,0 +1,57 @@
+from db.database_utils import DatabaseUtils, TOMBSTONES_COLLECTION
+from db.document_decoder import format_timestamp
+import datetime
+
+def test_soft_deleted_document_is_hidden_from_reads(mock_db):
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+
+    assert DatabaseUtils.delete_document('students', 'A')
+
+    assert DatabaseUtils.get_document_by_id('students', 'A') is None
+    assert DatabaseUtils.get_collection_data('students') == []
+    assert [doc['id'] for doc in DatabaseUtils.get_collection_data('students', include_deleted=True)] == ['A']
+
+def test_purge_removes_only_expired_deletions(mock_db):
+    for doc_id in 'ABC':
+        DatabaseUtils.set_document('students', doc_id, {'name': doc_id})
+    DatabaseUtils.delete_document('students', 'A')
+    DatabaseUtils.delete_document('students', 'B')
+    # A was deleted long ago, B just now
+    mock_db.collection('students').document('A').update(
+        {'deleted_at': datetime.datetime.now() - datetime.timedelta(days=40)}
+    )
+
+    purged = DatabaseUtils.purge_deleted('students', retention=datetime.timedelta(days=30))
+
+    assert purged == 1
+    stored = sorted(doc.id for doc in mock_db.collection('students').stream())
+    assert stored == ['B', 'C']
+
+def test_purge_removes_expired_tombstones(mock_db):
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+    DatabaseUtils.delete_document('students', 'A', hard=True)
+    assert len(list(mock_db.collection(TOMBSTONES_COLLECTION).stream())) == 1
+
+    assert DatabaseUtils.purge_deleted('students', retention=datetime.timedelta(0)) == 1
+    assert list(mock_db.collection(TOMBSTONES_COLLECTION).stream()) == []
+
+def test_compaction_runs_once_per_interval(sync, mock_db):
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+    DatabaseUtils.delete_document('students', 'A')
+
+    assert sync.compact_if_due(retention=datetime.timedelta(0)) == 1
+
+    DatabaseUtils.set_document('students', 'B', {'name': 'Bilal'})
+    DatabaseUtils.delete_document('students', 'B')
+    # Another launch within the interval leaves B for the next run
+    assert sync.compact_if_due(retention=datetime.timedelta(0)) == 0
+    assert sync.compact_if_due(interval=datetime.timedelta(0), retention=datetime.timedelta(0)) == 1
+
+def test_compaction_skipped_when_another_client_ran_it(sync, mock_db):
+    DatabaseUtils.set_document('main_data', 'maintenance', {
+        'last_compacted_at': format_timestamp(datetime.datetime.now()),
+    })
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+    DatabaseUtils.delete_document('students', 'A')
+
+    assert sync.compact_if_due(retention=datetime.timedelta(0)) == 0
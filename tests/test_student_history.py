@@ -0,0 +1,54 @@
+from db.data_access import student_results_data
+from db.database_utils import DatabaseUtils
+from utils.result_helpers import upload_marks
+from utils.student_history import history_id, update_history, remove_history, get_history
+
+def result(result_id, section, marks, test_name='T1'):
+    """Result sheet with 100 max marks in math"""
+    return {
+        'id': result_id,
+        'class': 9,
+        'section': section,
+        'test_name': test_name,
+        'maxMarks': {'math': 100},
+        'marks': {roll_no: {'name': 'Ali', 'result': {'math': mark}} for roll_no, mark in marks.items()},
+    }
+
+def test_section_case_does_not_split_a_history(isolated_cache):
+    update_history(result('r1', 'A', {'7': 60}))
+    update_history(result('r2', 'a', {'7': 80}, test_name='T2'))
+
+    assert history_id(9, 'A', 7) == history_id(9, 'a', '7')
+    assert [entry['percentage'] for entry in get_history(9, 'a', 7)] == [60, 80]
+
+def test_deleted_result_leaves_the_history(isolated_cache):
+    first, second = result('r1', 'A', {'7': 60}), result('r2', 'A', {'7': 80}, test_name='T2')
+    update_history(first)
+    update_history(second)
+
+    assert remove_history(first) == 1
+
+    assert [entry['result_id'] for entry in get_history(9, 'A', 7)] == ['r2']
+    assert list(student_results_data.get_by_id(history_id(9, 'A', 7))['results']) == ['r2']
+
+def test_uploaded_marks_reach_the_history(isolated_cache):
+    sheet = result('r1', 'A', {'7': 60})
+    sheet['status'] = {'math': 'Ready', 'urdu': 'Pending'}
+    sheet['maxMarks']['urdu'] = 50
+    DatabaseUtils.set_document('result_data', 'r1', {key: value for key, value in sheet.items() if key != 'id'})
+
+    assert upload_marks('r1', {'urdu': {'7': 40}}, 'Sana')
+
+    [entry] = get_history(9, 'A', 7)
+    assert entry['marks'] == {'math': 60, 'urdu': 40}
+    assert entry['percentage'] == 66.67
+
+def test_rewritten_result_replaces_its_entry(isolated_cache):
+    sheet = result('r1', 'A', {'7': 60})
+    sheet['marks']['7']['result']['urdu'] = 30
+    update_history(sheet)
+
+    update_history(result('r1', 'A', {'7': 70}))
+
+    [entry] = get_history(9, 'A', 7)
+    assert entry['marks'] == {'math': 70}
@@ -0,0 +1,16 @@
+from db.student_repository import StudentRepository
+from utils.student_importer import StudentImporter
+
+def test_students_added_by_hand_are_duplicates_on_import(isolated_cache, tmp_path):
+    repository = StudentRepository()
+    assert repository.add({'id': 'S001', 'name': 'Ali', 'class': '9'}) == 'S001'
+
+    roster = tmp_path / "roster.csv"
+    roster.write_text("ID,Name,Class\nS001,Ali,9\nS002,Bilal,9\n")
+    report = StudentImporter(repository).run(str(roster))
+
+    assert report.imported == 1
+    assert [(rejection['id'], rejection['reason']) for rejection in report.rejected] == [
+        ('S001', "Student ID already exists")
+    ]
+    assert sorted(repository.get_ids()) == ['S001', 'S002']
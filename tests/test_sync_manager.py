@@ -0,0 +1,76 @@
+from db.database_utils import DatabaseUtils
+import concurrent.futures
+import datetime
+import pytest
+
+def ids(docs):
+    return sorted(doc['id'] for doc in docs)
+
+@pytest.fixture
+def seeded(sync):
+    """students collection holding A and B, cached by the sync manager"""
+    DatabaseUtils.set_document('students', 'A', {'name': 'Ali'})
+    DatabaseUtils.set_document('students', 'B', {'name': 'Bilal'})
+    assert ids(sync.sync('students')) == ['A', 'B']
+    return sync
+
+def test_delta_read_picks_up_updates_and_additions(seeded):
+    DatabaseUtils.update_document('students', 'A', {'name': 'Ahmed'})
+    DatabaseUtils.set_document('students', 'C', {'name': 'Chand'})
+
+    changes = seeded.refresh('students')
+    docs = {doc['id']: doc for doc in seeded.sync('students')}
+
+    # The overlap window may re-read unchanged documents too
+    assert {'A', 'C'} <= set(ids(changes['changed']))
+    assert not changes['full']
+    assert docs['A']['name'] == 'Ahmed'
+    assert sorted(docs) == ['A', 'B', 'C']
+
+@pytest.mark.parametrize('hard', [True, False])
+def test_delta_read_drops_deleted_documents(seeded, hard):
+    DatabaseUtils.delete_document('students', 'B', hard=hard)
+
+    changes = seeded.refresh('students')
+
+    assert changes['deleted'] == ['B']
+    assert ids(seeded.sync('students')) == ['A']
+
+def test_full_read_replaces_stale_replica(seeded, cache):
+    # Deleted and purged while the replica was offline past the retention
+    DatabaseUtils.delete_document('students', 'B', hard=True)
+    DatabaseUtils.purge_deleted('students', retention=datetime.timedelta(0))
+    cache._watermarks['students'] = '2000-01-01 00:00:00'
+
+    changes = seeded.refresh('students')
+
+    assert changes['full']
+    assert ids(seeded.sync('students')) == ['A']
+
+def test_truncated_delta_keeps_watermark(seeded, cache):
+    watermark = cache.watermark('students')
+    for doc_id in 'CDE':
+        DatabaseUtils.set_document('students', doc_id, {'name': doc_id})
+
+    changes = seeded.refresh('students', limit=2)
+
+    assert not changes['complete']
+    assert cache.watermark('students') == watermark
+    assert not seeded.is_fresh('students')
+    # The next read covers the window again and catches up
+    assert ids(seeded.sync('students')) == ['A', 'B', 'C', 'D', 'E']
+
+def test_async_refresh_waits_for_a_running_refresh(seeded, cache, monkeypatch):
+    from db import async_data_access
+    monkeypatch.setattr(async_data_access, 'data_cache', cache)
+    monkeypatch.setattr(async_data_access, 'sync_manager', seeded)
+    DatabaseUtils.set_document('students', 'C', {'name': 'Chand'})
+
+    lock = seeded._lock_for('students')
+    with lock:
+        future = async_data_access.submit(async_data_access.AsyncDataAccess('students').get_all())
+        with pytest.raises(concurrent.futures.TimeoutError):
+            future.result(0.2)
+
+    assert ids(future.result(5)) == ['A', 'B', 'C']
+    assert not lock.locked()
@@ -1,11 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
-from db.database_utils import DatabaseUtils
+from db.database_utils import DatabaseUtils, DOCUMENT_ID
+from db.data_access import students_data, teachers_data, courses_data, main_data
+from db.async_data_access import read_all, async_students_data, async_teachers_data, async_courses_data, async_main_data
+from db.reference_data import reference_data
+from utils.grading import grading
 from ui.students_screen import StudentsComponent
 from ui.teachers_screen import TeachersComponent
 from ui.courses_screen import CoursesComponent
 from ui.results_screen import ResultsComponent
+from ui.analytics_screen import AnalyticsComponent
 
 class AdminDashboard(ctk.CTkFrame):
     # Custom variables and colors
@@ -111,8 +116,8 @@ class AdminDashboard(ctk.CTkFrame):
         self.tabs.append(results_frame)
 
         # Analytics Tab
-        analytics_frame = self.create_placeholder_tab("Analytics")
-        self.tabs.append(analytics_frame)
+        self.analytics_component = AnalyticsComponent(self.main_content, self)
+        self.tabs.append(self.analytics_component)
         
         # Students Tab
         students_frame = StudentsComponent(self.main_content, self)
@@ -138,25 +143,37 @@ class AdminDashboard(ctk.CTkFrame):
     def load_initial_data(self):
         """Load initial data from Firebase"""
         try:
+            # Read the counts and the collections every tab opens with at the
+            # same time; the tabs then get them from the data cache
+            data = read_all(
+                counts=async_main_data.get_by_id("count_data"),
+                students=async_students_data.get_all(),
+                teachers=async_teachers_data.get_all(),
+                courses=async_courses_data.get_all(),
+            )
+            
             # Get counts from main_data collection
-            document = DatabaseUtils.get_document_by_id("main_data", "count_data")
+            document = data['counts']
             if document:
                 self.update_counts(document)
                 print("Initial data loaded successfully")
             else:
                 print("Count data document not found")
-                self.create_initial_count_data()
+                self.create_initial_count_data(data['students'], data['teachers'], data['courses'])
         except Exception as e:
             print(f"Error loading initial data: {e}")
             messagebox.showerror("Error", "Failed to load initial data")
 
-    def create_initial_count_data(self):
+    def create_initial_count_data(self, students=None, teachers=None, courses=None):
         """Create initial count data if it doesn't exist"""
         try:
-            # Get actual counts from collections
-            students = DatabaseUtils.get_collection_data("students")
-            teachers = DatabaseUtils.get_collection_data("teachers")
-            courses = DatabaseUtils.get_collection_data("courses")
+            # Get actual counts from collections (unless already loaded)
+            if students is None:
+                students = students_data.get_all()
+            if teachers is None:
+                teachers = teachers_data.get_all()
+            if courses is None:
+                courses = courses_data.get_all()
             
             # Create count data document
             count_data = {
@@ -167,7 +184,7 @@ class AdminDashboard(ctk.CTkFrame):
             }
             
             # Add document to Firebase
-            DatabaseUtils.add_document("main_data", "count_data", count_data)
+            DatabaseUtils.set_document("main_data", "count_data", count_data)
             self.update_counts(count_data)
             print("Initial count data created")
         except Exception as e:
@@ -176,27 +193,21 @@ class AdminDashboard(ctk.CTkFrame):
     def setup_data_listener(self):
         """Setup real-time data listeners for all collections"""
         try:
-            # Listen for changes in main_data collection
-            self.count_unsubscribe = DatabaseUtils.watch_collection(
-                "main_data",
-                self.handle_count_update
-            )
-            
-            # Listen for changes in individual collections
-            self.students_unsubscribe = DatabaseUtils.watch_collection(
-                "students",
-                self.handle_students_update
+            # Listen for changes in the count_data document of main_data
+            self.count_unsubscribe = main_data.watch(
+                self.handle_count_update,
+                filters=[(DOCUMENT_ID, '==', 'count_data')]
             )
             
-            self.teachers_unsubscribe = DatabaseUtils.watch_collection(
-                "teachers",
-                self.handle_teachers_update
-            )
+            # Listen for changes in individual collections (the listeners are
+            # shared with the Students, Teachers and Courses components)
+            self.students_unsubscribe = students_data.watch(self.handle_students_update)
+            self.teachers_unsubscribe = teachers_data.watch(self.handle_teachers_update)
+            self.courses_unsubscribe = courses_data.watch(self.handle_courses_update)
             
-            self.courses_unsubscribe = DatabaseUtils.watch_collection(
-                "courses",
-                self.handle_courses_update
-            )
+            # Keep the Create Result reference data and grading scales live
+            self.reference_unsubscribe = reference_data.start()
+            self.grading_unsubscribe = grading.start()
             
             print("Real-time listeners setup successfully")
         except Exception as e:
@@ -249,9 +260,10 @@ class AdminDashboard(ctk.CTkFrame):
     def handle_count_update(self, data):
         """Handle updates to the count_data document"""
         try:
-            if data and len(data) > 0:
+            # main_data holds other documents too, only react to count_data
+            count_data = next((doc for doc in data or [] if doc.get('id') == 'count_data'), None)
+            if count_data:
                 # Schedule the update on the main thread
-                count_data = data[0]
                 self.after(100, lambda: self.update_counts(count_data))
         except Exception as e:
             print(f"Error in handle_count_update: {e}")
@@ -322,6 +334,10 @@ class AdminDashboard(ctk.CTkFrame):
                 self.teachers_unsubscribe()
             if hasattr(self, 'courses_unsubscribe') and self.courses_unsubscribe:
                 self.courses_unsubscribe()
+            if hasattr(self, 'reference_unsubscribe') and self.reference_unsubscribe:
+                self.reference_unsubscribe()
+            if hasattr(self, 'grading_unsubscribe') and self.grading_unsubscribe:
+                self.grading_unsubscribe()
             
             if hasattr(self, 'students_component'):
                 self.students_component.cleanup()
@@ -331,6 +347,8 @@ class AdminDashboard(ctk.CTkFrame):
                 self.courses_component.cleanup()
             if hasattr(self, 'results_component'):
                 self.results_component.cleanup()
+            if hasattr(self, 'analytics_component'):
+                self.analytics_component.cleanup()
                 
             print("Cleaned up all listeners")
         except Exception as e:
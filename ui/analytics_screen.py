@@ -0,0 +1,369 @@
+import tkinter as tk
+import customtkinter as ctk
+import threading
+from db.data_access import results_data
+from utils.marks_store import marks_store
+from utils.analytics import analytics_engine, AnalyticsEngine
+from utils.rankings import ranking_engine
+from utils.grading import grading
+
+class AnalyticsComponent(ctk.CTkFrame):
+    """
+    Component showing class, section and subject analytics - designed to be
+    embedded in a tabbed interface.
+
+    The tab first renders the rollups materialized in main_data/analytics
+    (one document read), then follows the result_data stream through the
+    shared marks store and refreshes as results change.
+    """
+
+    ALL_SECTIONS = "All Sections"
+
+    # Seconds to wait after the last change before storing new rollups
+    MATERIALIZE_DELAY_MS = 5000
+
+    def __init__(self, parent, controller):
+        ctk.CTkFrame.__init__(self, parent, fg_color="#13151a")
+        self.controller = controller
+
+        self.rollups = None
+        self.loaded = False
+        self.unsubscribe = None
+        self._materialize_job = None
+
+        # Header with filters
+        header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        header_frame.pack(fill="x", padx=20, pady=(20, 10))
+
+        ctk.CTkLabel(
+            header_frame,
+            text="Performance Analytics",
+            font=ctk.CTkFont(size=24, weight="bold"),
+            text_color="#ffffff"
+        ).pack(side="left")
+
+        self.filter_frame = ctk.CTkFrame(header_frame, fg_color="#2d2f35")
+        self.filter_frame.pack(side="right")
+
+        self.test_var = tk.StringVar(value="")
+        self.test_filter = ctk.CTkOptionMenu(
+            self.filter_frame,
+            variable=self.test_var,
+            values=[""],
+            command=lambda *_: self.render(),
+            width=160,
+            fg_color="#2d2f35",
+            button_color="#3B8ED0",
+            button_hover_color="#1F6AA5"
+        )
+        self.test_filter.pack(side="left", padx=5, pady=5)
+
+        self.section_var = tk.StringVar(value=self.ALL_SECTIONS)
+        self.section_filter = ctk.CTkOptionMenu(
+            self.filter_frame,
+            variable=self.section_var,
+            values=[self.ALL_SECTIONS],
+            command=lambda *_: self.render(),
+            width=160,
+            fg_color="#2d2f35",
+            button_color="#3B8ED0",
+            button_hover_color="#1F6AA5"
+        )
+        self.section_filter.pack(side="left", padx=5, pady=5)
+
+        # Statistic cards
+        self.stats_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.stats_frame.pack(fill="x", padx=20, pady=10)
+
+        self.stat_labels = {}
+        for i, title in enumerate(["Students", "Mean %", "Median %", "Pass Rate"]):
+            card = ctk.CTkFrame(self.stats_frame, fg_color="#2d2f35", corner_radius=10)
+            card.grid(row=0, column=i, padx=10, pady=10, sticky="nsew")
+            value_label = ctk.CTkLabel(
+                card,
+                text="-",
+                font=ctk.CTkFont(size=28, weight="bold"),
+                text_color="#ffffff"
+            )
+            value_label.pack(pady=(15, 5), padx=20)
+            ctk.CTkLabel(
+                card,
+                text=title,
+                font=ctk.CTkFont(size=14),
+                text_color="#94969c"
+            ).pack(pady=(0, 15))
+            self.stat_labels[title] = value_label
+            self.stats_frame.grid_columnconfigure(i, weight=1)
+
+        # Detail panels
+        self.details_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.details_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        self.details_frame.grid_columnconfigure(0, weight=1)
+        self.details_frame.grid_columnconfigure(1, weight=1)
+        self.details_frame.grid_rowconfigure(0, weight=1)
+        self.details_frame.grid_rowconfigure(1, weight=1)
+
+        self.subjects_panel = self._create_panel("Subjects", 0, 0)
+        self.top_panel = self._create_panel("Top Students", 0, 1)
+        self.histogram_panel = self._create_panel("Distribution", 1, 0)
+        self.trend_panel = self._create_panel("Test-over-Test Trend", 1, 1)
+
+        # Status bar
+        self.status_frame = ctk.CTkFrame(self, height=30, fg_color="#2d2f35")
+        self.status_frame.pack(fill="x", padx=20, pady=(5, 20))
+
+        self.status_label = ctk.CTkLabel(
+            self.status_frame,
+            text="📊 Analytics Component Ready",
+            font=ctk.CTkFont(size=12),
+            text_color="#4CC9F0"
+        )
+        self.status_label.pack(side="right", padx=10, pady=5)
+
+    def _create_panel(self, title, row, column):
+        """Create a titled scrollable panel in the details grid"""
+        panel = ctk.CTkFrame(self.details_frame, fg_color="#2d2f35", corner_radius=10)
+        panel.grid(row=row, column=column, padx=10, pady=10, sticky="nsew")
+
+        ctk.CTkLabel(
+            panel,
+            text=title,
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color="#ffffff"
+        ).pack(anchor="w", padx=15, pady=(10, 5))
+
+        body = ctk.CTkScrollableFrame(panel, fg_color="#1a1c20")
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        return body
+
+    def on_tab_selected(self):
+        """Called when this tab is selected"""
+        if self.loaded:
+            return
+        self.loaded = True
+        self.status_label.configure(text="Loading analytics...", text_color="#FFBE0B")
+        self.after(10, self._load_tab_data)
+
+    def _load_tab_data(self):
+        """Show the stored rollups, then start following live results"""
+        try:
+            stored = AnalyticsEngine.load_materialized()
+            if stored:
+                self.rollups = stored
+                self.render()
+                self.status_label.configure(
+                    text=f"Showing analytics from {stored.get('generated_at', 'last run')}",
+                    text_color="#4CC9F0"
+                )
+
+            # Follow the result_data stream through the shared marks store
+            marks_store.add_listener(self.handle_store_update)
+            self.unsubscribe = marks_store.attach(results_data)
+
+            # Another screen may have loaded the store already, then no snapshot follows
+            if marks_store.version:
+                threading.Thread(target=self.handle_store_update, args=(marks_store,), daemon=True).start()
+        except Exception as e:
+            print(f"Error loading analytics: {e}")
+            self.status_label.configure(text=f"Error loading analytics: {e}", text_color="#E76F51")
+
+    def handle_store_update(self, store):
+        """Recompute rollups when results change (called off the UI thread)"""
+        try:
+            # Merit lists and grade counts travel with the rollups so they are materialized too
+            rollups = dict(
+                analytics_engine.compute_rollups(),
+                merit=ranking_engine.merit_lists(analytics_engine.top_n),
+                grades=grading.grade_distributions()
+            )
+            self.after(100, lambda: self._apply_rollups(rollups))
+        except Exception as e:
+            print(f"Error computing analytics: {e}")
+
+    def _apply_rollups(self, rollups):
+        """Show fresh rollups and schedule storing them (main thread)"""
+        self.rollups = rollups
+        self.render()
+        self.status_label.configure(text="📡 Analytics updated in real-time", text_color="#4CC9F0")
+
+        if self._materialize_job:
+            self.after_cancel(self._materialize_job)
+        self._materialize_job = self.after(self.MATERIALIZE_DELAY_MS, self._materialize)
+
+    def _materialize(self):
+        """Store the current rollups in main_data/analytics in the background"""
+        self._materialize_job = None
+        rollups = self.rollups
+        if not rollups:
+            return
+
+        def run():
+            if not analytics_engine.materialize(rollups):
+                print("Failed to store analytics rollups")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def render(self):
+        """Render the selected test and section"""
+        if not self.rollups:
+            return
+        rollups = self.rollups
+
+        tests = rollups.get('tests', []) or [""]
+        self.test_filter.configure(values=tests)
+        if self.test_var.get() not in tests:
+            self.test_var.set(tests[-1])
+        test = self.test_var.get()
+
+        sections = [self.ALL_SECTIONS] + rollups.get('sections', [])
+        self.section_filter.configure(values=sections)
+        if self.section_var.get() not in sections:
+            self.section_var.set(self.ALL_SECTIONS)
+        section = self.section_var.get()
+
+        if section == self.ALL_SECTIONS:
+            stats = rollups.get('overall', {}).get(test)
+        else:
+            stats = rollups.get('by_section', {}).get(section, {}).get(test)
+        stats = stats or {}
+
+        self.stat_labels["Students"].configure(text=str(stats.get('count', 0)))
+        self.stat_labels["Mean %"].configure(text=f"{stats.get('mean', 0):.1f}")
+        self.stat_labels["Median %"].configure(text=f"{stats.get('median', 0):.1f}")
+        self.stat_labels["Pass Rate"].configure(text=f"{stats.get('pass_rate', 0):.1f}%")
+
+        self._render_subjects(rollups, section, test)
+        self._render_top(rollups, section, test)
+        self._render_histogram(rollups, stats)
+        self._render_grades(rollups, section, test)
+        self._render_trend(rollups, section)
+
+    def _clear(self, panel):
+        """Remove every widget from a panel"""
+        for widget in panel.winfo_children():
+            widget.destroy()
+
+    def _add_row(self, panel, values, widths, color="#ffffff"):
+        """Add a row of labels to a panel"""
+        row = ctk.CTkFrame(panel, fg_color="transparent")
+        row.pack(fill="x", pady=1)
+        for value, width in zip(values, widths):
+            ctk.CTkLabel(row, text=str(value), width=width, text_color=color, anchor="w").pack(side="left", padx=5)
+
+    def _render_subjects(self, rollups, section, test):
+        """Per-subject statistics of a section, or per-class ones campus-wide"""
+        self._clear(self.subjects_panel)
+        widths = [140, 70, 70, 80]
+
+        if section == self.ALL_SECTIONS:
+            self._add_row(self.subjects_panel, ["Class", "Mean", "Median", "Pass %"], widths, "#4CC9F0")
+            for cls, per_test in sorted(rollups.get('by_class', {}).items()):
+                stats = per_test.get(test)
+                if stats and stats.get('count'):
+                    self._add_row(self.subjects_panel, [cls, stats['mean'], stats['median'], stats['pass_rate']], widths)
+            return
+
+        self._add_row(self.subjects_panel, ["Subject", "Mean", "Median", "Pass %"], widths, "#4CC9F0")
+        per_subject = rollups.get('by_subject', {}).get(section, {}).get(test, {})
+        for subject, stats in per_subject.items():
+            self._add_row(self.subjects_panel, [subject, stats['mean'], stats['median'], stats['pass_rate']], widths)
+
+    def _render_top(self, rollups, section, test):
+        """Best students of the selected section and test"""
+        self._clear(self.top_panel)
+        widths = [40, 60, 180, 80]
+        self._add_row(self.top_panel, ["#", "Roll", "Name", "%"], widths, "#4CC9F0")
+
+        # Merit lists carry positions with ties shared
+        merit = rollups.get('merit', {}).get(test)
+        if merit is not None:
+            if section == self.ALL_SECTIONS:
+                students = merit.get('campus', [])
+            else:
+                students = merit.get('sections', {}).get(section, [])
+            for student in students[:10]:
+                self._add_row(
+                    self.top_panel,
+                    [student['position'], student['roll_no'], student['name'], student['percentage']],
+                    widths
+                )
+            return
+
+        if section == self.ALL_SECTIONS:
+            students = []
+            for per_test in rollups.get('top', {}).values():
+                students.extend(per_test.get(test, []))
+            students.sort(key=lambda s: s['percentage'], reverse=True)
+        else:
+            students = rollups.get('top', {}).get(section, {}).get(test, [])
+
+        for i, student in enumerate(students[:10], start=1):
+            self._add_row(self.top_panel, [i, student['roll_no'], student['name'], student['percentage']], widths)
+
+    def _render_histogram(self, rollups, stats):
+        """Percentage distribution as horizontal bars"""
+        self._clear(self.histogram_panel)
+        bins = rollups.get('histogram_bins', [])
+        histogram = stats.get('histogram', [])
+        largest = max(histogram) if histogram and max(histogram) > 0 else 1
+
+        for i, count in enumerate(histogram):
+            row = ctk.CTkFrame(self.histogram_panel, fg_color="transparent")
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=f"{bins[i]}-{bins[i + 1]}%", width=80, text_color="#94969c").pack(side="left", padx=5)
+            bar = ctk.CTkProgressBar(row, width=200, progress_color="#3B8ED0")
+            bar.set(count / largest)
+            bar.pack(side="left", padx=5)
+            ctk.CTkLabel(row, text=str(count), width=40, text_color="#ffffff").pack(side="left", padx=5)
+
+    def _render_grades(self, rollups, section, test):
+        """Grade counts under the histogram"""
+        grades = rollups.get('grades', {}).get(test)
+        if not grades:
+            return
+        if section == self.ALL_SECTIONS:
+            counts = grades.get('campus', {})
+        else:
+            counts = grades.get('sections', {}).get(section, {})
+        if not any(counts.values()):
+            return
+
+        ctk.CTkLabel(
+            self.histogram_panel,
+            text="  ".join(f"{grade}: {count}" for grade, count in counts.items()),
+            text_color="#94969c",
+            anchor="w"
+        ).pack(fill="x", padx=5, pady=(8, 2))
+
+    def _render_trend(self, rollups, section):
+        """Mean percentage and pass rate per test"""
+        self._clear(self.trend_panel)
+        widths = [160, 80, 80]
+        self._add_row(self.trend_panel, ["Test", "Mean", "Pass %"], widths, "#4CC9F0")
+
+        if section == self.ALL_SECTIONS:
+            trend = [
+                {'test': test, 'mean': stats['mean'], 'pass_rate': stats['pass_rate']}
+                for test, stats in rollups.get('overall', {}).items()
+                if stats.get('count')
+            ]
+        else:
+            trend = rollups.get('trends', {}).get(section, [])
+
+        previous = None
+        for point in trend:
+            color = "#ffffff"
+            if previous is not None:
+                color = "#4CC9F0" if point['mean'] >= previous else "#E76F51"
+            self._add_row(self.trend_panel, [point['test'], point['mean'], point['pass_rate']], widths, color)
+            previous = point['mean']
+
+    def cleanup(self):
+        """Clean up resources when component is no longer needed"""
+        try:
+            marks_store.remove_listener(self.handle_store_update)
+            if self.unsubscribe:
+                self.unsubscribe()
+                print("Unsubscribed from analytics updates")
+        except Exception as e:
+            print(f"Error unsubscribing from updates: {e}")
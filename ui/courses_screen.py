@@ -4,6 +4,7 @@ from ui.base_screen import BaseScreen
 from ui.custom_functions import CustomFunctions
 import tkinter.messagebox as messagebox
 from db.course_repository import CourseRepository
+from db.models import Record
 
 class CoursesScreen(BaseScreen):
     """
@@ -234,7 +235,7 @@ class CoursesScreen(BaseScreen):
             filtered_courses = []
             
             for course in self.courses:
-                if isinstance(course, dict):
+                if isinstance(course, (dict, Record)):
                     # Use get with default values to avoid KeyError
                     if (search_term in course.get("name", "").lower() or
                         search_term in course.get("id", "").lower() or
@@ -564,7 +565,7 @@ class CoursesComponent(ctk.CTkFrame):
             filtered_courses = []
             
             for course in self.courses:
-                if isinstance(course, dict):
+                if isinstance(course, (dict, Record)):
                     # Use get with default values to avoid KeyError
                     if (search_term in course.get("name", "").lower() or
                         search_term in course.get("id", "").lower() or
@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 import os
+import sys
+import subprocess
 import datetime
 from db.teacher_repository import TeacherRepository
 
@@ -109,6 +111,16 @@ class CustomFunctions:
         else:
             messagebox.showinfo(title, message)
     
+    @staticmethod
+    def open_path(path):
+        """Open a file or folder with the system's default application"""
+        if hasattr(os, "startfile"):
+            os.startfile(path)
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", path])
+        else:
+            subprocess.Popen(["xdg-open", path])
+    
     @staticmethod
     def confirm_dialog(title, message):
         """Show a confirmation dialog"""
@@ -163,14 +175,14 @@ class CustomFunctions:
         # from db.teacher_repository import TeacherRepository
         try:
             teacher_repo = TeacherRepository()
-            all_teachers = teacher_repo.get_all() # Gets list of teacher dicts
+            all_teachers = teacher_repo.get_all() # Gets list of Teacher records
             
             if not all_teachers:
                 print("No teachers found in the database.")
                 return []
                 
-            # Extract the 'name' field from each teacher dictionary
-            teacher_names = [teacher.get('name', 'Unknown Name') for teacher in all_teachers if isinstance(teacher, dict)]
+            # Extract the name of each teacher record
+            teacher_names = [teacher.name or 'Unknown Name' for teacher in all_teachers]
             # print(teacher_names)
             return teacher_names
         except NameError:
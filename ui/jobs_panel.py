@@ -0,0 +1,159 @@
+import customtkinter as ctk
+from tkinter import messagebox
+import os
+from ui.custom_functions import CustomFunctions
+from utils.render_queue import render_queue, QUEUED, RUNNING, DONE, FAILED, CANCELLED, FINISHED_STATES
+
+STATE_COLORS = {
+    QUEUED: "#A0A0A0",
+    RUNNING: "#FFBE0B",
+    DONE: "#4CC9F0",
+    FAILED: "#E76F51",
+    CANCELLED: "#A0A0A0",
+}
+
+class JobsPanel(ctk.CTkFrame):
+    """
+    Panel listing the background rendering jobs with their progress.
+
+    Jobs can be cancelled while queued or running, retried when they
+    failed, and their documents opened once they are done.
+    """
+
+    def __init__(self, parent, queue=None, height=160, **kwargs):
+        ctk.CTkFrame.__init__(self, parent, fg_color="#2d2f35", **kwargs)
+        self.queue = queue or render_queue
+        self._refresh_job = None
+
+        # Header
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=10, pady=(5, 0))
+
+        self.title_label = ctk.CTkLabel(
+            header,
+            text="Background Jobs",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color="#ffffff"
+        )
+        self.title_label.pack(side="left")
+
+        self.clear_button = ctk.CTkButton(
+            header,
+            text="Clear Finished",
+            width=110,
+            height=24,
+            fg_color="#3B8ED0",
+            hover_color="#1F6AA5",
+            command=self.clear_finished
+        )
+        self.clear_button.pack(side="right")
+
+        # Job rows
+        self.list_frame = ctk.CTkScrollableFrame(self, fg_color="#1a1c20", height=height)
+        self.list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.queue.add_listener(self.handle_job_update)
+        self.refresh()
+
+    def handle_job_update(self, job):
+        """Called by the render queue from a worker callback thread"""
+        try:
+            self.after(0, self._schedule_refresh)
+        except Exception as e:
+            print(f"Error in handle_job_update: {e}")
+
+    def _schedule_refresh(self):
+        """Coalesce bursts of job updates into one redraw"""
+        if self._refresh_job is None:
+            self._refresh_job = self.after(100, self.refresh)
+
+    def refresh(self):
+        """Redraw the job list"""
+        self._refresh_job = None
+        for item in self.list_frame.winfo_children():
+            item.destroy()
+
+        jobs = self.queue.jobs()
+        active = sum(1 for job in jobs if job.state not in FINISHED_STATES)
+        self.title_label.configure(
+            text=f"Background Jobs ({active} running)" if active else "Background Jobs"
+        )
+
+        if not jobs:
+            ctk.CTkLabel(
+                self.list_frame,
+                text="No documents are being rendered",
+                text_color="#A0A0A0"
+            ).pack(pady=10)
+            return
+
+        for i, job in enumerate(jobs):
+            self._add_job_row(job, i)
+
+    def _add_job_row(self, job, index):
+        """Add the row of one job"""
+        state = job.state
+        row = ctk.CTkFrame(self.list_frame, fg_color="#1a1c20" if index % 2 == 0 else "#2d2f35")
+        row.pack(fill="x", pady=1)
+
+        ctk.CTkLabel(row, text=job.title, width=260, anchor="w", text_color="#ffffff").pack(side="left", padx=5, pady=5)
+
+        progress = ctk.CTkProgressBar(row, width=150)
+        progress.set(job.progress)
+        progress.pack(side="left", padx=5)
+
+        finished = sum(1 for task in job.tasks if task.state in FINISHED_STATES)
+        ctk.CTkLabel(
+            row,
+            text=f"{state} {finished}/{len(job.tasks)}",
+            width=110,
+            text_color=STATE_COLORS.get(state, "#ffffff")
+        ).pack(side="left", padx=5)
+
+        if state not in FINISHED_STATES:
+            self._add_button(row, "Cancel", lambda: self.queue.cancel(job.id), "#E76F51", "#D65F41")
+        if state in (FAILED, CANCELLED):
+            self._add_button(row, "Retry", lambda: self.queue.retry(job.id))
+        if job.errors:
+            self._add_button(row, "Errors", lambda: self.show_errors(job))
+        if job.outputs:
+            self._add_button(row, "Open", lambda: self.open_output(job))
+        if state in FINISHED_STATES:
+            self._add_button(row, "Remove", lambda: self.queue.remove(job.id))
+
+    def _add_button(self, row, text, command, fg_color="#3B8ED0", hover_color="#1F6AA5"):
+        """Add a small action button to a job row"""
+        ctk.CTkButton(
+            row,
+            text=text,
+            width=60,
+            height=24,
+            fg_color=fg_color,
+            hover_color=hover_color,
+            command=command
+        ).pack(side="left", padx=2)
+
+    def open_output(self, job):
+        """Open the document of a job, or its folder when it has several"""
+        outputs = job.outputs
+        path = outputs[0] if len(outputs) == 1 else os.path.dirname(outputs[0])
+        try:
+            CustomFunctions.open_path(path)
+        except Exception as e:
+            print(f"Could not open {path}: {e}")
+            messagebox.showwarning("Open", f"Could not open the document automatically. Please find it at:\n{path}")
+
+    def show_errors(self, job):
+        """Show why the documents of a job failed"""
+        messagebox.showerror(job.title, "\n".join(job.errors[:10]))
+
+    def clear_finished(self):
+        """Remove every finished job from the list"""
+        for job in self.queue.jobs():
+            if job.state in FINISHED_STATES:
+                self.queue.remove(job.id)
+        self.refresh()
+
+    def cleanup(self):
+        """Stop listening to the render queue"""
+        self.queue.remove_listener(self.handle_job_update)
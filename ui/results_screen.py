@@ -1,13 +1,24 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import customtkinter as ctk
 from ui.base_screen import BaseScreen
 from ui.custom_functions import CustomFunctions
 from db.database_utils import DatabaseUtils
 from db.data_access import results_data, students_data, courses_data, teachers_data
+from db.reference_data import reference_data
+from db.result_summary import get_summary
+from utils.result_index import LiveResultSet
 import utils.result_helpers as result_helpers
+from utils.marks_importer import MarksImporter
 import utils.pdf_generator as pdf_generator
+from utils.render_queue import render_queue, PDF
+from utils.result_dispatch import result_dispatcher
+from utils.marks_store import marks_store
+from utils.rankings import ranking_engine
+from utils.grading import grading
+from ui.jobs_panel import JobsPanel
 import os
+import threading
 
 class ResultsComponent(ctk.CTkFrame):
     """
@@ -28,6 +39,14 @@ class ResultsComponent(ctk.CTkFrame):
                 "action": "View",
             },
         ]
+        
+        # Live, indexed copy of result_data used for filtering and search
+        self.result_set = LiveResultSet()
+        self.result_set.add_listener(self.handle_results_update)
+        self._search_job = None
+
+        # Release function of this screen's marks store attachment (rankings)
+        self.release_marks_store = None
 
         # Create loading indicator (initially hidden)
         self.loading_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -76,6 +95,27 @@ class ResultsComponent(ctk.CTkFrame):
         )
         self.demo_button.pack(side="left", padx=10)
         
+        # Render every ready sheet in the current view in the background
+        self.export_button = ctk.CTkButton(
+            self.action_bar,
+            text="Export Sheets",
+            command=self.export_sheets,
+            width=120,
+            fg_color="#3B8ED0",
+            hover_color="#1F6AA5"
+        )
+        self.export_button.pack(side="left", padx=10)
+        
+        self.jobs_button = ctk.CTkButton(
+            self.action_bar,
+            text="Jobs",
+            command=self.toggle_jobs_panel,
+            width=70,
+            fg_color="#3B8ED0",
+            hover_color="#1F6AA5"
+        )
+        self.jobs_button.pack(side="left", padx=10)
+        
         # Filter options
         self.filter_frame = ctk.CTkFrame(self.action_bar, fg_color="#2d2f35")
         self.filter_frame.pack(side="right", padx=10)
@@ -122,6 +162,9 @@ class ResultsComponent(ctk.CTkFrame):
         )
         self.search_entry.pack(side="left", padx=(0, 10))
         
+        # Filter as the user types
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        
         self.search_button = ctk.CTkButton(
             self.search_frame,
             text="Search",
@@ -154,6 +197,9 @@ class ResultsComponent(ctk.CTkFrame):
         )
         self.count_label.pack(side="left", padx=10, pady=5)
 
+        # Background rendering jobs (shown on demand)
+        self.jobs_panel = JobsPanel(self.content)
+        
         self.table_frame = ctk.CTkFrame(self.content, fg_color="#2d2f35")
         self.table_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
@@ -184,24 +230,23 @@ class ResultsComponent(ctk.CTkFrame):
         # Populate table with result data
         self.populate_table()
     
-    def populate_table(self):
+    def populate_table(self, results=None):
         """Populate the table with result data"""
+        if results is None:
+            results = self.results
+        
         # Clear existing data
         for item in self.table_container.winfo_children():
             item.destroy()
         
         # Add results to table
-        for i, result in enumerate(self.results):
+        for i, result in enumerate(results):
             row = ctk.CTkFrame(self.table_container, fg_color="#1a1c20" if i % 2 == 0 else "#2d2f35")
             row.pack(fill="x", pady=1)
 
             
-            # Check if one of the subjects is pending
-            all_pending = "Ready"
-            # print(f"Printing result data in popuate : {result}")
-            if 'pending' in [status.lower() for status in result['status'].values()]:
-                    all_pending = "Pending"
-            # print(f"Printing all pending : {all_pending}")
+            # Pending if one of the subjects is pending (derived when decoded)
+            all_pending = get_summary(result)['state']
             # Add result data
             ctk.CTkLabel(row, text=result.get('id', 'N/A'), width=240, text_color="#ffffff").pack(side="left", padx=5, pady=10)
             ctk.CTkLabel(row, text=str(result.get('class', 'N/A')), width=80, text_color="#ffffff").pack(side="left", padx=5, pady=10)
@@ -248,7 +293,7 @@ class ResultsComponent(ctk.CTkFrame):
             )
             create_btn.pack(side="left", padx=2)
 
-            # Create Result button
+            # Send Result button
             create_btn = ctk.CTkButton(
                 actions_frame,
                 text="Send",
@@ -256,7 +301,7 @@ class ResultsComponent(ctk.CTkFrame):
                 height=24,
                 fg_color="#3B8ED0",
                 hover_color="#1F6AA5",
-                command=lambda r=result, status=all_pending: self.create_result(r, status)
+                command=lambda r=result, status=all_pending: self.send_result(r, status)
             )
             create_btn.pack(side="left", padx=2)
 
@@ -290,10 +335,9 @@ class ResultsComponent(ctk.CTkFrame):
     def add_result_entry(self):
         """Show dialog to add a new result entry"""
 
-        # Get data from database
-        main_data = DatabaseUtils.get_document_by_id("main_data", "app_data")
-        # Get class incharges from database
-        class_incharges = DatabaseUtils.get_document_by_id("main_data", "class_incharges")
+        # Classes, sections, subjects and incharges are kept in memory by the
+        # reference data service, so opening the dialog needs no I/O
+        reference_data.ensure_loaded()
         
         # Create dialog window
         dialog = ctk.CTkToplevel(self)
@@ -331,8 +375,8 @@ class ResultsComponent(ctk.CTkFrame):
         class_label.grid(row=0, column=0, sticky="e", padx=(0,10), pady=10)
         
         class_var = tk.StringVar()
-        # Get classes from database
-        class_options = main_data.get('classes', ['11', '12'])  # Fallback to defaults if not found
+        # Get classes from the reference data
+        class_options = reference_data.get_classes()
         class_dropdown = ctk.CTkOptionMenu(
             form_frame,
             variable=class_var,
@@ -433,12 +477,7 @@ class ResultsComponent(ctk.CTkFrame):
             
             # Get subjects for this class and section
             try:
-                if ('section_subjects' in main_data and 
-                    current_class in main_data['section_subjects'] and 
-                    current_section in main_data['section_subjects'][current_class]):
-                    subjects = main_data['section_subjects'][current_class][current_section]
-                else:
-                    subjects = []
+                subjects = reference_data.get_subjects(current_class, current_section)
                     
                 # Create entry fields for each subject
                 for i, subject in enumerate(subjects):
@@ -493,12 +532,11 @@ class ResultsComponent(ctk.CTkFrame):
             section_dropdown.configure(values=[""])
             section_var.set("")
             
-            # Get sections for selected class from database
-            if current_class and 'sections' in main_data and current_class in main_data['sections']:
-                section_options = main_data['sections'][current_class]
+            # Get sections for selected class from the reference data
+            section_options = reference_data.get_sections(current_class) if current_class else []
+            if section_options:
                 section_dropdown.configure(values=section_options)
-                if section_options:
-                    section_var.set(section_options[0])
+                section_var.set(section_options[0])
             
             # Also update teacher after changing class
             update_teacher()
@@ -519,10 +557,9 @@ class ResultsComponent(ctk.CTkFrame):
                     incharge_entry.insert(0, "")
                     return
                 
-                # Update with appropriate incharge from database
-                if (current_class in class_incharges and 
-                    current_section in class_incharges[current_class]):
-                    teacher_name = class_incharges[current_class][current_section]
+                # Update with appropriate incharge from the reference data
+                teacher_name = reference_data.get_incharge(current_class, current_section)
+                if teacher_name:
                     incharge_entry.insert(0, teacher_name)
                 else:
                     # Fallback if specific combination not found
@@ -607,8 +644,8 @@ class ResultsComponent(ctk.CTkFrame):
                     # Show success message
                     self.status_label.configure(text="✅ Result entry added!", text_color="#4CC9F0")
                     
-                    # Refresh the data
-                    self.after(100, self._load_tab_data)
+                    # Show the new result
+                    self.refresh_result(result_id)
                     
                     # Close dialog
                     dialog.destroy()
@@ -653,82 +690,136 @@ class ResultsComponent(ctk.CTkFrame):
             return
 
         try:
-            # --- Data Extraction ---
-            result_id = result.get('id', 'UnknownResult')
-            class_num = result.get('class', 'N/A')
-            section = result.get('section', 'N/A')
-            test_name = result.get('test_name', 'Result Sheet')
-            # Extract the new maxMarks dictionary
-            max_marks_map = result.get('maxMarks', {}) # Get the map
-            if not max_marks_map:
-                 messagebox.showwarning("Warning", "Max marks data ('maxMarks') is missing or empty for this result. Total marks might be incorrect.")
-                 # Decide if you want to stop or continue with default/zero values
-
-            subjects = list(result.get('status', {}).keys())
-            if not subjects:
-                 messagebox.showerror("Error", "No subjects found for this result entry.")
-                 return
-
-            students_marks_data = result.get('marks', {})
-            if not students_marks_data:
-                 messagebox.showinfo("Info", "No student marks data found to generate PDF.")
-                 return
-
-            # --- PDF Generation ---
-            pdf_title = f"{test_name} ({class_num} - {section})"
-
-            # Instantiate the generator passing the max_marks_map
-            generator = pdf_generator.ResultSheetGenerator(
-                exam_title=pdf_title,
-                max_marks_map=max_marks_map # Pass the map here
-                # Removed max_marks_per_subject
-            )
+            pdf_generator.check_result_sheet(result)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
 
-            # Set subjects (important for order)
-            generator.set_subjects(subjects)
+        # Rendering happens on the worker processes, progress shows in the jobs panel
+        job = render_queue.submit(PDF, [(self.sheet_data(result), self.output_path_for(result))], self.job_title_for(result))
+        self.show_jobs_panel()
 
-            # --- Sort Students (as before) ---
+        if not result.get('maxMarks'):
+            self.status_label.configure(text=f"⚠ Max marks missing, totals may be wrong ({job.title})", text_color="#FFBE0B")
+        else:
+            self.status_label.configure(text=f"📄 Rendering {job.title}...", text_color="#4CC9F0")
+
+    def export_sheets(self):
+        """Render the PDF sheets of every ready result in the current view"""
+        selected_class = self.class_var.get()
+        results = self.result_set.filter(
+            text=self.search_entry.get(),
+            class_number=None if selected_class == "All Classes" else selected_class,
+            state="Ready"
+        )
+
+        items = []
+        skipped = 0
+        for result in results:
             try:
-                sorted_student_items = sorted(
-                    students_marks_data.items(),
-                    key=lambda item: int(item[0])
-                )
+                pdf_generator.check_result_sheet(result)
             except ValueError:
-                 messagebox.showerror("Error", "Could not sort students by roll number. Ensure roll numbers are numeric.")
-                 return
-
-            # --- Add Students (as before) ---
-            for roll_no, student_data in sorted_student_items:
-                student_name = student_data.get('name', 'Unknown Name')
-                student_subject_results = student_data.get('result', {})
-                marks_in_order = []
-                for subj in subjects:
-                    marks_in_order.append(student_subject_results.get(subj, 0))
-                generator.add_student(roll_no, student_name, *marks_in_order)
-
-            # --- Save and Open PDF (as before) ---
-            output_dir = os.path.join(os.path.expanduser("~"), "Documents", "SmartResultSystem")
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-
-            pdf_filename = f"Result_{class_num}_{section}_{result_id}.pdf"
-            pdf_filepath = os.path.join(output_dir, pdf_filename)
-
-            generated_path = generator.generate_pdf(filepath=pdf_filepath)
-
-            if generated_path:
-                messagebox.showinfo("Success", f"PDF generated successfully!\nSaved to: {generated_path}")
-                try:
-                    os.startfile(generated_path)
-                except Exception as e:
-                    print(f"Could not auto-open PDF: {e}")
-                    messagebox.showwarning("Open PDF", f"Could not automatically open the PDF. Please find it at:\n{generated_path}")
-            else:
-                messagebox.showerror("Error", "Failed to generate PDF.")
+                skipped += 1
+                continue
+            items.append((self.sheet_data(result), self.output_path_for(result)))
+
+        if not items:
+            messagebox.showinfo("Export Sheets", "There are no ready results with marks to export.")
+            return
 
+        render_queue.submit(PDF, items, f"{len(items)} result sheets")
+        self.show_jobs_panel()
+        message = f"📄 Rendering {len(items)} sheets..."
+        if skipped:
+            message += f" ({skipped} without marks skipped)"
+        self.status_label.configure(text=message, text_color="#4CC9F0")
+
+    def send_result(self, result, status):
+        """Send a ready result to the parents of its students"""
+        if status != "Ready":
+            messagebox.showwarning("Cannot Send Result", "Cannot send the result because some subject results are still pending.")
+            return
+
+        question = f"Send {self.job_title_for(result)} to the parents of {len(result.get('marks') or {})} students?"
+        if not result_dispatcher.transport.delivers:
+            question += "\n\nNo messaging service is configured, so the messages will only be simulated."
+        if not messagebox.askyesno("Send Result", question):
+            return
+
+        self.status_label.configure(text=f"📨 Preparing {self.job_title_for(result)}...", text_color="#FFBE0B")
+
+        data = self.sheet_data(result)
+
+        def start():
+            try:
+                students = students_data.get_all()
+                result_dispatcher.dispatch(
+                    data,
+                    students,
+                    on_progress=lambda job: self.after(0, lambda: self._update_send_progress(result, job))
+                )
+            except Exception as e:
+                print(f"Error sending result: {e}")
+                self.after(0, lambda: self.status_label.configure(text=f"Error sending result: {e}", text_color="#E76F51"))
+
+        # Reading the students and sending both happen off the Tk thread
+        threading.Thread(target=start, daemon=True).start()
+
+    def _update_send_progress(self, result, job):
+        """Show the progress of a dispatch job in the status label"""
+        try:
+            title = self.job_title_for(result)
+            if not job.done.is_set():
+                self.status_label.configure(
+                    text=f"📨 Sending {title}: {job.processed}/{job.total}",
+                    text_color="#FFBE0B"
+                )
+                return
+
+            if job.simulated:
+                message = f"🧪 {title}: {job.sent} simulated, nothing delivered (no messaging service configured)"
+            else:
+                message = f"✅ {title}: {job.sent} sent"
+            if job.skipped:
+                message += f", {job.skipped} skipped"
+            if job.failed:
+                message += f", {job.failed} failed"
+            self.status_label.configure(text=message, text_color="#E76F51" if job.failed else "#4CC9F0")
+            if job.failed:
+                messagebox.showerror("Send Result", "\n".join(job.errors[:10]))
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during PDF generation: {str(e)}")
-            print(f"Error in create_pdf: {e}")
+            print(f"Error updating send progress: {e}")
+
+    def sheet_data(self, result):
+        """Copy of a result with the grades and positions of its students"""
+        if self.release_marks_store is None:
+            if not marks_store.attached:
+                # Rank from the results already loaded, then follow changes
+                marks_store.load(self.result_set.all())
+            self.release_marks_store = marks_store.attach(results_data)
+        return grading.with_grades(ranking_engine.with_positions(result))
+
+    def output_path_for(self, result):
+        """Where the sheet of a result is saved"""
+        output_dir = os.path.join(os.path.expanduser("~"), "Documents", "SmartResultSystem")
+        pdf_filename = f"Result_{result.get('class', 'N/A')}_{result.get('section', 'N/A')}_{result.get('id', 'UnknownResult')}.pdf"
+        return os.path.join(output_dir, pdf_filename)
+
+    def job_title_for(self, result):
+        """Title of a result's render job"""
+        return f"{result.get('test_name', 'Result')} ({result.get('class', 'N/A')} - {result.get('section', 'N/A')})"
+
+    def toggle_jobs_panel(self):
+        """Show or hide the background jobs panel"""
+        if self.jobs_panel.winfo_ismapped():
+            self.jobs_panel.pack_forget()
+        else:
+            self.show_jobs_panel()
+
+    def show_jobs_panel(self):
+        """Show the background jobs panel under the table"""
+        if not self.jobs_panel.winfo_ismapped():
+            self.jobs_panel.pack(side="bottom", fill="x", padx=10, pady=(0, 5), before=self.table_frame)
     
     def print_result(self):
         #functionality coming soon
@@ -750,6 +841,12 @@ class ResultsComponent(ctk.CTkFrame):
         for subject in result.get('status', {}).keys():
             fields.append((subject, result.get('status', {}).get(subject, 'N/A')))
 
+        # Grade counts under the scale of the class/test
+        grade_counts, mean_gpa = grading.summary(result)
+        if mean_gpa is not None:
+            fields.append(("Grades:", "  ".join(f"{grade}: {count}" for grade, count in grade_counts.items() if count)))
+            fields.append(("Average GPA:", f"{mean_gpa:.2f}"))
+
         # Create dialog window
         dialog = ctk.CTkToplevel(self)
         dialog.title("View Result Details")
@@ -792,106 +889,200 @@ class ResultsComponent(ctk.CTkFrame):
                 text_color="#ffffff"
             ).grid(row=i, column=1, sticky="w", pady=5)
         
-        # Close button
+        # Buttons
+        buttons_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        buttons_frame.pack(pady=20)
+        
+        import_btn = ctk.CTkButton(
+            buttons_frame,
+            text="Import Marks",
+            command=lambda: self.import_marks(result, dialog, import_btn),
+            fg_color="#3B8ED0",
+            hover_color="#1F6AA5"
+        )
+        import_btn.pack(side="left", padx=5)
+        
+        delete_btn = ctk.CTkButton(
+            buttons_frame,
+            text="Delete Result",
+            command=lambda: self.delete_result(result, dialog),
+            fg_color="#E76F51",
+            hover_color="#D65F41"
+        )
+        delete_btn.pack(side="left", padx=5)
+        
         close_btn = ctk.CTkButton(
-            content_frame,
+            buttons_frame,
             text="Close",
             command=dialog.destroy,
             fg_color="#3B8ED0",
             hover_color="#1F6AA5"
         )
-        close_btn.pack(pady=20)
+        close_btn.pack(side="left", padx=5)
         
         # Make dialog modal
         dialog.transient(self)
         dialog.grab_set()
         self.wait_window(dialog)
     
+    def delete_result(self, result, parent=None):
+        """Delete a result sheet together with its entries in the student histories"""
+        if not messagebox.askyesno(
+            "Delete Result",
+            f"Delete result {result.get('id')}? Its marks are removed from the student histories too.",
+            parent=parent
+        ):
+            return
+        if parent is not None:
+            parent.destroy()
+        self.status_label.configure(text="Deleting result...", text_color="#FFBE0B")
+        
+        def run():
+            try:
+                deleted = result_helpers.delete_result(result.get('id'))
+            except Exception as e:
+                print(f"Error deleting result: {e}")
+                deleted = False
+            self.after(0, lambda: self._finish_delete(result, deleted))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _finish_delete(self, result, deleted):
+        """Report the outcome of deleting a result (main thread)"""
+        if not deleted:
+            self.status_label.configure(text="Failed to delete result", text_color="#E76F51")
+            messagebox.showerror("Delete Result", "Failed to delete the result")
+            return
+        self.result_set.remove(result.get('id'))
+        self.status_label.configure(text="🗑️ Result deleted", text_color="#4CC9F0")
+    
+    def import_marks(self, result, parent=None, button=None):
+        """Import a marks spreadsheet (roll no, name, subject columns) into a result"""
+        path = filedialog.askopenfilename(
+            parent=parent,
+            title="Import Marks",
+            filetypes=[("Spreadsheets", "*.csv *.xlsx"), ("CSV files", "*.csv"), ("Excel files", "*.xlsx")]
+        )
+        if not path:
+            return
+        
+        if button:
+            button.configure(state="disabled")
+        self.status_label.configure(text="📥 Importing marks...", text_color="#FFBE0B")
+        
+        # Parsing and saving run off the Tk thread; the outcome is shown with after()
+        def run():
+            try:
+                report = MarksImporter(uploaded_by="Admin").run(path, result.get('id'))
+                # Read the saved sheet here too, so the live set is updated without a read on the Tk thread
+                saved = results_data.get_by_id(result.get('id')) if report.saved else None
+                self.after(0, lambda: self._finish_marks_import(saved, report, parent, button))
+            except ValueError as e:
+                error = str(e)
+                self.after(0, lambda: self._finish_marks_import(None, None, parent, button, error))
+            except Exception as e:
+                print(f"Error importing marks: {e}")
+                self.after(0, lambda: self._finish_marks_import(None, None, parent, button, "Failed to import marks"))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _finish_marks_import(self, saved, report, parent, button, error=None):
+        """Report the outcome of a marks import (main thread)"""
+        if parent is not None and not parent.winfo_exists():
+            parent = button = None
+        if button:
+            button.configure(state="normal")
+        
+        if report is None:
+            self.status_label.configure(text="Marks import failed", text_color="#E76F51")
+            messagebox.showerror("Import Marks", error, parent=parent)
+            return
+        
+        self.status_label.configure(text="📥 Marks import finished", text_color="#4CC9F0")
+        if saved:
+            self.result_set.upsert(saved)
+        
+        if report.marks_count:
+            lines = [f"{subject}: {count} marks" for subject, count in report.marks_count.items()]
+            message = "Imported marks\n\n" + "\n".join(lines)
+        elif report.saved is False and report.rejected and len(report.rejected) == report.processed:
+            message = "No valid rows were found."
+        else:
+            message = "No marks were saved."
+        
+        if report.ignored_columns:
+            message += f"\n\nIgnored columns: {', '.join(report.ignored_columns)}"
+        if report.rejected:
+            try:
+                report_path = report.write_rejections()
+                message += f"\n\n{len(report.rejected)} rows were rejected, see:\n{report_path}"
+            except OSError as e:
+                message += f"\n\n{len(report.rejected)} rows were rejected (report could not be saved: {e})"
+        
+        messagebox.showinfo("Import Marks", message, parent=parent)
+    
     def apply_filters(self, *args):
-        """Apply class and subject filters"""
+        """Apply class, status and search filters to the in-memory results"""
         selected_class = self.class_var.get()
         selected_status = self.subject_var.get()
+        search_term = self.search_entry.get()
         
-        print(f"Filtering: Class={selected_class}, Status={selected_status}")
-
-        # Get fresh data
-        all_results = results_data.get_all() or []
-        
-        # Sort by creation date first (latest first)
-        all_results.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-        
-        filtered_results = all_results
-        
-        # Apply class filter
-        if selected_class != "All Classes":
-            filtered_results = [r for r in filtered_results if str(r.get('class')) == selected_class]
-            print(f"After class filter: {len(filtered_results)} results")
-        
-        # Apply status filter
-        if selected_status != "All Results":
-            # Status is a dictionary with multiple values, need to check if any are "pending"
-            if selected_status == "Pending":
-                filtered_results = [
-                    r for r in filtered_results 
-                    if "status" in r and isinstance(r["status"], dict) and 
-                    "pending" in [status.lower() for status in r["status"].values()]
-                ]
-            else:  # Ready
-                filtered_results = [
-                    r for r in filtered_results 
-                    if "status" in r and isinstance(r["status"], dict) and 
-                    "pending" not in [status.lower() for status in r["status"].values()]
-                ]
-            print(f"After status filter: {len(filtered_results)} results")
-        
-        # Display filtered results temporarily
-        temp_results = self.results
-        self.results = filtered_results
+        filtered_results = self.result_set.filter(
+            text=search_term,
+            class_number=None if selected_class == "All Classes" else selected_class,
+            state=None if selected_status == "All Results" else selected_status
+        )
         
         # Update table with filtered data
-        self.populate_table()
-        self.count_label.configure(text=f"Filtered results: {len(filtered_results)}")
-        
-        # Restore original dataset (not display)
-        self.results = temp_results
+        self.populate_table(filtered_results)
+        if search_term.strip():
+            self.count_label.configure(text=f"Search results: {len(filtered_results)}")
+        elif len(filtered_results) != len(self.result_set):
+            self.count_label.configure(text=f"Filtered results: {len(filtered_results)}")
+        else:
+            self.count_label.configure(text=f"Total results: {len(filtered_results)}")
     
     def search_results(self):
         """Search results based on search entry"""
-        search_term = self.search_entry.get().lower()
-        
-        if not search_term:
+        if not self.search_entry.get().strip():
             # Reset filters and show all results
             self.class_var.set("All Classes")
             self.subject_var.set("All Results")
-            self._load_tab_data()
-            return
-        
-        # Get fresh data for searching
-        all_results = results_data.get_all() or []
-        
-        # Sort by creation date first (latest first)
-        all_results.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-        
-        filtered_results = [
-            r for r in all_results
-            if (search_term in str(r.get('id', '')).lower() or
-               search_term in str(r.get('class', '')).lower() or
-               search_term in str(r.get('class_incharge', '')).lower() or
-               search_term in str(r.get('section', '')).lower())
-        ]
-        
-        print(f"Search found {len(filtered_results)} results for '{search_term}'")
-        
-        # Store original results
-        temp_results = self.results
-        self.results = filtered_results
         
-        # Update table
-        self.populate_table()
-        self.count_label.configure(text=f"Search results: {len(filtered_results)}")
-        
-        # Restore original results (but not display)
-        self.results = temp_results
+        self.apply_filters()
+    
+    def schedule_search(self, event=None):
+        """Re-filter shortly after the user stops typing"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(150, self._run_scheduled_search)
+    
+    def _run_scheduled_search(self):
+        """Run the search scheduled by schedule_search"""
+        self._search_job = None
+        self.apply_filters()
+    
+    def handle_results_update(self, result_set):
+        """Handle changes to the live result set (may run on a listener thread)"""
+        try:
+            self.after(100, self._update_ui_after_data_change)
+        except Exception as e:
+            print(f"Error in handle_results_update: {e}")
+    
+    def _update_ui_after_data_change(self):
+        """Re-render the current view from memory on the main thread"""
+        try:
+            self.results = self.result_set.all()
+            self._update_filter_options()
+            self.apply_filters()
+        except Exception as e:
+            print(f"Error updating UI after data change: {e}")
+    
+    def _update_filter_options(self):
+        """Offer the classes that actually have results in the class filter"""
+        classes = self.result_set.values('class_number')
+        if classes:
+            self.class_filter.configure(values=["All Classes"] + classes)
     
     def on_tab_selected(self):
         """Called when this tab is selected"""
@@ -916,58 +1107,52 @@ class ResultsComponent(ctk.CTkFrame):
     def _load_tab_data(self):
         """Load data when tab is selected (safely on main thread)"""
         try:
-            # Add a small delay to make loading visible
-            def fetch_data():
-                try:
-                    # Get the data
-                    all_results = results_data.get_all()
-                    
-                    # Make sure we have a valid list
-                    if all_results is None:
-                        all_results = []
-                            
-                        # Sort results by created_at timestamp (latest first)
-                        all_results.sort(key=lambda x: x.get('created_at', 0), reverse=True)
-                        
-                    self.results = all_results
-                    print(f"Loaded {len(self.results)} results")
-                    
-                    # Update UI
-                    self.populate_table()
-                    self.count_label.configure(text=f"Total results: {len(self.results)}")
-                    
-                    # Update status
-                    self.status_label.configure(text="Results data loaded", text_color="#4CC9F0")
-                    self.after(3000, lambda: self.status_label.configure(
-                        text="📡 Real-time updates enabled",
-                        text_color="#4CC9F0"
-                    ))
-                            
-                        # Hide loading indicator and show content
-                    self.progress_bar.stop()
-                    self.loading_frame.place_forget()
-                    self.content.pack(fill="both", expand=True, padx=20, pady=(10, 20))
-                except Exception as e:
-                    print(f"Error loading tab data: {e}")
-                    self.status_label.configure(text=f"Error loading data: {e}", text_color="#E76F51")
-                            
-                    # Hide loading indicator in case of error
-                    self.progress_bar.stop()
-                    self.loading_frame.place_forget()
-                    self.content.pack(fill="both", expand=True, padx=20, pady=(10, 20))
-                
-                    # Add artificial delay of 1.5 seconds to see the loading animation
-                    self.after(1500, fetch_data)
-            fetch_data()     
+            if not self.result_set.attached:
+                # Read once, then keep the set live from the watch stream
+                self.result_set.load(results_data.get_all() or [])
+                self.result_set.attach(results_data)
+            
+            self.results = self.result_set.all()
+            print(f"Loaded {len(self.results)} results")
+            
+            # Update UI
+            self._update_filter_options()
+            self.apply_filters()
+            
+            # Update status
+            self.status_label.configure(text="Results data loaded", text_color="#4CC9F0")
+            self.after(3000, lambda: self.status_label.configure(
+                text="📡 Real-time updates enabled",
+                text_color="#4CC9F0"
+            ))
         except Exception as e:
-            print(f"Error in _load_tab_data outer function: {e}")
-            # Hide loading indicator in case of error
+            print(f"Error loading tab data: {e}")
+            self.status_label.configure(text=f"Error loading data: {e}", text_color="#E76F51")
+        finally:
+            # Hide loading indicator and show content
             self.progress_bar.stop()
             self.loading_frame.place_forget()
             self.content.pack(fill="both", expand=True, padx=20, pady=(10, 20))
     
+    def refresh_result(self, result_id):
+        """
+        Pull a single result into the live set after writing it
+        
+        The watch stream delivers the same change; reading the one document
+        makes it show up at once, also when no listener is available.
+        """
+        result = results_data.get_by_id(result_id) if result_id else None
+        if result:
+            self.result_set.upsert(result)
+    
     def cleanup(self):
         """Clean up resources when component is no longer needed"""
+        self.result_set.remove_listener(self.handle_results_update)
+        self.result_set.detach()
+        self.jobs_panel.cleanup()
+        if self.release_marks_store:
+            self.release_marks_store()
+            self.release_marks_store = None
         if hasattr(self, 'unsubscribe'):
             try:
                 self.unsubscribe()
@@ -984,8 +1169,8 @@ class ResultsComponent(ctk.CTkFrame):
         # Show notification
         self.status_label.configure(text="✅ Demo result added!", text_color="#4CC9F0")
         
-        # Refresh the data after adding
-        self.after(100, self._load_tab_data)
+        # Show the new result
+        self.refresh_result(result_id)
         
         # Reset status after 3 seconds
         self.after(3000, lambda: self.status_label.configure(
@@ -1,8 +1,84 @@
 import tkinter as tk
+from tkinter import messagebox, filedialog
 import customtkinter as ctk
+import threading
 from ui.base_screen import BaseScreen
 from ui.custom_functions import CustomFunctions
 from db.student_repository import StudentRepository
+from db.database_utils import DocumentExists
+from utils.student_importer import StudentImporter
+from utils.student_history import get_student_history
+
+def add_history_section(parent, student):
+    """
+    Add a student's results history (one row per test) to a details dialog
+
+    Args:
+        parent: Frame to add the section to
+        student: Student dict or record
+    """
+    ctk.CTkLabel(
+        parent,
+        text="Results History",
+        font=ctk.CTkFont(size=14, weight="bold")
+    ).pack(anchor="w", padx=10, pady=(15, 5))
+
+    history_frame = ctk.CTkScrollableFrame(parent, height=150, fg_color="#1a1c20")
+    history_frame.pack(fill="x", padx=10)
+
+    loading_label = ctk.CTkLabel(history_frame, text="Loading results...", text_color="#A0A0A0")
+    loading_label.pack(pady=10)
+
+    # The history is read off the Tk thread and shown with after()
+    def load():
+        try:
+            history = get_student_history(student)
+        except Exception as e:
+            print(f"Error loading results history: {e}")
+            history = []
+        try:
+            history_frame.after(0, lambda: show_history(history_frame, loading_label, student, history))
+        except Exception:
+            # The dialog was closed while the history was read
+            pass
+
+    threading.Thread(target=load, daemon=True).start()
+
+def show_history(history_frame, loading_label, student, history):
+    """Fill the history section once the history is read (main thread)"""
+    if not history_frame.winfo_exists():
+        return
+    loading_label.destroy()
+
+    if not history:
+        ctk.CTkLabel(
+            history_frame,
+            text="No results recorded" if student.get('roll_no') else "No roll number, results cannot be matched",
+            text_color="#A0A0A0"
+        ).pack(pady=10)
+        return
+
+    previous = None
+    for i, entry in enumerate(history):
+        row = ctk.CTkFrame(history_frame, fg_color="#1a1c20" if i % 2 == 0 else "#2d2f35")
+        row.pack(fill="x", pady=1)
+
+        ctk.CTkLabel(row, text=entry.get('test_name', ''), width=150, anchor="w").pack(side="left", padx=5)
+        ctk.CTkLabel(row, text=f"{entry.get('total', 0)}/{entry.get('max_total', 0)}", width=80).pack(side="left", padx=5)
+
+        percentage = entry.get('percentage', 0)
+        ctk.CTkLabel(row, text=f"{percentage:.2f}%", width=70).pack(side="left", padx=5)
+
+        # Change compared with the previous test
+        if previous is not None:
+            change = percentage - previous
+            ctk.CTkLabel(
+                row,
+                text=f"{change:+.2f}%",
+                width=70,
+                text_color="#4CC9F0" if change >= 0 else "#E76F51"
+            ).pack(side="left", padx=5)
+        previous = percentage
 
 class StudentsScreen(BaseScreen):
     """
@@ -296,7 +372,7 @@ class StudentsScreen(BaseScreen):
         """Show dialog to add a new student"""
         dialog = ctk.CTkToplevel(self)
         dialog.title("Add Student")
-        dialog.geometry("500x400")
+        dialog.geometry("500x500")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -337,20 +413,33 @@ class StudentsScreen(BaseScreen):
         class_entry = ctk.CTkEntry(fields_frame, width=300)
         class_entry.grid(row=1, column=1, padx=10, pady=10, sticky="w")
         
+        # Section and roll number, which match the student to their results
+        section_label = ctk.CTkLabel(fields_frame, text="Section:")
+        section_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
+        
+        section_entry = ctk.CTkEntry(fields_frame, width=300)
+        section_entry.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        
+        roll_label = ctk.CTkLabel(fields_frame, text="Roll No:")
+        roll_label.grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        
+        roll_entry = ctk.CTkEntry(fields_frame, width=300)
+        roll_entry.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        
         # Phone field
         phone_label = ctk.CTkLabel(fields_frame, text="Phone:")
-        phone_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
+        phone_label.grid(row=4, column=0, padx=10, pady=10, sticky="e")
         
         phone_entry = ctk.CTkEntry(fields_frame, width=300)
-        phone_entry.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        phone_entry.grid(row=4, column=1, padx=10, pady=10, sticky="w")
         
         # Status field
         status_label = ctk.CTkLabel(fields_frame, text="Status:")
-        status_label.grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        status_label.grid(row=5, column=0, padx=10, pady=10, sticky="e")
         
         status_var = tk.StringVar(value="Active")
         status_frame = ctk.CTkFrame(fields_frame, fg_color="transparent")
-        status_frame.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        status_frame.grid(row=5, column=1, padx=10, pady=10, sticky="w")
         
         active_radio = ctk.CTkRadioButton(
             status_frame,
@@ -382,6 +471,8 @@ class StudentsScreen(BaseScreen):
                 {
                     "name": name_entry.get(),
                     "class": class_entry.get(),
+                    "section": section_entry.get().strip(),
+                    "roll_no": roll_entry.get().strip(),
                     "phone": phone_entry.get(),
                     "status": status_var.get()
                 }
@@ -402,9 +493,13 @@ class StudentsScreen(BaseScreen):
     
     def edit_student_dialog(self, student):
         """Show dialog to edit a student"""
+        # Edit the version read now, so saving cannot overwrite someone else's later change
+        base, update_time = self.student_repo.edit_version(student['id'])
+        student = base or student
+        
         dialog = ctk.CTkToplevel(self)
         dialog.title("Edit Student")
-        dialog.geometry("500x400")
+        dialog.geometry("500x500")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -447,21 +542,36 @@ class StudentsScreen(BaseScreen):
         class_entry.insert(0, student.get('class', ''))
         class_entry.grid(row=1, column=1, padx=10, pady=10, sticky="w")
         
+        # Section and roll number, which match the student to their results
+        section_label = ctk.CTkLabel(fields_frame, text="Section:")
+        section_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
+        
+        section_entry = ctk.CTkEntry(fields_frame, width=300)
+        section_entry.insert(0, student.get('section', ''))
+        section_entry.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        
+        roll_label = ctk.CTkLabel(fields_frame, text="Roll No:")
+        roll_label.grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        
+        roll_entry = ctk.CTkEntry(fields_frame, width=300)
+        roll_entry.insert(0, student.get('roll_no', ''))
+        roll_entry.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        
         # Phone field
         phone_label = ctk.CTkLabel(fields_frame, text="Phone:")
-        phone_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
+        phone_label.grid(row=4, column=0, padx=10, pady=10, sticky="e")
         
         phone_entry = ctk.CTkEntry(fields_frame, width=300)
         phone_entry.insert(0, student.get('phone', ''))
-        phone_entry.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        phone_entry.grid(row=4, column=1, padx=10, pady=10, sticky="w")
         
         # Status field
         status_label = ctk.CTkLabel(fields_frame, text="Status:")
-        status_label.grid(row=3, column=0, padx=10, pady=10, sticky="e")
+        status_label.grid(row=5, column=0, padx=10, pady=10, sticky="e")
         
         status_var = tk.StringVar(value=student.get('status', 'Active'))
         status_frame = ctk.CTkFrame(fields_frame, fg_color="transparent")
-        status_frame.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        status_frame.grid(row=5, column=1, padx=10, pady=10, sticky="w")
         
         active_radio = ctk.CTkRadioButton(
             status_frame,
@@ -494,9 +604,13 @@ class StudentsScreen(BaseScreen):
                 {
                     "name": name_entry.get(),
                     "class": class_entry.get(),
+                    "section": section_entry.get().strip(),
+                    "roll_no": roll_entry.get().strip(),
                     "phone": phone_entry.get(),
                     "status": status_var.get()
-                }
+                },
+                base,
+                update_time
             )
         )
         save_button.pack(side="right", padx=10)
@@ -519,54 +633,74 @@ class StudentsScreen(BaseScreen):
             self.show_message("Validation Error", "All fields are required", "error")
             return
         
-        # Add student to database
-        new_id = self.student_repo.add(student_data)
+        # Add student to database; it is shown at once and confirmed in the background
+        new_id = self.student_repo.add_optimistic(
+            student_data,
+            lambda saved: self.after(0, lambda: self._finish_write(saved, "Student added", "Failed to add student"))
+        )
+        
+        # Add to our local data unless the listener already delivered it
+        if not any(student['id'] == new_id for student in self.students):
+            self.students.append(dict(student_data, id=new_id))
         
-        if new_id:
-            # Add ID to the student data
-            student_data['id'] = new_id
-            
-            # Add to our local data
-            self.students.append(student_data)
-            
-            # Refresh the table
-            self.populate_table()
-            
-            # Show success message
-            self.show_message("Success", "Student added successfully")
-            
-            # Close the dialog
-            dialog.destroy()
-        else:
-            self.show_message("Error", "Failed to add student", "error")
+        # Refresh the table
+        self.populate_table()
+        self.status_label.configure(text="Saving student...")
+        
+        # Close the dialog
+        dialog.destroy()
+    
+    def _finish_write(self, saved, success_text, failure_text):
+        """Report the server's answer to an optimistic write"""
+        if saved:
+            self.status_label.configure(text=success_text)
+            return
+        
+        # The listener rolls the change back; reload in case it has not started
+        self.students = self.student_repo.get_all()
+        self.populate_table()
+        self.show_message("Error", f"{failure_text}. The change has been undone.", "error")
+    
+    def _finish_conflict(self):
+        """Report an edit rejected because someone else changed the student first"""
+        self.students = self.student_repo.get_all()
+        self.populate_table()
+        self.show_message(
+            "Error",
+            "This student was changed by someone else while you were editing. "
+            "Your change has been undone; please edit the student again.",
+            "error"
+        )
     
-    def update_student(self, dialog, student_id, student_data):
+    def update_student(self, dialog, student_id, student_data, base=None, update_time=None):
         """Update a student in the database"""
         # Validate required fields
         if not student_data['name'] or not student_data['class'] or not student_data['phone']:
             self.show_message("Validation Error", "All fields are required", "error")
             return
         
-        # Update student in database
-        if self.student_repo.update(student_id, student_data):
-            # Update in our local data
-            for i, student in enumerate(self.students):
-                if student['id'] == student_id:
-                    # Keep the ID
-                    student_data['id'] = student_id
-                    self.students[i] = student_data
-                    break
-            
-            # Refresh the table
-            self.populate_table()
-            
-            # Show success message
-            self.show_message("Success", "Student updated successfully")
-            
-            # Close the dialog
-            dialog.destroy()
-        else:
-            self.show_message("Error", "Failed to update student", "error")
+        # Update student in database; the change is shown at once and confirmed in the background
+        self.student_repo.update_optimistic(
+            student_id,
+            student_data,
+            lambda saved: self.after(0, lambda: self._finish_write(saved, "Student updated", "Failed to update student")),
+            base,
+            update_time,
+            lambda: self.after(0, self._finish_conflict)
+        )
+        
+        # Update in our local data
+        for i, student in enumerate(self.students):
+            if student['id'] == student_id:
+                self.students[i] = dict(student, **student_data)
+                break
+        
+        # Refresh the table
+        self.populate_table()
+        self.status_label.configure(text="Saving student...")
+        
+        # Close the dialog
+        dialog.destroy()
     
     def delete_student(self, student=None):
         """Delete a student"""
@@ -575,18 +709,17 @@ class StudentsScreen(BaseScreen):
             if not self.confirm_dialog("Confirm Delete", f"Are you sure you want to delete student {student['name']}?"):
                 return
             
-            # Delete from database
-            if self.student_repo.delete(student['id']):
-                # Remove from our local data
-                self.students = [s for s in self.students if s['id'] != student['id']]
-                
-                # Refresh the table
-                self.populate_table()
-                
-                # Show success message
-                self.show_message("Success", "Student deleted successfully")
-            else:
-                self.show_message("Error", "Failed to delete student", "error")
+            # Delete from database; the student disappears at once
+            self.student_repo.delete_optimistic(
+                student['id'],
+                lambda saved: self.after(0, lambda: self._finish_write(saved, "Student deleted", "Failed to delete student"))
+            )
+            
+            # Remove from our local data
+            self.students = [s for s in self.students if s['id'] != student['id']]
+            
+            # Refresh the table
+            self.populate_table()
         else:
             self.show_message("Error", "Please select a student to delete", "error")
     
@@ -594,7 +727,7 @@ class StudentsScreen(BaseScreen):
         """View a student's details"""
         dialog = ctk.CTkToplevel(self)
         dialog.title("Student Details")
-        dialog.geometry("500x400")
+        dialog.geometry("500x600")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -670,6 +803,9 @@ class StudentsScreen(BaseScreen):
             created_value = ctk.CTkLabel(info_frame, text=str(student.get('created_at', 'N/A')))
             created_value.grid(row=5, column=1, padx=10, pady=10, sticky="w")
         
+        # Results across tests
+        add_history_section(details_frame, student)
+        
         # Buttons frame
         buttons_frame = ctk.CTkFrame(details_frame, fg_color="transparent")
         buttons_frame.pack(fill="x", padx=20, pady=(30, 20))
@@ -804,6 +940,14 @@ class StudentsComponent(ctk.CTkFrame):
         )
         self.add_button.pack(side="left", padx=10)
         
+        self.import_button = CustomFunctions.create_custom_button(
+            self.action_bar,
+            "Import Students",
+            self.import_students_dialog,
+            width=150
+        )
+        self.import_button.pack(side="left", padx=10)
+        
         # Search bar
         self.search_frame = ctk.CTkFrame(self.action_bar)
         self.search_frame.pack(side="right", padx=10)
@@ -862,6 +1006,10 @@ class StudentsComponent(ctk.CTkFrame):
         )
         self.count_label.pack(side="left", padx=10, pady=5)
         
+        # Import progress, only shown while an import is running
+        self.import_progress = ctk.CTkProgressBar(self.status_frame, width=200)
+        self.import_progress.set(0)
+        
         # Populate table with student data
         self.populate_table()
         
@@ -871,7 +1019,10 @@ class StudentsComponent(ctk.CTkFrame):
     def add_sample_data(self):
         """Add sample data to database if it's empty"""
         for student in self.students:
-            self.student_repo.add(student)
+            try:
+                self.student_repo.add(student)
+            except DocumentExists:
+                pass
     
     def setup_data_listener(self):
         """Setup real-time data listener for students"""
@@ -965,7 +1116,7 @@ class StudentsComponent(ctk.CTkFrame):
         """Show dialog to add a new student"""
         dialog = ctk.CTkToplevel(self)
         dialog.title("Add New Student")
-        dialog.geometry("500x600")
+        dialog.geometry("500x760")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -1007,6 +1158,19 @@ class StudentsComponent(ctk.CTkFrame):
         )
         class_menu.pack(fill="x", padx=10, pady=(0, 15))
         
+        # Section and roll number, which match the student to their results
+        section_label = ctk.CTkLabel(content_frame, text="Section:")
+        section_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        section_entry = ctk.CTkEntry(content_frame, width=350)
+        section_entry.pack(fill="x", padx=10, pady=(0, 15))
+        
+        roll_label = ctk.CTkLabel(content_frame, text="Roll No:")
+        roll_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        roll_entry = ctk.CTkEntry(content_frame, width=350)
+        roll_entry.pack(fill="x", padx=10, pady=(0, 15))
+        
         # Phone
         phone_label = ctk.CTkLabel(content_frame, text="Phone:")
         phone_label.pack(anchor="w", padx=10, pady=(10, 5))
@@ -1053,6 +1217,8 @@ class StudentsComponent(ctk.CTkFrame):
                     'id': id_entry.get(),
                     'name': name_entry.get(),
                     'class': class_var.get(),
+                    'section': section_entry.get().strip(),
+                    'roll_no': roll_entry.get().strip(),
                     'phone': phone_entry.get(),
                     'status': status_var.get()
                 }
@@ -1084,25 +1250,107 @@ class StudentsComponent(ctk.CTkFrame):
                 messagebox.showerror("Error", "Student ID and Name are required fields")
                 return
             
-            # Add to database
-            result = self.student_repo.add(student_data)
+            # The student ID becomes the document ID, so it must be unused
+            if any(student.get('id') == student_data['id'] for student in self.students):
+                messagebox.showerror("Error", f"Student ID {student_data['id']} already exists")
+                return
             
-            if result:
-                # Close dialog
-                dialog.destroy()
-                messagebox.showinfo("Success", "Student added successfully")
-            else:
-                messagebox.showerror("Error", "Failed to add student")
+            # Add to database; the listener shows it at once
+            self.student_repo.add_optimistic(
+                student_data,
+                lambda saved: self.after(0, lambda: self._finish_write(saved, "Student added", "Failed to add student")),
+                lambda: self.after(0, lambda: messagebox.showerror("Error", f"Student ID {student_data['id']} already exists"))
+            )
+            self.status_label.configure(text="Saving student...")
+            dialog.destroy()
         
         except Exception as e:
             print(f"Error saving student: {e}")
             messagebox.showerror("Error", "Failed to save student")
     
+    def _finish_write(self, saved, success_text, failure_text):
+        """Report the server's answer to an optimistic write"""
+        if saved:
+            self.status_label.configure(text=success_text)
+        else:
+            messagebox.showerror("Error", f"{failure_text}. The change has been undone.")
+    
+    def _finish_conflict(self):
+        """Report an edit rejected because someone else changed the student first"""
+        messagebox.showerror(
+            "Error",
+            "This student was changed by someone else while you were editing. "
+            "Your change has been undone; please edit the student again."
+        )
+    
+    def import_students_dialog(self):
+        """Pick a CSV/XLSX roster and import it in the background"""
+        path = filedialog.askopenfilename(
+            title="Import Students",
+            filetypes=[("Rosters", "*.csv *.xlsx"), ("CSV files", "*.csv"), ("Excel files", "*.xlsx")]
+        )
+        if not path:
+            return
+        
+        self.import_button.configure(state="disabled")
+        self.import_progress.set(0)
+        self.import_progress.pack(side="left", padx=10, pady=5)
+        self.status_label.configure(text="Importing students...", text_color="#FFBE0B")
+        
+        # Existing IDs are taken from the students already in memory
+        existing_ids = [student.get('id') for student in self.students]
+        
+        def progress(processed, total, imported):
+            self.after(0, lambda: self._update_import_progress(processed, total, imported))
+        
+        def run():
+            try:
+                importer = StudentImporter(self.student_repo, on_progress=progress)
+                report = importer.run(path, existing_ids)
+                self.after(0, lambda: self._finish_import(report))
+            except Exception as e:
+                print(f"Error importing students: {e}")
+                error = str(e)
+                self.after(0, lambda: self._finish_import(None, error))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _update_import_progress(self, processed, total, imported):
+        """Show import progress (main thread)"""
+        self.import_progress.set(processed / total if total else 0)
+        self.status_label.configure(
+            text=f"Importing students... {processed}/{total} ({imported} added)",
+            text_color="#FFBE0B"
+        )
+    
+    def _finish_import(self, report, error=None):
+        """Report the outcome of an import (main thread)"""
+        self.import_progress.pack_forget()
+        self.import_button.configure(state="normal")
+        self.status_label.configure(text="📡 Real-time updates enabled", text_color="#4CC9F0")
+        
+        if report is None:
+            messagebox.showerror("Error", f"Failed to import students: {error}")
+            return
+        
+        message = f"Imported {report.imported} of {report.processed} students."
+        if report.rejected:
+            try:
+                report_path = report.write_rejections()
+                message += f"\n\n{len(report.rejected)} rows were rejected, see:\n{report_path}"
+            except OSError as e:
+                message += f"\n\n{len(report.rejected)} rows were rejected (report could not be saved: {e})"
+        messagebox.showinfo("Import Students", message)
+    
     def edit_student_dialog(self, student):
         """Show dialog to edit a student"""
+        # Edit the version read now, so saving cannot overwrite someone else's later change
+        base, update_time = self.student_repo.edit_version(student['id'])
+        student = base or student
+        
         dialog = ctk.CTkToplevel(self)
         dialog.title("Edit Student")
-        dialog.geometry("500x600")
+        dialog.geometry("500x760")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -1147,6 +1395,21 @@ class StudentsComponent(ctk.CTkFrame):
         )
         class_menu.pack(fill="x", padx=10, pady=(0, 15))
         
+        # Section and roll number, which match the student to their results
+        section_label = ctk.CTkLabel(content_frame, text="Section:")
+        section_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        section_entry = ctk.CTkEntry(content_frame, width=350)
+        section_entry.insert(0, student.get('section', ''))
+        section_entry.pack(fill="x", padx=10, pady=(0, 15))
+        
+        roll_label = ctk.CTkLabel(content_frame, text="Roll No:")
+        roll_label.pack(anchor="w", padx=10, pady=(10, 5))
+        
+        roll_entry = ctk.CTkEntry(content_frame, width=350)
+        roll_entry.insert(0, student.get('roll_no', ''))
+        roll_entry.pack(fill="x", padx=10, pady=(0, 15))
+        
         # Phone
         phone_label = ctk.CTkLabel(content_frame, text="Phone:")
         phone_label.pack(anchor="w", padx=10, pady=(10, 5))
@@ -1194,9 +1457,13 @@ class StudentsComponent(ctk.CTkFrame):
                 {
                     'name': name_entry.get(),
                     'class': class_var.get(),
+                    'section': section_entry.get().strip(),
+                    'roll_no': roll_entry.get().strip(),
                     'phone': phone_entry.get(),
                     'status': status_var.get()
-                }
+                },
+                base,
+                update_time
             ),
             height=35,
             font=ctk.CTkFont(size=14),
@@ -1217,7 +1484,7 @@ class StudentsComponent(ctk.CTkFrame):
         )
         cancel_button.pack(side="right", padx=5)
     
-    def update_student(self, dialog, student_id, student_data):
+    def update_student(self, dialog, student_id, student_data, base=None, update_time=None):
         """Update an existing student"""
         try:
             # Validate data
@@ -1225,13 +1492,17 @@ class StudentsComponent(ctk.CTkFrame):
                 messagebox.showerror("Error", "Name is a required field")
                 return
             
-            # Update in database
-            if self.student_repo.update(student_id, student_data):
-                # Close dialog
-                dialog.destroy()
-                messagebox.showinfo("Success", "Student updated successfully")
-            else:
-                messagebox.showerror("Error", "Failed to update student")
+            # Update in database; the listener shows the change at once
+            self.student_repo.update_optimistic(
+                student_id,
+                student_data,
+                lambda saved: self.after(0, lambda: self._finish_write(saved, "Student updated", "Failed to update student")),
+                base,
+                update_time,
+                lambda: self.after(0, self._finish_conflict)
+            )
+            self.status_label.configure(text="Saving student...")
+            dialog.destroy()
         
         except Exception as e:
             print(f"Error updating student: {e}")
@@ -1241,7 +1512,7 @@ class StudentsComponent(ctk.CTkFrame):
         """View a student's details"""
         dialog = ctk.CTkToplevel(self)
         dialog.title("Student Details")
-        dialog.geometry("400x400")
+        dialog.geometry("400x700")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -1284,6 +1555,9 @@ class StudentsComponent(ctk.CTkFrame):
                 text_color=value_color
             ).pack(anchor="w", padx=20, pady=(5, 0))
         
+        # Results across tests
+        add_history_section(content_frame, student)
+        
         # Buttons frame
         buttons_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
         buttons_frame.pack(fill="x", padx=10, pady=(30, 0))
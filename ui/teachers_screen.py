@@ -4,6 +4,7 @@ from ui.base_screen import BaseScreen
 from ui.custom_functions import CustomFunctions
 import tkinter.messagebox as messagebox
 from db.teacher_repository import TeacherRepository
+from db.models import Record
 
 class TeachersScreen(BaseScreen):
     """
@@ -233,7 +234,7 @@ class TeachersScreen(BaseScreen):
             filtered_teachers = []
             
             for teacher in self.teachers:
-                if isinstance(teacher, dict):
+                if isinstance(teacher, (dict, Record)):
                     if (search_term in teacher.get("name", "").lower() or
                         search_term in teacher.get("id", "").lower() or
                         search_term in teacher.get("subject", "").lower() or
@@ -540,7 +541,7 @@ class TeachersComponent(ctk.CTkFrame):
             filtered_teachers = []
             
             for teacher in self.teachers:
-                if isinstance(teacher, dict):
+                if isinstance(teacher, (dict, Record)):
                     if (search_term in teacher.get("name", "").lower() or
                         search_term in teacher.get("id", "").lower() or
                         search_term in teacher.get("subject", "").lower() or
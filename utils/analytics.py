@@ -0,0 +1,270 @@
+from db.database_utils import DatabaseUtils
+from utils.marks_store import marks_store
+import numpy as np
+import datetime
+import hashlib
+import json
+import warnings
+
+# Percentage needed to pass a subject or a test
+PASS_PERCENTAGE = 33
+
+# Histogram bins over percentages (0-10, 10-20, ... 90-100)
+HISTOGRAM_BINS = np.arange(0, 101, 10)
+
+# Where the precomputed rollups are stored
+ANALYTICS_COLLECTION = "main_data"
+ANALYTICS_DOCUMENT = "analytics"
+
+def section_key(class_number, section):
+    """
+    Build the key used for a class section in the rollups
+
+    Args:
+        class_number: Class number
+        section (str): Section name
+
+    Returns:
+        str: Key such as '11|mb-blue'
+    """
+    return f"{class_number}|{section}"
+
+def summarize(values, pass_percentage=PASS_PERCENTAGE):
+    """
+    Compute summary statistics of a set of percentages
+
+    Args:
+        values (np.ndarray): Percentages, NaN for missing values
+        pass_percentage (float): Percentage needed to pass
+
+    Returns:
+        dict: count, mean, median, min, max, pass_rate and histogram
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {
+            'count': 0, 'mean': 0, 'median': 0, 'min': 0, 'max': 0,
+            'pass_rate': 0, 'histogram': [0] * (len(HISTOGRAM_BINS) - 1)
+        }
+
+    histogram, _ = np.histogram(np.clip(values, 0, 100), bins=HISTOGRAM_BINS)
+    return {
+        'count': int(values.size),
+        'mean': round(float(values.mean()), 2),
+        'median': round(float(np.median(values)), 2),
+        'min': round(float(values.min()), 2),
+        'max': round(float(values.max()), 2),
+        'pass_rate': round(float((values >= pass_percentage).mean() * 100), 2),
+        'histogram': histogram.tolist(),
+    }
+
+# Rollup fields that differ between clients computing the same rollups
+VOLATILE_FIELDS = ('version', 'generated_at', 'digest', 'updated_at')
+
+def rollups_digest(rollups):
+    """
+    Digest of the contents of some rollups
+
+    Clients may encode tests, sections and subjects in a different order,
+    so lists are compared as sorted lists.
+
+    Args:
+        rollups (dict): Rollups from compute_rollups
+
+    Returns:
+        str: Hex digest, equal for rollups of the same marks
+    """
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(key): canonical(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [canonical(item) for item in value]
+            return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+        return value
+
+    contents = {key: value for key, value in rollups.items() if key not in VOLATILE_FIELDS}
+    encoded = json.dumps(canonical(contents), sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+class AnalyticsEngine:
+    """
+    Class, section, subject and trend aggregates over the marks store.
+
+    Aggregates are computed with NumPy over the whole store at once and
+    cached against the store version, so repeated reads are free until a
+    result changes. compute_rollups() gathers everything the Analytics tab
+    shows into one JSON-friendly dictionary that can be materialized into
+    main_data/analytics and read back with a single document fetch.
+    """
+
+    def __init__(self, store=None, pass_percentage=PASS_PERCENTAGE, top_n=10):
+        """
+        Initialize the engine
+
+        Args:
+            store (MarksStore): Marks store to aggregate, defaults to the shared one
+            pass_percentage (float): Percentage needed to pass
+            top_n (int): Number of students in the top lists
+        """
+        self.store = store if store is not None else marks_store
+        self.pass_percentage = pass_percentage
+        self.top_n = top_n
+        self._cache_version = None
+        self._percentages = None
+        self._rollups = None
+
+    def percentages(self):
+        """
+        Get per-subject and overall percentages for every student and test
+
+        Returns:
+            tuple: (subject percentages student x subject x test,
+                    overall percentages student x test)
+        """
+        with self.store._lock:
+            if self._cache_version != self.store.version or self._percentages is None:
+                marks = self.store.marks().astype(np.float64)
+                max_marks = self.store.max_marks().astype(np.float64)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    subject_pct = marks / max_marks * 100
+
+                    # Only subjects the student actually has a mark in count
+                    counted = ~np.isnan(marks) & (max_marks > 0)
+                    obtained = np.where(counted, marks, 0).sum(axis=1)
+                    possible = np.where(counted, max_marks, 0).sum(axis=1)
+                    overall_pct = np.where(possible > 0, obtained / possible * 100, np.nan)
+
+                self._percentages = (subject_pct, overall_pct)
+                self._rollups = None
+                self._cache_version = self.store.version
+            return self._percentages
+
+    def compute_rollups(self):
+        """
+        Compute every aggregate shown by the Analytics tab
+
+        Returns:
+            dict: Rollups keyed by test, class, section and subject
+        """
+        subject_pct, overall_pct = self.percentages()
+        if self._rollups is not None:
+            return self._rollups
+
+        store = self.store
+        with store._lock:
+            tests = list(store.tests.values)
+            subjects = list(store.subjects.values)
+            sections = list(store.sections.values)
+            n_students = len(store.student_keys)
+            student_section = store.student_section[:n_students].copy()
+            student_keys = list(store.student_keys)
+            student_names = list(store.student_names)
+
+        rollups = {
+            'version': store.version,
+            'generated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'pass_percentage': self.pass_percentage,
+            'histogram_bins': HISTOGRAM_BINS.tolist(),
+            'tests': tests,
+            'subjects': subjects,
+            'sections': [section_key(cls, sec) for cls, sec in sections],
+            'overall': {},
+            'by_class': {},
+            'by_section': {},
+            'by_subject': {},
+            'top': {},
+            'trends': {},
+        }
+
+        classes = {}
+        for code, (cls, _) in enumerate(sections):
+            classes.setdefault(str(cls), []).append(code)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            for t, test in enumerate(tests):
+                test_pct = overall_pct[:, t]
+                rollups['overall'][test] = summarize(test_pct, self.pass_percentage)
+
+                for cls, codes in classes.items():
+                    mask = np.isin(student_section, codes)
+                    rollups['by_class'].setdefault(cls, {})[test] = summarize(
+                        test_pct[mask], self.pass_percentage
+                    )
+
+                for code, (cls, sec) in enumerate(sections):
+                    key = section_key(cls, sec)
+                    mask = student_section == code
+                    if not np.any(~np.isnan(test_pct[mask])):
+                        continue
+
+                    rollups['by_section'].setdefault(key, {})[test] = summarize(
+                        test_pct[mask], self.pass_percentage
+                    )
+                    rollups['by_subject'].setdefault(key, {})[test] = {
+                        subject: summarize(subject_pct[mask, s, t], self.pass_percentage)
+                        for s, subject in enumerate(subjects)
+                        if np.any(~np.isnan(subject_pct[mask, s, t]))
+                    }
+                    rollups['top'].setdefault(key, {})[test] = self._top_students(
+                        np.flatnonzero(mask), test_pct, student_keys, student_names
+                    )
+
+            # Test-over-test mean percentage for every section
+            for key, per_test in rollups['by_section'].items():
+                rollups['trends'][key] = [
+                    {'test': test, 'mean': per_test[test]['mean'], 'pass_rate': per_test[test]['pass_rate']}
+                    for test in tests if test in per_test
+                ]
+
+        self._rollups = rollups
+        return rollups
+
+    def _top_students(self, rows, test_pct, student_keys, student_names):
+        """Best students of a group for one test"""
+        values = test_pct[rows]
+        valid = ~np.isnan(values)
+        rows, values = rows[valid], values[valid]
+        order = np.argsort(-values, kind='stable')[:self.top_n]
+        return [
+            {
+                'roll_no': student_keys[rows[i]][2],
+                'name': student_names[rows[i]],
+                'percentage': round(float(values[i]), 2),
+            }
+            for i in order
+        ]
+
+    def materialize(self, rollups=None):
+        """
+        Store the rollups in main_data/analytics
+
+        Every client following result_data computes the same rollups after
+        a change, so they are stored with a digest of their contents and
+        only written when the stored digest differs: the first client
+        writes them and the others find them current.
+
+        Args:
+            rollups (dict): Rollups to store, computed if not given
+
+        Returns:
+            bool: True if stored (or already current), False otherwise
+        """
+        if rollups is None:
+            rollups = self.compute_rollups()
+        rollups = dict(rollups, digest=rollups_digest(rollups))
+        return DatabaseUtils.set_document_if_changed(ANALYTICS_COLLECTION, ANALYTICS_DOCUMENT, rollups, 'digest')
+
+    @staticmethod
+    def load_materialized():
+        """
+        Read the last materialized rollups
+
+        Returns:
+            dict: Rollups or None if none were stored yet
+        """
+        return DatabaseUtils.get_document_by_id(ANALYTICS_COLLECTION, ANALYTICS_DOCUMENT)
+
+# Shared engine over the shared marks store
+analytics_engine = AnalyticsEngine()
@@ -0,0 +1,427 @@
+from db.database_utils import DatabaseUtils, DOCUMENT_ID
+from db.data_access import main_data
+from utils.marks_store import marks_store
+from utils.analytics import analytics_engine, section_key
+from collections import OrderedDict
+import numpy as np
+import threading
+
+GRADING_COLLECTION = "main_data"
+GRADING_DOCUMENT = "grading_scales"
+
+DEFAULT_SCALE_NAME = "default"
+
+# Minimum percentage, grade and grade points, highest band first
+DEFAULT_BANDS = [
+    {'min': 90, 'grade': 'A+', 'gpa': 4.0},
+    {'min': 85, 'grade': 'A', 'gpa': 4.0},
+    {'min': 80, 'grade': 'A-', 'gpa': 3.7},
+    {'min': 75, 'grade': 'B+', 'gpa': 3.3},
+    {'min': 70, 'grade': 'B', 'gpa': 3.0},
+    {'min': 65, 'grade': 'B-', 'gpa': 2.7},
+    {'min': 60, 'grade': 'C+', 'gpa': 2.3},
+    {'min': 33, 'grade': 'C', 'gpa': 2.0},
+    {'min': 0, 'grade': 'F', 'gpa': 0.0},
+]
+
+# Graded result sheets kept in memory
+GRADE_CACHE_SIZE = 256
+
+class GradingScale:
+    """
+    Percentage bands mapped to letter grades and grade points.
+
+    Grades are assigned to whole arrays at once by looking the percentages
+    up in the sorted band thresholds with np.searchsorted.
+    """
+
+    def __init__(self, name, bands):
+        """
+        Initialize the scale
+
+        Args:
+            name (str): Scale name
+            bands (list): Dicts with 'min' percentage, 'grade' and 'gpa'
+
+        Raises:
+            ValueError: If there are no bands or a band is invalid
+        """
+        if not bands:
+            raise ValueError(f"Grading scale '{name}' has no bands")
+
+        try:
+            bands = sorted(
+                ({'min': float(band['min']), 'grade': str(band['grade']), 'gpa': float(band.get('gpa', 0))}
+                 for band in bands),
+                key=lambda band: band['min']
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            raise ValueError(f"Invalid band in grading scale '{name}': {e}")
+
+        self.name = name
+        self.bands = bands
+        self.thresholds = np.array([band['min'] for band in bands], dtype=np.float64)
+        self.grades = [band['grade'] for band in bands]
+        self._labels = np.array(self.grades + [''], dtype=object)
+        self._points = np.array([band['gpa'] for band in bands] + [np.nan], dtype=np.float64)
+
+    def band_index(self, percentages):
+        """
+        Find the band of every percentage
+
+        Args:
+            percentages (np.ndarray): Percentages of any shape, NaN for missing
+
+        Returns:
+            np.ndarray: Band index per value, len(bands) for missing values
+                (and values below the lowest band)
+        """
+        percentages = np.asarray(percentages, dtype=np.float64)
+        index = np.searchsorted(self.thresholds, percentages, side='right') - 1
+        index[(index < 0) | np.isnan(percentages)] = len(self.bands)
+        return index
+
+    def grade(self, percentages):
+        """
+        Get the letter grades of an array of percentages
+
+        Args:
+            percentages (np.ndarray): Percentages of any shape, NaN for missing
+
+        Returns:
+            np.ndarray: Grades ('' for missing values)
+        """
+        return self._labels[self.band_index(percentages)]
+
+    def gpa(self, percentages):
+        """
+        Get the grade points of an array of percentages
+
+        Args:
+            percentages (np.ndarray): Percentages of any shape, NaN for missing
+
+        Returns:
+            np.ndarray: Grade points (NaN for missing values)
+        """
+        return self._points[self.band_index(percentages)]
+
+    def distribution(self, percentages):
+        """
+        Count the percentages falling in each grade
+
+        Args:
+            percentages (np.ndarray): Percentages, NaN for missing
+
+        Returns:
+            dict: Grade -> count, highest grade first
+        """
+        counts = np.bincount(self.band_index(np.ravel(percentages)), minlength=len(self.bands) + 1)
+        return {grade: int(counts[i]) for i, grade in reversed(list(enumerate(self.grades)))}
+
+    def to_dict(self):
+        """Bands in the form they are stored in"""
+        return [dict(band) for band in reversed(self.bands)]
+
+DEFAULT_SCALE = GradingScale(DEFAULT_SCALE_NAME, DEFAULT_BANDS)
+
+def grade_marks(marks, max_marks, scale):
+    """
+    Grade a students x subjects marks matrix
+
+    Args:
+        marks (np.ndarray): Obtained marks, NaN where a student has none
+        max_marks (np.ndarray): Max marks per subject
+        scale (GradingScale): Scale to grade with
+
+    Returns:
+        dict: 'percentage' and 'grade' per student, 'subject_grade' per
+        student x subject, and 'gpa' per student (mean of the subject grade
+        points)
+    """
+    marks = np.asarray(marks, dtype=np.float64)
+    max_marks = np.asarray(max_marks, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        subject_pct = marks / max_marks * 100
+        counted = ~np.isnan(marks) & (max_marks > 0)
+        obtained = np.where(counted, marks, 0).sum(axis=1)
+        possible = np.where(counted, max_marks, 0).sum(axis=1)
+        percentage = np.where(possible > 0, obtained / possible * 100, np.nan)
+
+        subject_points = np.where(counted, scale.gpa(subject_pct), np.nan)
+        graded = (~np.isnan(subject_points)).sum(axis=1)
+        gpa = np.where(graded > 0, np.nansum(subject_points, axis=1) / np.maximum(graded, 1), np.nan)
+
+    return {
+        'percentage': percentage,
+        'grade': scale.grade(percentage),
+        'subject_grade': np.where(counted, scale.grade(subject_pct), ''),
+        'gpa': gpa,
+    }
+
+class GradingService:
+    """
+    Grading scales from main_data/grading_scales and the grades of result
+    sheets.
+
+    The document holds named scales plus the scale used per class and per
+    test (a test's scale wins over its class's). It is read once and kept
+    live through a listener on that document only. Graded sheets are cached
+    by result ID, update time and scale, so tables, sheets and analytics
+    share one computation per sheet version.
+    """
+
+    def __init__(self):
+        self._config = None
+        self._scales = {}
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        self._cache = OrderedDict()
+        self.version = 0
+
+    def start(self):
+        """
+        Start following main_data for scale changes
+
+        Returns:
+            Callable[[], None]: Function to call to stop following changes
+        """
+        if self._unsubscribe is None:
+            self._unsubscribe = main_data.watch(
+                self._handle_snapshot,
+                filters=[(DOCUMENT_ID, '==', GRADING_DOCUMENT)]
+            )
+        return self.stop
+
+    def stop(self):
+        """Stop following main_data"""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def ensure_loaded(self):
+        """
+        Get the grading configuration, reading it only if no snapshot has arrived yet
+
+        Returns:
+            dict: Stored configuration (empty when none was saved)
+        """
+        if self._config is None:
+            with self._lock:
+                if self._config is None:
+                    self._apply_config(DatabaseUtils.get_document_by_id(GRADING_COLLECTION, GRADING_DOCUMENT))
+        return self._config
+
+    def save(self, scales, default=DEFAULT_SCALE_NAME, by_class=None, by_test=None):
+        """
+        Store the grading scales
+
+        Args:
+            scales (dict): Scale name -> bands (see DEFAULT_BANDS)
+            default (str): Scale used when no class or test scale applies
+            by_class (dict): Class -> scale name
+            by_test (dict): Test name -> scale name
+
+        Returns:
+            bool: True if stored successfully, False otherwise
+
+        Raises:
+            ValueError: If a scale is invalid or an unknown scale is referenced
+        """
+        for name, bands in scales.items():
+            GradingScale(name, bands)
+        known = set(scales) | {DEFAULT_SCALE_NAME}
+        for name in [default] + list((by_class or {}).values()) + list((by_test or {}).values()):
+            if name not in known:
+                raise ValueError(f"Unknown grading scale '{name}'")
+
+        config = {
+            'scales': scales,
+            'default': default,
+            'by_class': {str(cls): name for cls, name in (by_class or {}).items()},
+            'by_test': dict(by_test or {}),
+        }
+        if not DatabaseUtils.set_document(GRADING_COLLECTION, GRADING_DOCUMENT, dict(config)):
+            return False
+        with self._lock:
+            self._apply_config(config)
+        return True
+
+    def scale_for(self, class_number=None, test_name=None):
+        """
+        Get the scale that applies to a class and test
+
+        Args:
+            class_number: Class of the result
+            test_name (str): Test of the result
+
+        Returns:
+            GradingScale: Scale to grade with
+        """
+        config = self.ensure_loaded()
+        name = (
+            (config.get('by_test') or {}).get(test_name)
+            or (config.get('by_class') or {}).get(str(class_number))
+            or config.get('default')
+            or DEFAULT_SCALE_NAME
+        )
+        return self._scales.get(name, DEFAULT_SCALE)
+
+    def grades_for(self, result):
+        """
+        Grade the students of a result sheet
+
+        Args:
+            result (dict): Result sheet data
+
+        Returns:
+            dict: Roll number -> {'percentage', 'grade', 'gpa', 'subjects':
+            {subject: grade}} for students with at least one mark
+        """
+        scale = self.scale_for(result.get('class'), result.get('test_name'))
+        key = (result.get('id'), str(result.get('updated_at')), scale.name, self.version)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        subjects = list((result.get('status') or {}).keys())
+        marks_map = result.get('marks') or {}
+        rolls = [str(roll_no) for roll_no in marks_map]
+
+        marks = np.full((len(rolls), len(subjects)), np.nan, dtype=np.float64)
+        for i, entry in enumerate(marks_map.values()):
+            subject_marks = (entry or {}).get('result') or {}
+            for j, subject in enumerate(subjects):
+                try:
+                    marks[i, j] = float(subject_marks[subject])
+                except (KeyError, ValueError, TypeError):
+                    pass
+
+        max_marks_map = result.get('maxMarks') or {}
+        max_marks = np.array([_to_float(max_marks_map.get(subject)) for subject in subjects], dtype=np.float64)
+
+        graded = grade_marks(marks, max_marks, scale) if subjects else None
+        grades = {}
+        for i, roll_no in enumerate(rolls):
+            if graded is None or np.isnan(graded['percentage'][i]):
+                continue
+            grades[roll_no] = {
+                'percentage': round(float(graded['percentage'][i]), 2),
+                'grade': graded['grade'][i],
+                'gpa': round(float(graded['gpa'][i]), 2),
+                'subjects': {
+                    subject: graded['subject_grade'][i, j]
+                    for j, subject in enumerate(subjects) if graded['subject_grade'][i, j]
+                },
+            }
+
+        with self._lock:
+            self._cache[key] = grades
+            while len(self._cache) > GRADE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return grades
+
+    def with_grades(self, result):
+        """
+        Copy a result sheet with its students' grades under 'grades'
+
+        Args:
+            result (dict): Result sheet data
+
+        Returns:
+            dict: Result data for sheets and report cards
+        """
+        graded = dict(result)
+        graded['grades'] = self.grades_for(result)
+        return graded
+
+    def summary(self, result):
+        """
+        Get the grade counts and mean GPA of a result sheet
+
+        Args:
+            result (dict): Result sheet data
+
+        Returns:
+            tuple: (grade -> count highest grade first, mean GPA or None)
+        """
+        scale = self.scale_for(result.get('class'), result.get('test_name'))
+        grades = self.grades_for(result)
+        counts = {grade: 0 for grade in reversed(scale.grades)}
+        for entry in grades.values():
+            counts[entry['grade']] = counts.get(entry['grade'], 0) + 1
+        gpas = [entry['gpa'] for entry in grades.values() if not np.isnan(entry['gpa'])]
+        return counts, (round(sum(gpas) / len(gpas), 2) if gpas else None)
+
+    def grade_distributions(self, store=None, percentages=None):
+        """
+        Count the grades of every section and of the whole campus per test
+
+        Args:
+            store (MarksStore): Marks store, defaults to the shared one
+            percentages (np.ndarray): Overall percentages student x test
+                aligned with the store, from the shared analytics engine if
+                not given
+
+        Returns:
+            dict: Test -> {'campus': counts, 'sections': {section key: counts}}
+        """
+        store = store if store is not None else marks_store
+        if percentages is None:
+            _, percentages = analytics_engine.percentages()
+        with store._lock:
+            tests = list(store.tests.values)
+            sections = list(store.sections.values)
+            n_students = len(store.student_keys)
+            student_section = store.student_section[:n_students]
+
+            distributions = {}
+            for t, test in enumerate(tests):
+                campus = {}
+                per_section = {}
+                for code, (cls, sec) in enumerate(sections):
+                    values = percentages[student_section == code, t]
+                    if not np.any(~np.isnan(values)):
+                        continue
+                    counts = self.scale_for(cls, test).distribution(values)
+                    per_section[section_key(cls, sec)] = counts
+                    for grade, count in counts.items():
+                        campus[grade] = campus.get(grade, 0) + count
+                distributions[test] = {'campus': campus, 'sections': per_section}
+            return distributions
+
+    def _apply_config(self, config):
+        """Replace the configuration and parsed scales (lock must be held)"""
+        config = config or {}
+        scales = {DEFAULT_SCALE_NAME: DEFAULT_SCALE}
+        for name, bands in (config.get('scales') or {}).items():
+            try:
+                scales[name] = GradingScale(name, bands)
+            except ValueError as e:
+                print(f"Ignoring grading scale: {e}")
+        self._scales = scales
+        self._config = config
+        self._cache.clear()
+        self.version += 1
+
+    def _handle_snapshot(self, docs):
+        """Pick up scale changes from a main_data snapshot"""
+        try:
+            for doc in docs or []:
+                if doc.get('id') == GRADING_DOCUMENT:
+                    with self._lock:
+                        self._apply_config(doc)
+                    return
+        except Exception as e:
+            print(f"Error updating grading scales: {e}")
+
+def _to_float(value):
+    """Convert a stored max mark to a float, NaN when it is missing or invalid"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+# Shared grading service
+grading = GradingService()
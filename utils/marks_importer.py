@@ -0,0 +1,187 @@
+from db.data_access import results_data
+from utils.result_helpers import parse_mark, upload_marks
+from utils.spreadsheets import cell_text, normalize_header, read_rows
+import csv
+import os
+
+ROLL_NO_HEADINGS = ('roll no', 'rollno', 'roll number', 'roll')
+NAME_HEADINGS = ('name', 'student name')
+
+# Cells treated as "no mark" (left out of the upload)
+BLANK_MARKS = ('', '-')
+
+def subject_key(name):
+    """
+    Normalize a subject name the way result sheets key their subjects
+
+    Args:
+        name: Subject name or column heading
+
+    Returns:
+        str: Key such as 'pak-studies'
+    """
+    return '-'.join(normalize_header(name).split())
+
+class MarksImportReport:
+    """
+    Outcome of a marks import
+    """
+
+    def __init__(self, path, result_id):
+        self.path = path
+        self.result_id = result_id
+        self.processed = 0
+        self.subjects = []        # subjects found in the sheet
+        self.marks_count = {}     # subject -> number of marks uploaded
+        self.ignored_columns = [] # headings that are not subjects of the result
+        self.rejected = []        # dicts with line, roll_no, name and reason
+        self.saved = False
+
+    def reject(self, line, roll_no, name, reason):
+        """Record a rejected row"""
+        self.rejected.append({'line': line, 'roll_no': roll_no, 'name': name, 'reason': reason})
+
+    def write_rejections(self, report_path=None):
+        """
+        Write the rejected rows to a CSV file
+
+        Args:
+            report_path (str): Where to write, defaults to <sheet>_rejected.csv
+
+        Returns:
+            str: Path of the report, or None if nothing was rejected
+        """
+        if not self.rejected:
+            return None
+        if report_path is None:
+            report_path = os.path.splitext(self.path)[0] + '_rejected.csv'
+
+        with open(report_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['line', 'roll_no', 'name', 'reason'])
+            writer.writeheader()
+            writer.writerows(self.rejected)
+        return report_path
+
+class MarksImporter:
+    """
+    Imports a teacher's marks spreadsheet into an existing result sheet.
+
+    The spreadsheet has a roll number column, an optional name column and
+    one column per subject. Subject columns are matched to the subjects of
+    the result sheet, every mark is validated against maxMarks, and all
+    valid marks are written with a single field-path update (see
+    result_helpers.upload_marks), so the whole section lands in one round
+    trip without touching subjects that are not in the file.
+    """
+
+    def __init__(self, uploaded_by, status='Ready'):
+        """
+        Initialize the importer
+
+        Args:
+            uploaded_by (str): Name recorded as the uploader of every subject
+            status (str): Status recorded for every imported subject
+        """
+        self.uploaded_by = uploaded_by
+        self.status = status
+
+    def run(self, path, result_id, result=None):
+        """
+        Import a marks spreadsheet
+
+        Args:
+            path (str): Path of a .csv or .xlsx file
+            result_id (str): ID of the result sheet to import into
+            result (dict): Current result sheet data, read if not given
+
+        Returns:
+            MarksImportReport: Uploaded marks per subject and rejected rows
+
+        Raises:
+            ValueError: If the file or the result sheet cannot be used
+        """
+        report = MarksImportReport(path, result_id)
+
+        if result is None:
+            result = results_data.get_by_id(result_id)
+        if not result:
+            raise ValueError(f"Result {result_id} not found")
+
+        subjects = {subject_key(subject): subject for subject in (result.get('status') or {})}
+        max_marks = result.get('maxMarks') or {}
+
+        rows = read_rows(path)
+        headings = next(rows, None)
+        if headings is None:
+            raise ValueError("The file is empty")
+
+        roll_column = name_column = None
+        subject_columns = []
+        for index, heading in enumerate(headings):
+            normalized = normalize_header(heading)
+            if not normalized:
+                continue
+            if normalized in ROLL_NO_HEADINGS:
+                roll_column = index
+            elif normalized in NAME_HEADINGS:
+                name_column = index
+            elif subject_key(heading) in subjects:
+                subject_columns.append((index, subjects[subject_key(heading)]))
+            else:
+                report.ignored_columns.append(cell_text(heading))
+
+        if roll_column is None:
+            raise ValueError("The file must have a 'Roll No' column")
+        if not subject_columns:
+            raise ValueError("None of the columns match a subject of this result")
+
+        report.subjects = [subject for _, subject in subject_columns]
+        marks_by_subject = {subject: {} for subject in report.subjects}
+        names = {}
+        seen = set()
+
+        for line, values in enumerate(rows, start=2):
+            values = [cell_text(value) for value in values]
+            if not any(values):
+                continue
+            report.processed += 1
+
+            roll_no = values[roll_column] if roll_column < len(values) else ''
+            name = values[name_column] if name_column is not None and name_column < len(values) else ''
+            if not roll_no:
+                report.reject(line, roll_no, name, "Missing roll number")
+                continue
+            if roll_no in seen:
+                report.reject(line, roll_no, name, "Duplicate roll number")
+                continue
+            seen.add(roll_no)
+
+            row_marks = {}
+            errors = []
+            for index, subject in subject_columns:
+                mark = values[index] if index < len(values) else ''
+                if mark in BLANK_MARKS:
+                    continue
+                try:
+                    row_marks[subject] = parse_mark(mark, max_marks.get(subject))
+                except ValueError as e:
+                    errors.append(f"{subject}: {e}")
+
+            # A row with any invalid mark is left out entirely
+            if errors:
+                report.reject(line, roll_no, name, "; ".join(errors))
+                continue
+
+            for subject, mark in row_marks.items():
+                marks_by_subject[subject][roll_no] = mark
+            if name:
+                names[roll_no] = name
+
+        marks_by_subject = {subject: marks for subject, marks in marks_by_subject.items() if marks}
+        if not marks_by_subject:
+            return report
+
+        report.saved = upload_marks(result_id, marks_by_subject, self.uploaded_by, names, self.status)
+        if report.saved:
+            report.marks_count = {subject: len(marks) for subject, marks in marks_by_subject.items()}
+        return report
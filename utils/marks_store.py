@@ -0,0 +1,371 @@
+import numpy as np
+import threading
+
+class Dictionary:
+    """
+    Dictionary encoding of strings (or tuples) to dense integer codes
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        """Get the code of a value, assigning a new one if needed"""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def get(self, value, default=None):
+        """Get the code of a value without assigning one"""
+        return self.codes.get(value, default)
+
+    def __len__(self):
+        return len(self.values)
+
+def _to_float(value):
+    """Convert a stored mark to a float, NaN when it is missing or invalid"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+class MarksStore:
+    """
+    Columnar in-memory store of the marks in result_data.
+
+    Marks are kept in one float32 array indexed by student x subject x test,
+    with subject, section and test names dictionary encoded. Missing marks
+    are NaN. Max marks are kept per section x subject x test, since every
+    result sheet covers one section for one test.
+
+    Students are identified by (class, section, roll number). Tests are
+    identified by name, so the sheets of one test line up across sections.
+    Several sheets for the same section and test (e.g. one per group of
+    subjects) are merged into that slot; where they overlap, the sheet
+    created last wins, and removing one sheet brings back the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._unsubscribe = None
+        self._attachments = 0
+
+        # Incremented on every change so derived caches can detect staleness
+        self.version = 0
+        self._reset()
+
+    def _reset(self):
+        """Clear every dictionary and array (lock must be held)"""
+        self.subjects = Dictionary()
+        self.sections = Dictionary()   # (class, section) tuples
+        self.tests = Dictionary()
+
+        self.student_rows = {}         # (class, section, roll_no) -> row
+        self.student_keys = []         # row -> (class, section, roll_no)
+        self.student_names = []        # row -> name
+        self.student_section = np.zeros(0, dtype=np.int32)
+
+        self._marks = np.full((0, 0, 0), np.nan, dtype=np.float32)
+        self._max_marks = np.full((0, 0, 0), np.nan, dtype=np.float32)
+
+        # result id -> (section code, test code, rows, subject codes, sheet)
+        self._sheets = {}
+        # (section code, test code) -> result ids writing into that slot
+        self._slots = {}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, sheets):
+        """
+        Replace the store contents with a list of result sheets
+
+        Args:
+            sheets (list): Result sheets as dicts or ResultSheet records
+        """
+        with self._lock:
+            self._reset()
+            for sheet in sheets or []:
+                self._apply_sheet(sheet)
+            self.version += 1
+        self._notify()
+
+    def apply_sheet(self, sheet):
+        """
+        Add or replace a single result sheet
+
+        Args:
+            sheet (dict or ResultSheet): Result sheet including its 'id'
+        """
+        with self._lock:
+            self._apply_sheet(sheet)
+            self.version += 1
+        self._notify()
+
+    def remove_sheet(self, result_id):
+        """
+        Remove the marks of a result sheet
+
+        Args:
+            result_id (str): Result sheet ID
+        """
+        with self._lock:
+            if self._clear_sheet(result_id):
+                self.version += 1
+        self._notify()
+
+    def attach(self, data_access):
+        """
+        Keep the store in sync with a result_data watch stream
+
+        Attachments are counted: the first one starts the watch, later ones
+        share it, and the watch stops when the last caller releases.
+
+        Args:
+            data_access (DataAccess): Data access object of result_data
+
+        Returns:
+            Callable[[], None]: Function to call when this caller no longer
+                needs the store synced; calling it again does nothing
+        """
+        with self._lock:
+            if self._unsubscribe is None:
+                self._unsubscribe = data_access.watch(self._handle_changes, include_changes=True)
+            self._attachments += 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            with self._lock:
+                if released:
+                    return
+                released = True
+                self._attachments -= 1
+                if self._attachments <= 0:
+                    self.detach()
+        return release
+
+    def detach(self):
+        """Stop following the watch stream for every caller"""
+        with self._lock:
+            self._attachments = 0
+            if self._unsubscribe:
+                self._unsubscribe()
+                self._unsubscribe = None
+
+    @property
+    def attached(self):
+        """Whether the store is following a watch stream"""
+        return self._unsubscribe is not None
+
+    def add_listener(self, callback):
+        """
+        Register a callback called (with the store) after every change
+
+        Args:
+            callback (Callable): Function to call
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a change callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    @property
+    def shape(self):
+        """(students, subjects, tests) currently in use"""
+        return (len(self.student_keys), len(self.subjects), len(self.tests))
+
+    def marks(self):
+        """
+        Get the marks array trimmed to its used size
+
+        Returns:
+            np.ndarray: float32 array of student x subject x test
+        """
+        n_students, n_subjects, n_tests = self.shape
+        return self._marks[:n_students, :n_subjects, :n_tests]
+
+    def max_marks(self):
+        """
+        Get the max marks aligned with marks()
+
+        Returns:
+            np.ndarray: float32 array of student x subject x test
+        """
+        n_students, n_subjects, n_tests = self.shape
+        per_section = self._max_marks[:len(self.sections), :n_subjects, :n_tests]
+        return per_section[self.student_section[:n_students]]
+
+    def student_mask(self, class_number=None, section=None):
+        """
+        Get a boolean mask of the students in a class and/or section
+
+        Args:
+            class_number: Class to select, or None for every class
+            section (str): Section to select, or None for every section
+
+        Returns:
+            np.ndarray: Boolean mask over student rows
+        """
+        n_students = len(self.student_keys)
+        selected = [
+            code for code, (cls, sec) in enumerate(self.sections.values)
+            if (class_number is None or str(cls) == str(class_number))
+            and (section is None or sec == section)
+        ]
+        return np.isin(self.student_section[:n_students], selected)
+
+    def section_classes(self):
+        """
+        Get the class of every section code
+
+        Returns:
+            list: Class of each section, indexed by section code
+        """
+        return [cls for cls, _ in self.sections.values]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _handle_changes(self, docs, changes):
+        """Apply the changes delivered by the watch stream"""
+        try:
+            with self._lock:
+                for change in changes:
+                    if change['type'] == 'REMOVED' or change['data'] is None:
+                        self._clear_sheet(change['id'])
+                    else:
+                        self._apply_sheet(change['data'])
+                self.version += 1
+            self._notify()
+        except Exception as e:
+            print(f"Error applying result changes to marks store: {e}")
+
+    def _notify(self):
+        """Tell listeners the store changed"""
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in marks store listener: {e}")
+
+    def _apply_sheet(self, sheet):
+        """Write one sheet into the arrays (lock must be held)"""
+        result_id = sheet.get('id')
+        self._clear_sheet(result_id)
+
+        class_number = sheet.get('class')
+        section_name = sheet.get('section', '')
+        test_name = sheet.get('test_name') or result_id
+        section = self.sections.encode((class_number, section_name))
+        test = self.tests.encode(test_name)
+
+        # Every subject of the sheet is encoded before _reserve, so the
+        # arrays are large enough for all of them (maxMarks included)
+        marks = sheet.get('marks') or {}
+        subjects = list(sheet.get('status') or {})
+        for entry in marks.values():
+            subjects.extend(entry.get('result') or {})
+        subjects.extend(sheet.get('maxMarks') or {})
+        subject_codes = [self.subjects.encode(subject) for subject in dict.fromkeys(subjects)]
+
+        rows = []
+        for roll_no, entry in marks.items():
+            key = (class_number, section_name, str(roll_no))
+            row = self.student_rows.get(key)
+            if row is None:
+                row = len(self.student_keys)
+                self.student_rows[key] = row
+                self.student_keys.append(key)
+                self.student_names.append(entry.get('name', ''))
+            elif entry.get('name'):
+                self.student_names[row] = entry.get('name')
+            rows.append(row)
+
+        self._reserve(len(self.student_keys), len(self.subjects), len(self.tests), len(self.sections))
+        if rows:
+            self.student_section[rows] = section
+
+        self._sheets[result_id] = (section, test, rows, subject_codes, sheet)
+        self._slots.setdefault((section, test), []).append(result_id)
+        self._write_slot(section, test)
+
+    def _clear_sheet(self, result_id):
+        """Blank the cells written by a sheet (lock must be held)"""
+        previous = self._sheets.pop(result_id, None)
+        if previous is None:
+            return False
+        section, test, rows, subject_codes, _ = previous
+        if rows and subject_codes:
+            self._marks[np.ix_(rows, subject_codes, [test])] = np.nan
+        self._max_marks[section, :, test] = np.nan
+
+        slot = self._slots[(section, test)]
+        slot.remove(result_id)
+        if slot:
+            self._write_slot(section, test)
+        else:
+            del self._slots[(section, test)]
+        return True
+
+    def _write_slot(self, section, test):
+        """Write the cells of every sheet of a section and test, oldest first (lock must be held)"""
+        sheets = [self._sheets[result_id] for result_id in self._slots[(section, test)]]
+        sheets.sort(key=lambda stored: (str(stored[4].get('created_at') or ''), str(stored[4].get('id'))))
+
+        for _, _, rows, _, sheet in sheets:
+            for row, entry in zip(rows, (sheet.get('marks') or {}).values()):
+                result = entry.get('result') or {}
+                for subject, mark in result.items():
+                    self._marks[row, self.subjects.codes[subject], test] = _to_float(mark)
+
+            for subject, max_mark in (sheet.get('maxMarks') or {}).items():
+                self._max_marks[section, self.subjects.codes[subject], test] = _to_float(max_mark)
+
+    def _reserve(self, n_students, n_subjects, n_tests, n_sections):
+        """Grow the arrays geometrically so appends stay amortized O(1)"""
+        shape = self._marks.shape
+        if n_students > shape[0] or n_subjects > shape[1] or n_tests > shape[2]:
+            new_shape = (
+                _grow(shape[0], n_students),
+                _grow(shape[1], n_subjects),
+                _grow(shape[2], n_tests),
+            )
+            grown = np.full(new_shape, np.nan, dtype=np.float32)
+            grown[:shape[0], :shape[1], :shape[2]] = self._marks
+            self._marks = grown
+
+            sections = np.zeros(new_shape[0], dtype=np.int32)
+            sections[:len(self.student_section)] = self.student_section
+            self.student_section = sections
+
+        max_shape = self._max_marks.shape
+        needed = (n_sections, self._marks.shape[1], self._marks.shape[2])
+        if any(n > m for n, m in zip(needed, max_shape)):
+            new_shape = (_grow(max_shape[0], n_sections), needed[1], needed[2])
+            grown = np.full(new_shape, np.nan, dtype=np.float32)
+            grown[:max_shape[0], :max_shape[1], :max_shape[2]] = self._max_marks
+            self._max_marks = grown
+
+def _grow(current, needed):
+    """Next capacity for an axis"""
+    if needed <= current:
+        return current
+    return max(needed, current * 2, 8)
+
+# Shared store used by the analytics, ranking and grading engines
+marks_store = MarksStore()
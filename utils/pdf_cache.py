@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+# Bump when the PDF layout changes so sheets rendered by older code are not reused
+GENERATOR_VERSION = 4
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), "Documents", "SmartResultSystem", ".cache", "pdf")
+
+# Upper bound on the total size of cached sheets
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+def result_content_key(result, options=None):
+    """
+    Hash everything a rendered result sheet depends on
+
+    Args:
+        result (dict): Result sheet data
+        options (dict): Generator options (institution name, title, ...)
+
+    Returns:
+        str: Hex digest identifying the rendered sheet
+    """
+    content = {
+        'version': GENERATOR_VERSION,
+        'id': result.get('id'),
+        'updated_at': result.get('updated_at'),
+        'class': result.get('class'),
+        'section': result.get('section'),
+        'test_name': result.get('test_name'),
+        # Subject order decides the column order
+        'subjects': list((result.get('status') or {}).keys()),
+        'maxMarks': result.get('maxMarks') or {},
+        'marks': result.get('marks') or {},
+        # Positions depend on the other sections too, not only this sheet
+        'positions': result.get('positions') or {},
+        # Grades depend on the grading scale in main_data
+        'grades': result.get('grades') or {},
+        'options': options or {},
+    }
+    encoded = json.dumps(content, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class PdfCache:
+    """
+    Content-addressed on-disk cache of generated result sheets.
+
+    Sheets are stored as <content key>.pdf, so a sheet is reused for as
+    long as the marks, max marks and options it was rendered from stay the
+    same, and a change to any of them simply produces a new key. The
+    least recently used sheets are evicted once the cache grows past
+    max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            directory (str): Directory holding the cached sheets
+            max_bytes (int): Maximum total size of the cached sheets
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        """Path of the cached sheet for a key"""
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        """
+        Get a cached sheet
+
+        Args:
+            key (str): Content key
+
+        Returns:
+            str: Path of the sheet or None if it is not cached
+        """
+        path = self.path_for(key)
+        try:
+            # Reading counts as a use for LRU eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def get_or_create(self, result, build, options=None):
+        """
+        Get the sheet of a result, rendering it only if it is not cached
+
+        Args:
+            result (dict): Result sheet data
+            build (Callable): Function rendering the sheet to the path it is
+                given and returning that path (or None on failure)
+            options (dict): Generator options that affect the output
+
+        Returns:
+            str: Path of the cached sheet or None if rendering failed
+        """
+        key = result_content_key(result, options)
+        path = self.get(key)
+        if path:
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Render to a temporary name so readers never see a partial file
+        temp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.pdf")
+        try:
+            if not build(temp_path) or not os.path.exists(temp_path):
+                return None
+            path = self.path_for(key)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """
+        Delete the least recently used sheets until the cache fits max_bytes
+
+        Args:
+            keep (str): Path that must not be evicted (the sheet just written)
+        """
+        with self._lock:
+            try:
+                entries = []
+                with os.scandir(self.directory) as scan:
+                    for entry in scan:
+                        if entry.is_file() and entry.name.endswith('.pdf') and not entry.name.startswith('.'):
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                return
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError as e:
+                    print(f"Could not evict cached PDF {path}: {e}")
+
+    def clear(self):
+        """Delete every cached sheet"""
+        max_bytes, self.max_bytes = self.max_bytes, -1
+        try:
+            self.evict()
+        finally:
+            self.max_bytes = max_bytes
+
+# Shared cache used by PDF generation, printing and sending
+pdf_cache = PdfCache()
@@ -2,6 +2,7 @@
 
 import pandas as pd
 from fpdf import FPDF
+from functools import lru_cache
 import os
 from datetime import datetime
 
@@ -19,7 +20,7 @@ class ResultSheetGenerator:
     def set_max_marks_map(self, max_marks_map):
         self.max_marks_map = max_marks_map if max_marks_map is not None else {}
 
-    def add_student(self, roll_no, name, *subject_marks):
+    def add_student(self, roll_no, name, *subject_marks, grade=None, position=None):
         if not self.subjects:
             raise ValueError("Subjects must be set using set_subjects() before adding students.")
         if not self.max_marks_map:
@@ -63,6 +64,10 @@ class ResultSheetGenerator:
         student['Obtained Marks'] = total_obtained
         student['Total Marks'] = total_marks # Use the dynamically calculated total
         student['Percentage'] = round(percentage, 2)
+        if grade is not None:
+            student['Grade'] = grade
+        if position is not None:
+            student['Position'] = position
 
         self.students.append(student)
         return student
@@ -70,6 +75,13 @@ class ResultSheetGenerator:
     def set_subjects(self, subject_list):
         self.subjects = subject_list
 
+    def extra_columns(self):
+        # Grades and positions are only shown when the result was graded/ranked
+        return [
+            column for column in EXTRA_WIDTHS
+            if any(column in student for student in self.students)
+        ]
+
     def generate_excel(self, filepath="result_sheet.xlsx"):
         # (This method remains unchanged)
         if not self.students:
@@ -80,6 +92,7 @@ class ResultSheetGenerator:
             os.makedirs(directory)
             print(f"Created directory: {directory}")
         column_order = ['Roll No', 'Student Name'] + self.subjects + ['Obtained Marks', 'Total Marks', 'Percentage']
+        column_order += self.extra_columns()
         df = pd.DataFrame(self.students)
         df = df[column_order] # Reorder columns
         df.to_excel(filepath, index=False)
@@ -87,8 +100,8 @@ class ResultSheetGenerator:
         print(f"Excel file generated: {abs_path}")
         return abs_path
 
-    def generate_pdf(self, filepath=f"result_sheets/{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.pdf"):
-         # (This method remains largely unchanged, column widths are still dynamic)
+    def generate_pdf(self, filepath=f"result_sheets/{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.pdf", context=None):
+        # Fonts and column layouts come from the shared rendering context
         if not self.students:
             print("No students added to the result sheet.")
             return None
@@ -96,78 +109,370 @@ class ResultSheetGenerator:
              print("No subjects set for the result sheet.")
              return None
 
-        directory = os.path.dirname(filepath)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
-            print(f"Created directory: {directory}")
+        context = context or get_render_context()
+        return context.render_documents([self], filepath)
+
+
+# Unicode fonts looked for, in order. The first one found is used for all
+# text; the Urdu ones are added as fallbacks for glyphs it does not have.
+FONT_DIRS = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts"),
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/truetype/noto",
+    "/Library/Fonts",
+]
+TEXT_FONTS = [
+    ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    ("arial.ttf", "arialbd.ttf"),
+    ("NotoSans-Regular.ttf", "NotoSans-Bold.ttf"),
+]
+URDU_FONTS = [
+    "NotoNastaliqUrdu-Regular.ttf",
+    "Jameel Noori Nastaleeq.ttf",
+    "NotoNaskhArabic-Regular.ttf",
+]
+
+# Column widths (mm) that do not depend on the subjects
+FIXED_WIDTHS = {'Roll No': 12, 'Name': 40, 'Obtained': 18, 'Total': 18, 'Percentage': 18}
+
+# Widths of the optional columns after Percentage, in column order
+EXTRA_WIDTHS = {'Grade': 12, 'Position': 14}
+
+def find_font(file_name):
+    """
+    Look for a font file in FONT_DIRS
+
+    Args:
+        file_name (str): Font file name
+
+    Returns:
+        str: Path of the font or None if it is not installed
+    """
+    for directory in FONT_DIRS:
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            return path
+    return None
+
+@lru_cache(maxsize=256)
+def column_layout(subjects, page_width, extras=()):
+    """
+    Compute the table columns of a sheet
+
+    Cached per subject set, so every section sharing the same subjects
+    reuses the same layout.
+
+    Args:
+        subjects (tuple): Subjects in column order
+        page_width (float): Usable page width
+        extras (tuple): Optional columns to add at the end (see EXTRA_WIDTHS)
+
+    Returns:
+        tuple: (header labels, column widths)
+    """
+    total_fixed_width = sum(FIXED_WIDTHS.values()) + sum(EXTRA_WIDTHS[column] for column in extras)
+    subject_width = (page_width - total_fixed_width) / len(subjects) if subjects else 0
+
+    if subject_width < 10 and len(subjects) > 0:
+        print(f"Warning: Calculated subject column width ({subject_width:.2f}) is very small.")
+
+    headers = ('Roll No', 'Name') + tuple(subjects) + ('Obtained', 'Total', 'Percentage')
+    widths = (
+        (FIXED_WIDTHS['Roll No'], FIXED_WIDTHS['Name'])
+        + (subject_width,) * len(subjects)
+        + (FIXED_WIDTHS['Obtained'], FIXED_WIDTHS['Total'], FIXED_WIDTHS['Percentage'])
+    )
+    headers += tuple(extras)
+    widths += tuple(EXTRA_WIDTHS[column] for column in extras)
+    labels = tuple(
+        (header[:10] + '..') if len(header) > 12 and width < 20 else header
+        for header, width in zip(headers, widths)
+    )
+    return labels, widths
+
+class RenderContext:
+    """
+    Reusable PDF rendering setup, created once per process.
 
+    Looks up a Unicode font (with an Urdu fallback) once, so names in Urdu
+    render instead of failing with the core Arial font, and draws any
+    number of sheets either into one document or into separate documents.
+    """
+
+    def __init__(self, institution_name=None):
+        self.text_font = None
+        self.bold_font = None
+        self.fallback_fonts = []
+        for regular, bold in TEXT_FONTS:
+            self.text_font = find_font(regular)
+            if self.text_font:
+                self.bold_font = find_font(bold)
+                break
+        for name in URDU_FONTS:
+            path = find_font(name)
+            if path:
+                self.fallback_fonts.append(path)
+
+        try:
+            import uharfbuzz
+            self.text_shaping = True
+        except ImportError:
+            # Urdu still renders, but letters are not joined
+            self.text_shaping = False
+
+        self.family = "SheetFont" if self.text_font else "Arial"
+
+    def new_document(self):
+        """
+        Create an empty document with the fonts registered
+
+        Returns:
+            FPDF: Document ready for render_sheet
+        """
         pdf = FPDF(orientation='P')
-        pdf.add_page()
         pdf.set_left_margin(5)
         pdf.set_right_margin(5)
-        page_width = pdf.w - pdf.l_margin - pdf.r_margin
 
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, self.institution_name, 0, 1, "C")
-        pdf.cell(0, 10, self.exam_title, 0, 1, "C")
-        pdf.ln(5)
+        if self.text_font:
+            pdf.add_font(self.family, "", self.text_font)
+            pdf.add_font(self.family, "B", self.bold_font or self.text_font)
+            fallbacks = []
+            for i, path in enumerate(self.fallback_fonts):
+                pdf.add_font(f"SheetFallback{i}", "", path)
+                fallbacks.append(f"SheetFallback{i}")
+            if fallbacks:
+                pdf.set_fallback_fonts(fallbacks)
+            if self.text_shaping:
+                pdf.set_text_shaping(True)
+        return pdf
 
-        fixed_widths_config = {
-            'Roll No': 12, 'Name': 40, 'Obtained': 18,
-            'Total': 18, 'Percentage': 18
-        }
-        total_fixed_width = sum(fixed_widths_config.values())
-        remaining_width = page_width - total_fixed_width
-        subject_width = remaining_width / len(self.subjects) if self.subjects else 0
+    def text(self, value):
+        """Make text safe for the font in use"""
+        value = str(value)
+        if not self.text_font:
+            # Core fonts only cover latin-1
+            value = value.encode('latin-1', 'replace').decode('latin-1')
+        return value
 
-        if subject_width < 10 and len(self.subjects) > 0:
-             print(f"Warning: Calculated subject column width ({subject_width:.2f}) is very small.")
+    def render_sheet(self, pdf, sheet):
+        """
+        Draw one result sheet on new pages of a document
 
-        headers = ['Roll No', 'Name'] + self.subjects + ['Obtained', 'Total', 'Percentage']
-        column_widths = [
-             fixed_widths_config['Roll No'], fixed_widths_config['Name']
-             ] + [subject_width] * len(self.subjects) + [
-             fixed_widths_config['Obtained'], fixed_widths_config['Total'],
-             fixed_widths_config['Percentage']
-             ]
+        Args:
+            pdf (FPDF): Document from new_document
+            sheet (ResultSheetGenerator): Filled sheet
+        """
+        pdf.add_page()
+        page_width = pdf.w - pdf.l_margin - pdf.r_margin
+
+        pdf.set_font(self.family, "B", 16)
+        pdf.cell(0, 10, self.text(sheet.institution_name), 0, 1, "C")
+        pdf.cell(0, 10, self.text(sheet.exam_title), 0, 1, "C")
+        pdf.ln(5)
+
+        subjects = tuple(sheet.subjects)
+        extras = tuple(sheet.extra_columns())
+        labels, column_widths = column_layout(subjects, page_width, extras)
 
         cell_height = 7
-        pdf.set_font("Arial", "B", 8)
+        pdf.set_font(self.family, "B", 8)
         pdf.set_fill_color(0, 0, 0)
         pdf.set_text_color(255, 255, 255)
 
-        for i, header in enumerate(headers):
-            display_header = (header[:10] + '..') if len(header) > 12 and column_widths[i] < 20 else header
-            pdf.cell(column_widths[i], cell_height, str(display_header), 1, 0, "C", True)
+        for label, width in zip(labels, column_widths):
+            pdf.cell(width, cell_height, self.text(label), 1, 0, "C", True)
         pdf.ln(cell_height)
 
         pdf.set_text_color(0, 0, 0)
-        pdf.set_font("Arial", "", 8)
+        pdf.set_font(self.family, "", 8)
+
+        subject_widths = column_widths[2:2 + len(subjects)]
+        obtained_width, total_width, percentage_width = column_widths[2 + len(subjects):2 + len(subjects) + 3]
+        for student in sheet.students:
+            pdf.cell(column_widths[0], cell_height, self.text(student.get('Roll No', '')), 1, 0, "C")
+            pdf.cell(column_widths[1], cell_height, self.text(student.get('Student Name', '')), 1, 0, "L")
 
-        for student in self.students:
-            pdf.cell(column_widths[0], cell_height, str(student.get('Roll No', '')), 1, 0, "C")
-            pdf.cell(column_widths[1], cell_height, str(student.get('Student Name', '')), 1, 0, "L")
+            for subject, width in zip(subjects, subject_widths):
+                pdf.cell(width, cell_height, self.text(student.get(subject, '')), 1, 0, "C")
 
-            subject_start_index = 2
-            for i, subject in enumerate(self.subjects):
-                value = student.get(subject, '')
-                pdf.cell(column_widths[subject_start_index + i], cell_height, str(value), 1, 0, "C")
+            pdf.cell(obtained_width, cell_height, str(student.get('Obtained Marks', '')), 1, 0, "C")
+            pdf.cell(total_width, cell_height, str(student.get('Total Marks', '')), 1, 0, "C")
+            pdf.cell(percentage_width, cell_height, f"{student.get('Percentage', 0):.2f}%", 1, 0, "C")
+            for column, width in zip(extras, column_widths[-len(extras):] if extras else ()):
+                pdf.cell(width, cell_height, self.text(student.get(column, '-')), 1, 0, "C")
+            pdf.ln(cell_height)
 
-            obtained_index = subject_start_index + len(self.subjects)
-            total_index = obtained_index + 1
-            percentage_index = total_index + 1
+    def render_documents(self, sheets, filepath):
+        """
+        Render several sheets into one document
 
-            pdf.cell(column_widths[obtained_index], cell_height, str(student.get('Obtained Marks', '')), 1, 0, "C")
-            pdf.cell(column_widths[total_index], cell_height, str(student.get('Total Marks', '')), 1, 0, "C") # Display calculated total
-            pdf.cell(column_widths[percentage_index], cell_height, f"{student.get('Percentage', 0):.2f}%", 1, 0, "C")
+        Args:
+            sheets (list): Filled ResultSheetGenerator objects
+            filepath (str): Where to write the PDF
 
-            pdf.ln(cell_height)
+        Returns:
+            str: Absolute path of the PDF or None if generation failed
+        """
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+            print(f"Created directory: {directory}")
+
+        pdf = self.new_document()
+        for sheet in sheets:
+            self.render_sheet(pdf, sheet)
 
         try:
-             pdf.output(filepath)
-             abs_path = os.path.abspath(filepath)
-             print(f"PDF file generated: {abs_path}")
-             return abs_path
+            pdf.output(filepath)
+            abs_path = os.path.abspath(filepath)
+            print(f"PDF file generated: {abs_path}")
+            return abs_path
         except Exception as e:
-             print(f"Error generating PDF: {e}")
-             return None
\ No newline at end of file
+            print(f"Error generating PDF: {e}")
+            return None
+
+    def render_each(self, sheets_and_paths):
+        """
+        Render sheets into separate documents
+
+        Args:
+            sheets_and_paths (list): (ResultSheetGenerator, filepath) pairs
+
+        Returns:
+            list: Absolute paths, None for documents that failed
+        """
+        return [self.render_documents([sheet], filepath) for sheet, filepath in sheets_and_paths]
+
+_render_context = None
+
+def get_render_context():
+    """
+    Get the rendering context of this process, creating it on first use
+
+    Returns:
+        RenderContext: Shared context
+    """
+    global _render_context
+    if _render_context is None:
+        _render_context = RenderContext()
+    return _render_context
+
+def check_result_sheet(result):
+    """
+    Check that a result has what a sheet needs, without rendering anything
+
+    Args:
+        result (dict): Result sheet data
+
+    Raises:
+        ValueError: If the result has no subjects or marks, or roll numbers
+            are not numeric
+    """
+    if not result.get('status', {}):
+        raise ValueError("No subjects found for this result entry.")
+
+    students_marks_data = result.get('marks', {})
+    if not students_marks_data:
+        raise ValueError("No student marks data found to generate PDF.")
+
+    for roll_no in students_marks_data:
+        try:
+            int(roll_no)
+        except ValueError:
+            raise ValueError("Could not sort students by roll number. Ensure roll numbers are numeric.")
+
+def build_result_sheet(result, **options):
+    """
+    Build a ResultSheetGenerator filled with the students of a result
+
+    Args:
+        result (dict): Result sheet data (class, section, test_name, status,
+            maxMarks and marks, and optionally the 'grades' added by
+            GradingService.with_grades and the 'positions' added by
+            RankingEngine.with_positions)
+        **options: Extra ResultSheetGenerator arguments (e.g. institution_name)
+
+    Returns:
+        ResultSheetGenerator: Generator ready to produce the sheet
+
+    Raises:
+        ValueError: If the result has no subjects or marks, or roll numbers
+            are not numeric
+    """
+    check_result_sheet(result)
+
+    class_num = result.get('class', 'N/A')
+    section = result.get('section', 'N/A')
+    test_name = result.get('test_name', 'Result Sheet')
+    subjects = list(result.get('status', {}).keys())
+    students_marks_data = result.get('marks', {})
+
+    generator = ResultSheetGenerator(
+        exam_title=f"{test_name} ({class_num} - {section})",
+        max_marks_map=result.get('maxMarks', {}),
+        **options
+    )
+    # Subjects decide the column order
+    generator.set_subjects(subjects)
+
+    sorted_student_items = sorted(students_marks_data.items(), key=lambda item: int(item[0]))
+    positions = result.get('positions') or {}
+    grades = result.get('grades') or {}
+
+    for roll_no, student_data in sorted_student_items:
+        student_subject_results = student_data.get('result', {})
+        marks_in_order = [student_subject_results.get(subj, 0) for subj in subjects]
+        # The sheet covers one section, so it shows the section position
+        position = (positions.get(str(roll_no)) or {}).get('section', '-') if positions else None
+        grade = (grades.get(str(roll_no)) or {}).get('grade', '-') if grades else None
+        generator.add_student(
+            roll_no, student_data.get('name', 'Unknown Name'), *marks_in_order,
+            grade=grade, position=position
+        )
+
+    return generator
+
+def generate_result_pdf(result, filepath, **options):
+    """
+    Render the PDF sheet of a result
+
+    Args:
+        result (dict): Result sheet data
+        filepath (str): Where to write the PDF
+        **options: Extra ResultSheetGenerator arguments
+
+    Returns:
+        str: Absolute path of the PDF or None if generation failed
+    """
+    return build_result_sheet(result, **options).generate_pdf(filepath=filepath)
+
+def generate_result_excel(result, filepath, **options):
+    """
+    Export the sheet of a result to Excel
+
+    Args:
+        result (dict): Result sheet data
+        filepath (str): Where to write the .xlsx file
+        **options: Extra ResultSheetGenerator arguments
+
+    Returns:
+        str: Absolute path of the file or None if nothing was written
+    """
+    return build_result_sheet(result, **options).generate_excel(filepath=filepath)
+
+
+def generate_results_pdf(results, filepath, **options):
+    """
+    Render the sheets of several results into one PDF
+
+    Args:
+        results (list): Result sheet data
+        filepath (str): Where to write the PDF
+        **options: Extra ResultSheetGenerator arguments
+
+    Returns:
+        str: Absolute path of the PDF or None if generation failed
+    """
+    sheets = [build_result_sheet(result, **options) for result in results]
+    return get_render_context().render_documents(sheets, filepath)
@@ -0,0 +1,224 @@
+from utils.marks_store import marks_store, Dictionary
+from utils.analytics import analytics_engine, section_key
+import numpy as np
+
+# Percentages are compared at this many decimals, so 84.999 and 85.0 tie
+RANK_DECIMALS = 2
+
+def competition_ranks(values, groups=None):
+    """
+    Rank values from highest to lowest with standard competition ranking
+
+    Equal values share a position and the next position is skipped
+    (1, 2, 2, 4). Missing (NaN) values are not ranked.
+
+    Args:
+        values (np.ndarray): Values to rank, NaN for missing
+        groups (np.ndarray): Optional group code per value; positions are
+            then counted within each group
+
+    Returns:
+        np.ndarray: int32 positions, 0 for missing values
+    """
+    values = np.round(np.asarray(values, dtype=np.float64), RANK_DECIMALS)
+    ranks = np.zeros(values.shape[0], dtype=np.int32)
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        return ranks
+
+    v = values[valid]
+    g = np.zeros(valid.size, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)[valid]
+
+    # One sort orders every group by descending value
+    order = np.lexsort((-v, g))
+    v_sorted, g_sorted = v[order], g[order]
+    index = np.arange(order.size)
+
+    new_group = np.r_[True, g_sorted[1:] != g_sorted[:-1]]
+    new_value = new_group | np.r_[True, v_sorted[1:] != v_sorted[:-1]]
+    group_start = np.maximum.accumulate(np.where(new_group, index, 0))
+    value_start = np.maximum.accumulate(np.where(new_value, index, 0))
+
+    ranks[valid[order]] = value_start - group_start + 1
+    return ranks
+
+class RankingEngine:
+    """
+    Section, class and campus-wide positions over the marks store.
+
+    Positions of every student in every test are computed together with
+    vectorized sorts over the overall percentages of the analytics engine,
+    and cached against the store version, so sheets, report cards and the
+    Analytics tab read them without recomputing until a result changes.
+    """
+
+    def __init__(self, store=None, analytics=None):
+        """
+        Initialize the engine
+
+        Args:
+            store (MarksStore): Marks store to rank, defaults to the shared one
+            analytics (AnalyticsEngine): Source of the percentages
+        """
+        self.store = store if store is not None else marks_store
+        self.analytics = analytics if analytics is not None else analytics_engine
+        self._cache_version = None
+        self._rankings = None
+
+    def rankings(self):
+        """
+        Get the positions of every student in every test
+
+        Returns:
+            dict: 'section', 'class' and 'campus' int32 arrays of
+            student x test (0 where the student has no result) and the
+            overall 'percentage' array they were ranked by
+        """
+        store = self.store
+        with store._lock:
+            if self._cache_version == store.version and self._rankings is not None:
+                return self._rankings
+
+            _, overall_pct = self.analytics.percentages()
+            n_students, _, n_tests = store.shape
+            student_section = store.student_section[:n_students]
+
+            # Sections of the same class share a class code
+            classes = Dictionary()
+            section_class = np.array(
+                [classes.encode(str(cls)) for cls in store.section_classes()] or [0],
+                dtype=np.int64
+            )
+            student_class = section_class[student_section] if n_students else np.zeros(0, dtype=np.int64)
+
+            rankings = {
+                'section': np.zeros((n_students, n_tests), dtype=np.int32),
+                'class': np.zeros((n_students, n_tests), dtype=np.int32),
+                'campus': np.zeros((n_students, n_tests), dtype=np.int32),
+                'percentage': overall_pct,
+            }
+            for t in range(n_tests):
+                values = overall_pct[:, t]
+                rankings['section'][:, t] = competition_ranks(values, student_section)
+                rankings['class'][:, t] = competition_ranks(values, student_class)
+                rankings['campus'][:, t] = competition_ranks(values)
+
+            self._rankings = rankings
+            self._cache_version = store.version
+            return rankings
+
+    def positions_for(self, result):
+        """
+        Get the positions of the students of one result sheet
+
+        Args:
+            result (dict): Result sheet data
+
+        Returns:
+            dict: Roll number -> {'section', 'class', 'campus'} positions,
+            only for students with a ranked percentage
+        """
+        rankings = self.rankings()
+        store = self.store
+        with store._lock:
+            test = store.tests.get(result.get('test_name') or result.get('id'))
+            if test is None:
+                return {}
+
+            positions = {}
+            for roll_no in (result.get('marks') or {}):
+                row = store.student_rows.get((result.get('class'), result.get('section', ''), str(roll_no)))
+                if row is None or row >= rankings['campus'].shape[0] or not rankings['campus'][row, test]:
+                    continue
+                positions[str(roll_no)] = {
+                    'section': int(rankings['section'][row, test]),
+                    'class': int(rankings['class'][row, test]),
+                    'campus': int(rankings['campus'][row, test]),
+                }
+            return positions
+
+    def with_positions(self, result):
+        """
+        Copy a result sheet with its students' positions under 'positions'
+
+        Args:
+            result (dict): Result sheet data
+
+        Returns:
+            dict: Result data for sheets and report cards
+        """
+        ranked = dict(result)
+        ranked['positions'] = self.positions_for(result)
+        return ranked
+
+    def merit_list(self, test_name, class_number=None, section=None, limit=None):
+        """
+        Get the merit order of a test
+
+        Students are ordered by their section position when a section is
+        given, by class position when only a class is given, and by campus
+        position otherwise.
+
+        Args:
+            test_name (str): Test to rank
+            class_number: Class to restrict to, or None
+            section (str): Section to restrict to, or None
+            limit (int): Maximum number of students
+
+        Returns:
+            list: Dicts with position, roll_no, name, class, section and percentage
+        """
+        rankings = self.rankings()
+        store = self.store
+        with store._lock:
+            test = store.tests.get(test_name)
+            if test is None:
+                return []
+
+            scope = 'section' if section is not None else 'class' if class_number is not None else 'campus'
+            positions = rankings[scope][:, test]
+            rows = np.flatnonzero(store.student_mask(class_number, section) & (positions > 0))
+            rows = rows[np.argsort(positions[rows], kind='stable')]
+            if limit is not None:
+                rows = rows[:limit]
+
+            merit = []
+            for row in rows:
+                cls, sec, roll_no = store.student_keys[row]
+                merit.append({
+                    'position': int(positions[row]),
+                    'roll_no': roll_no,
+                    'name': store.student_names[row],
+                    'class': str(cls),
+                    'section': sec,
+                    'percentage': round(float(rankings['percentage'][row, test]), 2),
+                })
+            return merit
+
+    def merit_lists(self, limit=10):
+        """
+        Get the top of the campus and section merit lists of every test
+
+        Args:
+            limit (int): Students per list
+
+        Returns:
+            dict: Test -> {'campus': merit list, 'sections': {section key: merit list}}
+        """
+        store = self.store
+        with store._lock:
+            tests = list(store.tests.values)
+            sections = list(store.sections.values)
+
+            lists = {}
+            for test in tests:
+                per_section = {}
+                for cls, sec in sections:
+                    merit = self.merit_list(test, cls, sec, limit)
+                    if merit:
+                        per_section[section_key(cls, sec)] = merit
+                lists[test] = {'campus': self.merit_list(test, limit=limit), 'sections': per_section}
+            return lists
+
+# Shared engine over the shared marks store
+ranking_engine = RankingEngine()
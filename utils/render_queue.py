@@ -0,0 +1,309 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.pdf_cache import pdf_cache
+import utils.pdf_generator as pdf_generator
+import datetime
+import itertools
+import os
+import shutil
+import threading
+
+# Job and task states
+QUEUED = 'Queued'
+RUNNING = 'Running'
+DONE = 'Done'
+FAILED = 'Failed'
+CANCELLED = 'Cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Document kinds the workers know how to render
+PDF = 'pdf'
+EXCEL = 'excel'
+
+def render_document(kind, result, output_path, options=None):
+    """
+    Render one document; runs in a worker process
+
+    Args:
+        kind (str): PDF or EXCEL
+        result (dict): Result sheet data
+        output_path (str): Where to write the document
+        options (dict): Extra ResultSheetGenerator arguments
+
+    Returns:
+        str: Absolute path of the document
+
+    Raises:
+        ValueError: If the result cannot be rendered
+        RuntimeError: If the generator did not produce a file
+    """
+    options = options or {}
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if kind == PDF:
+        # Unchanged results are copied from the PDF cache instead of re-rendered
+        cached_path = pdf_cache.get_or_create(
+            result,
+            lambda path: pdf_generator.generate_result_pdf(result, path, **options),
+            options
+        )
+        if not cached_path:
+            raise RuntimeError("Failed to generate PDF")
+        shutil.copyfile(cached_path, output_path)
+    elif kind == EXCEL:
+        if not pdf_generator.generate_result_excel(result, output_path, **options):
+            raise RuntimeError("Failed to generate Excel file")
+    else:
+        raise ValueError(f"Unknown document kind '{kind}'")
+
+    return os.path.abspath(output_path)
+
+class RenderTask:
+    """
+    One document of a render job
+    """
+
+    def __init__(self, result, output_path):
+        self.result = result
+        self.output_path = output_path
+        self.future = None
+        self.state = QUEUED
+        self.path = None
+        self.error = None
+
+class RenderJob:
+    """
+    A group of documents rendered together (e.g. every sheet of a class)
+    """
+
+    def __init__(self, job_id, kind, title, tasks, options=None):
+        self.id = job_id
+        self.kind = kind
+        self.title = title
+        self.tasks = tasks
+        self.options = options or {}
+        self.cancelled = False
+        self.created_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @property
+    def state(self):
+        """Overall state of the job"""
+        states = [task.state for task in self.tasks]
+        if all(state in FINISHED_STATES for state in states):
+            if self.cancelled:
+                return CANCELLED
+            return FAILED if FAILED in states else DONE
+        if any(task.future is not None and task.future.running() for task in self.tasks):
+            return RUNNING
+        return QUEUED
+
+    @property
+    def progress(self):
+        """Fraction of documents finished"""
+        if not self.tasks:
+            return 1.0
+        finished = sum(1 for task in self.tasks if task.state in FINISHED_STATES)
+        return finished / len(self.tasks)
+
+    @property
+    def outputs(self):
+        """Paths of the documents rendered so far"""
+        return [task.path for task in self.tasks if task.path]
+
+    @property
+    def errors(self):
+        """Error messages of the failed documents"""
+        return [task.error for task in self.tasks if task.error]
+
+class RenderQueue:
+    """
+    Renders result documents on worker processes.
+
+    Jobs are split into one task per document and fed to a process pool so
+    large sheets never block the Tk thread. Listeners are called (from a
+    worker callback thread) whenever a job changes, so UIs must hand the
+    update to their own thread.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Initialize the queue
+
+        Args:
+            max_workers (int): Worker processes, defaults to the CPU count (max 4)
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = None
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._listeners = []
+
+    def submit(self, kind, items, title, options=None):
+        """
+        Queue documents for rendering
+
+        Args:
+            kind (str): PDF or EXCEL
+            items (list): (result data, output path) pairs
+            title (str): Title shown in the jobs panel
+            options (dict): Extra ResultSheetGenerator arguments
+
+        Returns:
+            RenderJob: The queued job
+        """
+        tasks = [RenderTask(result, output_path) for result, output_path in items]
+        with self._lock:
+            job = RenderJob(next(self._ids), kind, title, tasks, options)
+            self._jobs[job.id] = job
+            for task in tasks:
+                self._start(job, task)
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel the documents of a job that have not started yet
+
+        Documents already being rendered finish, but their output file is deleted.
+
+        Args:
+            job_id (int): Job ID
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        with self._lock:
+            job.cancelled = True
+            for task in job.tasks:
+                if task.state not in FINISHED_STATES and task.future is not None:
+                    task.future.cancel()
+        self._notify(job)
+
+    def retry(self, job_id):
+        """
+        Queue the failed and cancelled documents of a job again
+
+        Args:
+            job_id (int): Job ID
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        with self._lock:
+            job.cancelled = False
+            for task in job.tasks:
+                if task.state in (FAILED, CANCELLED):
+                    task.state = QUEUED
+                    task.error = None
+                    self._start(job, task)
+        self._notify(job)
+
+    def remove(self, job_id):
+        """
+        Forget a finished job
+
+        Args:
+            job_id (int): Job ID
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in FINISHED_STATES:
+                return
+            del self._jobs[job_id]
+        self._notify(job)
+
+    def jobs(self):
+        """
+        Get every job, newest first
+
+        Returns:
+            list: RenderJob objects
+        """
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id, reverse=True)
+
+    def add_listener(self, callback):
+        """
+        Register a callback called with the job after every change
+
+        Args:
+            callback (Callable): Function to call
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a change callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def shutdown(self):
+        """Cancel pending documents and stop the workers"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        """Create the worker pool on first use (lock must be held)"""
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError) as e:
+                # Some platforms cannot start worker processes
+                print(f"Rendering in threads, worker processes are unavailable: {e}")
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _start(self, job, task):
+        """Submit a task to the workers (lock must be held)"""
+        try:
+            task.future = self._get_executor().submit(
+                render_document, job.kind, task.result, task.output_path, job.options
+            )
+        except Exception as e:
+            task.state = FAILED
+            task.error = str(e)
+            return
+        task.future.add_done_callback(lambda future: self._task_finished(job, task, future))
+
+    def _task_finished(self, job, task, future):
+        """Record the outcome of a task"""
+        with self._lock:
+            if future is not task.future:
+                # Superseded by a retry
+                return
+            if future.cancelled():
+                task.state = CANCELLED
+            elif job.cancelled:
+                # The cancel won, so the (possibly partial) document is not kept
+                task.state = CANCELLED
+                self._discard_output(task)
+            elif future.exception() is not None:
+                task.state = FAILED
+                task.error = str(future.exception())
+            else:
+                task.state = DONE
+                task.path = future.result()
+        self._notify(job)
+
+    def _discard_output(self, task):
+        """Delete the file a cancelled task wrote"""
+        try:
+            if os.path.exists(task.output_path):
+                os.remove(task.output_path)
+        except OSError as e:
+            print(f"Error deleting cancelled document {task.output_path}: {e}")
+
+    def _notify(self, job):
+        """Tell listeners a job changed"""
+        for callback in list(self._listeners):
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error in render queue listener: {e}")
+
+# Shared queue used by the results screen and the jobs panel
+render_queue = RenderQueue()
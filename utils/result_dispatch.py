@@ -0,0 +1,467 @@
+from utils.student_history import normalize_section
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser("~"), "Documents", "SmartResultSystem", "delivery_log.jsonl")
+
+# Delivery outcomes
+SENT = 'sent'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+class TransportError(Exception):
+    """
+    Raised by a transport when a message could not be delivered
+
+    Args:
+        message (str): What went wrong
+        retryable (bool): Whether sending again later may succeed
+    """
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class Message:
+    """
+    One message to one recipient
+    """
+
+    def __init__(self, result_id, roll_no, name, phone, text, channel):
+        self.result_id = result_id
+        self.roll_no = roll_no
+        self.name = name
+        self.phone = phone
+        self.text = text
+        self.channel = channel
+
+    @property
+    def key(self):
+        """Identifies the message in the delivery log"""
+        return f"{self.result_id}|{self.roll_no}|{self.channel}"
+
+class Transport:
+    """
+    Base class of the message transports (WhatsApp, SMS, email gateways).
+
+    Subclasses implement send() and raise TransportError on failure.
+    """
+
+    # Channel name recorded in the delivery log
+    channel = 'base'
+
+    # False for transports that only pretend to deliver (see StubTransport)
+    delivers = True
+
+    def send(self, message):
+        """
+        Deliver a message
+
+        Args:
+            message (Message): Message to deliver
+
+        Returns:
+            str: Provider message ID
+
+        Raises:
+            TransportError: If the message was not delivered
+        """
+        raise NotImplementedError
+
+class StubTransport(Transport):
+    """
+    Local transport that only records messages, for testing and demos
+    """
+
+    channel = 'stub'
+    delivers = False
+
+    def __init__(self, failure_rate=0.0, latency=0.0):
+        """
+        Initialize the transport
+
+        Args:
+            failure_rate (float): Fraction of sends that fail (retryable)
+            latency (float): Seconds each send takes
+        """
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise TransportError("Simulated delivery failure")
+        with self._lock:
+            self.sent.append(message)
+            return f"stub-{len(self.sent)}"
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared by the dispatch workers
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum burst, defaults to rate
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancelled=None):
+        """
+        Take a token, waiting until one is available
+
+        Args:
+            cancelled (threading.Event): Stop waiting when set
+
+        Returns:
+            bool: True if a token was taken, False if cancelled
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if cancelled is not None:
+                if cancelled.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+class DeliveryLog:
+    """
+    Append-only JSON lines log of delivery attempts.
+
+    Messages already logged as sent are skipped when a result is sent
+    again, so an interrupted run can simply be restarted.
+    """
+
+    def __init__(self, path=DEFAULT_LOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sent = None
+
+    def delivered(self):
+        """
+        Get the keys of every message logged as sent
+
+        Returns:
+            set: Message keys
+        """
+        with self._lock:
+            if self._sent is None:
+                self._sent = set()
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        for line in f:
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue
+                            if entry.get('outcome') == SENT:
+                                self._sent.add(entry.get('key'))
+                except FileNotFoundError:
+                    pass
+            return set(self._sent)
+
+    def record(self, message, outcome, attempts=0, provider_id=None, error=None):
+        """Append one delivery outcome"""
+        entry = {
+            'time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'key': message.key,
+            'result_id': message.result_id,
+            'roll_no': message.roll_no,
+            'phone': message.phone,
+            'channel': message.channel,
+            'outcome': outcome,
+            'attempts': attempts,
+            'provider_id': provider_id,
+            'error': error,
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            if outcome == SENT and self._sent is not None:
+                self._sent.add(message.key)
+
+def format_mark(value):
+    """Format a mark without a trailing .0"""
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return str(value)
+    return str(int(value)) if value.is_integer() else f"{value:g}"
+
+def render_message(result, roll_no, entry):
+    """
+    Build the text sent to a student's parents
+
+    Args:
+        result (dict): Result sheet data
+        roll_no (str): Roll number of the student
+        entry (dict): The student's entry in the marks map
+
+    Returns:
+        str: Message text
+    """
+    max_marks = result.get('maxMarks') or {}
+    marks = entry.get('result') or {}
+    lines = [
+        f"{result.get('test_name', 'Result')} - Class {result.get('class', '')} {result.get('section', '')}",
+        f"{entry.get('name', '')} (Roll No {roll_no})",
+        "",
+    ]
+
+    obtained = total = 0
+    for subject in (result.get('status') or {}):
+        mark = marks.get(subject)
+        maximum = max_marks.get(subject)
+        lines.append(f"{subject.replace('-', ' ').title()}: {format_mark(mark) if mark is not None else '-'}/{format_mark(maximum)}")
+        try:
+            obtained += float(mark or 0)
+            total += float(maximum or 0)
+        except (ValueError, TypeError):
+            pass
+
+    percentage = obtained / total * 100 if total else 0
+    lines += ["", f"Total: {format_mark(obtained)}/{format_mark(total)} ({percentage:.2f}%)"]
+
+    # Added by GradingService.with_grades
+    grade = (result.get('grades') or {}).get(str(roll_no))
+    if grade:
+        lines.append(f"Grade: {grade['grade']} (GPA {grade['gpa']:.2f})")
+
+    # Added by RankingEngine.with_positions
+    position = (result.get('positions') or {}).get(str(roll_no))
+    if position:
+        lines.append(
+            f"Position: {position['section']} in section, {position['class']} in class, {position['campus']} overall"
+        )
+    return "\n".join(lines)
+
+def build_messages(result, students, channel):
+    """
+    Build one message per student of a result
+
+    Students are matched to marks entries by class, section (compared
+    like in the student histories, ignoring case) and roll number.
+    Students without a roll number are matched by name instead, if no
+    other student of the section has the same name.
+
+    Args:
+        result (dict): Result sheet data
+        students (list): Student dicts or records
+        channel (str): Transport channel
+
+    Returns:
+        tuple: (messages, skipped) where skipped lists (roll_no, name, reason)
+    """
+    class_number = str(result.get('class', ''))
+    section = normalize_section(result.get('section'))
+
+    phones = {}
+    by_name = {}
+    for student in students or []:
+        if str(student.get('class', '')) != class_number or normalize_section(student.get('section')) != section:
+            continue
+        roll_no = str(student.get('roll_no') or '').strip()
+        if roll_no:
+            phones[roll_no] = student.get('phone') or ''
+        elif str(student.get('name') or '').strip():
+            name_key = str(student.get('name')).strip().lower()
+            # None marks names shared by several students, which cannot be told apart
+            by_name[name_key] = None if name_key in by_name else (student.get('phone') or '')
+
+    messages = []
+    skipped = []
+    for roll_no, entry in (result.get('marks') or {}).items():
+        roll_no = str(roll_no)
+        name = (entry or {}).get('name', '')
+        phone = phones.get(roll_no)
+        if phone is None:
+            phone = by_name.get(str(name).strip().lower())
+        if phone is None:
+            skipped.append((roll_no, name, "No student record for this roll number or name"))
+        elif not phone:
+            skipped.append((roll_no, name, "No phone number"))
+        else:
+            text = render_message(result, roll_no, entry or {})
+            messages.append(Message(result.get('id'), roll_no, name, phone, text, channel))
+    return messages, skipped
+
+class DispatchJob:
+    """
+    Progress of sending one result
+    """
+
+    def __init__(self, result_id, total, simulated=False):
+        self.result_id = result_id
+        self.total = total
+        # Sent through a transport that does not really deliver
+        self.simulated = simulated
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.errors = []
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_outcome(self, outcome, error=None):
+        """Count the outcome of one message (called from the workers)"""
+        with self._lock:
+            if outcome == SENT:
+                self.sent += 1
+            elif outcome == SKIPPED:
+                self.skipped += 1
+            else:
+                self.failed += 1
+                if error:
+                    self.errors.append(error)
+
+    @property
+    def processed(self):
+        """Messages finished so far, whatever their outcome"""
+        return self.sent + self.failed + self.skipped
+
+    def cancel(self):
+        """Stop sending messages that have not gone out yet"""
+        self.cancelled.set()
+
+class ResultDispatcher:
+    """
+    Sends per-student result messages through a pluggable transport.
+
+    Messages are sent from a thread pool, throttled by a shared token
+    bucket, and retried with exponential backoff when the transport
+    reports a retryable error. Every outcome is appended to the delivery
+    log, and messages already delivered are not sent twice.
+    """
+
+    def __init__(self, transport=None, rate_per_second=5, workers=8, max_attempts=4, log=None):
+        """
+        Initialize the dispatcher
+
+        Args:
+            transport (Transport): Transport to send through, a StubTransport by default
+            rate_per_second (float): Maximum messages sent per second
+            workers (int): Concurrent senders
+            max_attempts (int): Attempts per message before giving up
+            log (DeliveryLog): Delivery log, the default log file if not given
+        """
+        self.transport = transport or StubTransport()
+        self.bucket = TokenBucket(rate_per_second)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.log = log or DeliveryLog()
+
+    def set_transport(self, transport):
+        """
+        Replace the transport used for new messages
+
+        Args:
+            transport (Transport): Transport to send through
+        """
+        self.transport = transport
+
+    def dispatch(self, result, students, on_progress=None, resend=False):
+        """
+        Send a result to the parents of its students in the background
+
+        Args:
+            result (dict): Result sheet data
+            students (list): Student dicts or records (for phone numbers)
+            on_progress (Callable): Called with the job after every message
+            resend (bool): Also send to students already delivered to
+
+        Returns:
+            DispatchJob: Job tracking the sending
+        """
+        transport = self.transport
+        messages, skipped = build_messages(result, students, transport.channel)
+        if not resend:
+            delivered = self.log.delivered()
+            already = [message for message in messages if message.key in delivered]
+            messages = [message for message in messages if message.key not in delivered]
+            skipped += [(message.roll_no, message.name, "Already sent") for message in already]
+
+        job = DispatchJob(result.get('id'), len(messages) + len(skipped), simulated=not transport.delivers)
+        job.skipped = len(skipped)
+        job.errors = [f"Roll No {roll_no} ({name}): {reason}" for roll_no, name, reason in skipped]
+
+        def run():
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    for message in messages:
+                        executor.submit(self._deliver, transport, message, job, on_progress)
+            finally:
+                job.done.set()
+                if on_progress:
+                    on_progress(job)
+
+        threading.Thread(target=run, daemon=True).start()
+        return job
+
+    def _deliver(self, transport, message, job, on_progress):
+        """Send one message with rate limiting and retries"""
+        outcome, error, provider_id, attempts = FAILED, None, None, 0
+        try:
+            while attempts < self.max_attempts:
+                if job.cancelled.is_set() or not self.bucket.acquire(job.cancelled):
+                    outcome, error = SKIPPED, "Cancelled"
+                    break
+                attempts += 1
+                try:
+                    provider_id = transport.send(message)
+                    outcome, error = SENT, None
+                    break
+                except TransportError as e:
+                    error = str(e)
+                    if not e.retryable:
+                        break
+                except Exception as e:
+                    error = str(e)
+
+                # Back off before the next attempt, if there is one
+                if attempts >= self.max_attempts:
+                    break
+                delay = min(30, (2 ** attempts) * 0.5) + random.uniform(0, 0.5)
+                if job.cancelled.wait(delay):
+                    outcome = SKIPPED
+                    break
+
+            self.log.record(message, outcome, attempts, provider_id, error)
+        except Exception as e:
+            print(f"Error delivering result to {message.phone}: {e}")
+            outcome, error = FAILED, str(e)
+
+        job.add_outcome(outcome, f"Roll No {message.roll_no} ({message.name}): {error}")
+        if on_progress:
+            on_progress(job)
+
+# Shared dispatcher; replace the stub with a WhatsApp/SMS transport via set_transport.
+# Until then jobs are marked simulated and the results screen says nothing was delivered.
+result_dispatcher = ResultDispatcher()
@@ -1,4 +1,7 @@
 from db.data_access import results_data
+from db.database_utils import DatabaseUtils
+from db.document_decoder import get_decoder
+import utils.student_history as student_history
 import datetime
 
 def create_result_entry(class_number, section, class_incharge, test_name, max_marks, subjects_data):
@@ -49,6 +52,164 @@ def add_result_to_database(result_data):
     """
     return results_data.add(result_data)
 
+def parse_mark(mark, max_mark=None):
+    """
+    Validate an obtained mark against the subject's max marks
+    
+    Args:
+        mark: Mark as entered (number or numeric string)
+        max_mark: Max marks of the subject, if known
+        
+    Returns:
+        int or float: The mark as a number
+        
+    Raises:
+        ValueError: If the mark is not a number or is out of range
+    """
+    try:
+        value = float(mark)
+    except (ValueError, TypeError):
+        raise ValueError(f"'{mark}' is not a valid mark")
+    
+    if value < 0:
+        raise ValueError(f"Mark {mark} cannot be negative")
+    if max_mark not in (None, '') and value > float(max_mark):
+        raise ValueError(f"Mark {mark} is more than the max marks ({max_mark})")
+    
+    return int(value) if value.is_integer() else value
+
+def build_marks_updates(current, marks_by_subject, uploaded_by, names=None, status='Ready'):
+    """
+    Build the field-path updates that record the marks of one or more subjects
+    
+    Args:
+        current (dict): Current result sheet data
+        marks_by_subject (dict): Subject -> {roll number: obtained marks}
+        uploaded_by (str): Name of the teacher uploading the marks
+        names (dict): Optional roll number -> student name
+        status (str): Status to record for the subjects
+        
+    Returns:
+        dict: Field path -> value
+        
+    Raises:
+        ValueError: If a subject or any mark is invalid for the sheet
+    """
+    statuses = current.get('status') or {}
+    
+    max_marks = current.get('maxMarks') or {}
+    existing = current.get('marks') or {}
+    names = names or {}
+    
+    updates = {}
+    errors = []
+    new_statuses = dict(statuses)
+    rolls = set(existing)
+    for subject, marks in marks_by_subject.items():
+        if subject not in statuses:
+            errors.append(f"Subject '{subject}' is not part of this result")
+            continue
+        
+        for roll_no, mark in marks.items():
+            roll_no = str(roll_no)
+            try:
+                value = parse_mark(mark, max_marks.get(subject))
+            except ValueError as e:
+                errors.append(f"Roll no {roll_no} ({subject}): {e}")
+                continue
+            
+            updates[DatabaseUtils.field_path('marks', roll_no, 'result', subject)] = value
+            rolls.add(roll_no)
+        
+        updates[DatabaseUtils.field_path('status', subject)] = status
+        updates[DatabaseUtils.field_path('uploaded_by', subject)] = uploaded_by
+        new_statuses[subject] = status
+    
+    if errors:
+        raise ValueError("; ".join(errors))
+    
+    for roll_no, name in names.items():
+        roll_no = str(roll_no)
+        if roll_no in rolls and name and (existing.get(roll_no) or {}).get('name') != name:
+            updates[DatabaseUtils.field_path('marks', roll_no, 'name')] = name
+    
+    # Keep the sheet level summary fields in step with the subject statuses
+    updates['completed'] = all(str(value).lower() != 'pending' for value in new_statuses.values())
+    updates['strength'] = len(rolls)
+    updates['last_updated'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    return updates
+
+def upload_marks(result_id, marks_by_subject, uploaded_by, names=None, status='Ready'):
+    """
+    Upload the marks of one or more subjects into a result sheet
+    
+    Only marks.<roll>.result.<subject>, status.<subject>, uploaded_by.<subject>
+    and the sheet summary fields are written, inside a transaction that is
+    retried on contention. Teachers can therefore upload different subjects
+    of the same section at the same time without losing each other's marks,
+    and every subject given here lands in a single round trip. The history
+    entries of the students whose marks changed are rebuilt from the updated
+    sheet in the same transaction (see utils.student_history).
+    
+    Args:
+        result_id (str): ID of the result sheet
+        marks_by_subject (dict): Subject -> {roll number: obtained marks}
+        uploaded_by (str): Name of the teacher uploading the marks
+        names (dict): Optional roll number -> student name for new rows
+        status (str): Status to record for the subjects
+        
+    Returns:
+        bool: True if the marks were saved, False otherwise
+    """
+    roll_nos = {str(roll_no) for marks in marks_by_subject.values() for roll_no in marks}
+    decoder = get_decoder(results_data.collection_name)
+    
+    # Keep the per-student history index in step with the sheet
+    def history_writes(updated):
+        return student_history.history_writes(decoder.decode_data(dict(updated, id=result_id)), roll_nos)
+    
+    return DatabaseUtils.update_fields(
+        results_data.collection_name,
+        result_id,
+        lambda current: build_marks_updates(current, marks_by_subject, uploaded_by, names, status),
+        related_writes=history_writes
+    )
+
+def delete_result(result_id):
+    """
+    Delete a result sheet and its entries in the student histories
+    
+    Args:
+        result_id (str): ID of the result sheet
+        
+    Returns:
+        bool: True if the sheet was deleted, False otherwise
+    """
+    result = results_data.get_by_id(result_id)
+    if not results_data.delete(result_id):
+        return False
+    if result:
+        student_history.remove_history(result)
+    return True
+
+def upload_subject_marks(result_id, subject, marks, uploaded_by, names=None, status='Ready'):
+    """
+    Upload one subject's marks into a result sheet (see upload_marks)
+    
+    Args:
+        result_id (str): ID of the result sheet
+        subject (str): Subject the marks belong to
+        marks (dict): Roll number -> obtained marks
+        uploaded_by (str): Name of the teacher uploading the marks
+        names (dict): Optional roll number -> student name for new rows
+        status (str): Status to record for the subject
+        
+    Returns:
+        bool: True if the marks were saved, False otherwise
+    """
+    return upload_marks(result_id, {subject: marks}, uploaded_by, names, status)
+
 def create_result_data(class_number, section, class_incharge):
     """
     Create and add a new result entry to the database
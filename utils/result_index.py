@@ -0,0 +1,274 @@
+from db.result_summary import get_summary
+import bisect
+import threading
+
+# Indexed fields: name used by filter() -> function reading it from a result
+INDEXED_FIELDS = {
+    'class_number': lambda result: str(result.get('class', '')),
+    'section': lambda result: result.get('section', '') or '',
+    'test_name': lambda result: result.get('test_name', '') or '',
+    'class_incharge': lambda result: result.get('class_incharge', '') or '',
+    'state': lambda result: get_summary(result)['state'],
+}
+
+# Fields matched by free-text search
+SEARCH_FIELDS = ('id', 'class', 'class_incharge', 'section', 'test_name')
+
+class LiveResultSet:
+    """
+    In-memory, sorted and indexed set of result sheets.
+
+    Results are kept ordered by created_at (latest first) and indexed by
+    class, section, test, incharge and Pending/Ready state. The set is
+    loaded once and then maintained from the result_data watch stream, so
+    filtering and searching never go back to the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._unsubscribe = None
+        self._reset()
+
+    def _reset(self):
+        """Clear the results and indexes (lock must be held)"""
+        self._by_id = {}
+        self._order = []     # (created_at, id) ascending
+        self._keys = {}      # id -> its (created_at, id) entry in _order
+        self._search = {}    # id -> lowercase text matched by search
+        self._index = {field: {} for field in INDEXED_FIELDS}
+        self._values = {}    # id -> {field: indexed value}
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, results):
+        """
+        Replace the set with a list of results
+
+        Args:
+            results (list): Decoded result sheets including their 'id'
+        """
+        with self._lock:
+            self._reset()
+            for result in results or []:
+                self._add(result)
+            self.version += 1
+        self._notify()
+
+    def upsert(self, result):
+        """
+        Add or replace a single result
+
+        Args:
+            result (dict): Decoded result sheet including its 'id'
+        """
+        with self._lock:
+            self._remove(result.get('id'))
+            self._add(result)
+            self.version += 1
+        self._notify()
+
+    def remove(self, result_id):
+        """
+        Remove a result
+
+        Args:
+            result_id (str): Result sheet ID
+        """
+        with self._lock:
+            self._remove(result_id)
+            self.version += 1
+        self._notify()
+
+    def attach(self, data_access):
+        """
+        Keep the set in sync with a result_data watch stream
+
+        Args:
+            data_access (DataAccess): Data access object of result_data
+
+        Returns:
+            Callable[[], None]: Function to call to stop syncing
+        """
+        self.detach()
+        self._unsubscribe = data_access.watch(self._handle_changes, include_changes=True)
+        return self.detach
+
+    def detach(self):
+        """Stop following the watch stream"""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    @property
+    def attached(self):
+        """Whether the set is following a watch stream"""
+        return self._unsubscribe is not None
+
+    def add_listener(self, callback):
+        """
+        Register a callback called (with the set) after every change
+
+        Args:
+            callback (Callable): Function to call
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a change callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def all(self):
+        """
+        Get every result, latest first
+
+        Returns:
+            list: Result sheets
+        """
+        with self._lock:
+            return [self._by_id[result_id] for _, result_id in reversed(self._order)]
+
+    def get(self, result_id):
+        """
+        Get a result by ID
+
+        Args:
+            result_id (str): Result sheet ID
+
+        Returns:
+            dict: Result sheet or None if not in the set
+        """
+        return self._by_id.get(result_id)
+
+    def values(self, field):
+        """
+        Get the distinct values of an indexed field, e.g. for filter dropdowns
+
+        Args:
+            field (str): One of INDEXED_FIELDS
+
+        Returns:
+            list: Sorted values that at least one result has
+        """
+        with self._lock:
+            return sorted(value for value, ids in self._index[field].items() if ids)
+
+    def count(self, field, value):
+        """
+        Count the results with a value of an indexed field
+
+        Args:
+            field (str): One of INDEXED_FIELDS
+            value: Value to count
+
+        Returns:
+            int: Number of results
+        """
+        return len(self._index[field].get(value, ()))
+
+    def filter(self, text='', **criteria):
+        """
+        Get the results matching every given criterion, latest first
+
+        Args:
+            text (str): Case-insensitive text searched in the ID, class,
+                incharge, section and test name
+            **criteria: Indexed field -> required value; None skips the field
+
+        Returns:
+            list: Matching result sheets
+        """
+        text = (text or '').strip().lower()
+        with self._lock:
+            candidates = None
+            # Intersect the smallest index sets first
+            sets = sorted(
+                (self._index[field].get(str(value) if field == 'class_number' else value, set())
+                 for field, value in criteria.items() if value is not None),
+                key=len
+            )
+            for ids in sets:
+                candidates = set(ids) if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+
+            if candidates is None:
+                ordered = [result_id for _, result_id in reversed(self._order)]
+            else:
+                ordered = sorted(candidates, key=self._keys.get, reverse=True)
+
+            return [
+                self._by_id[result_id] for result_id in ordered
+                if not text or text in self._search[result_id]
+            ]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _handle_changes(self, docs, changes):
+        """Apply the changes delivered by the watch stream"""
+        try:
+            with self._lock:
+                for change in changes:
+                    self._remove(change['id'])
+                    if change['type'] != 'REMOVED' and change['data'] is not None:
+                        self._add(change['data'])
+                self.version += 1
+            self._notify()
+        except Exception as e:
+            print(f"Error applying result changes to result set: {e}")
+
+    def _notify(self):
+        """Tell listeners the set changed"""
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in result set listener: {e}")
+
+    def _add(self, result):
+        """Add a result to the order and indexes (lock must be held)"""
+        result_id = result.get('id')
+        if result_id is None:
+            return
+
+        key = (str(result.get('created_at') or ''), result_id)
+        bisect.insort(self._order, key)
+        self._keys[result_id] = key
+        self._by_id[result_id] = result
+        self._search[result_id] = ' '.join(
+            str(result.get(field) or '') for field in SEARCH_FIELDS
+        ).lower()
+
+        values = {}
+        for field, read in INDEXED_FIELDS.items():
+            value = read(result)
+            self._index[field].setdefault(value, set()).add(result_id)
+            values[field] = value
+        self._values[result_id] = values
+
+    def _remove(self, result_id):
+        """Remove a result from the order and indexes (lock must be held)"""
+        key = self._keys.pop(result_id, None)
+        if key is None:
+            return
+
+        position = bisect.bisect_left(self._order, key)
+        if position < len(self._order) and self._order[position] == key:
+            del self._order[position]
+        del self._by_id[result_id]
+        del self._search[result_id]
+        for field, value in self._values.pop(result_id).items():
+            self._index[field][value].discard(result_id)
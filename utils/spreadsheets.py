@@ -0,0 +1,93 @@
+import csv
+import os
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx')
+
+def cell_text(value):
+    """
+    Convert a CSV or spreadsheet cell to text
+
+    Whole numbers read from spreadsheets as floats (12.0) become '12'.
+
+    Args:
+        value: Cell value
+
+    Returns:
+        str: Stripped text, empty for blank cells
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def normalize_header(heading):
+    """
+    Normalize a column heading for matching
+
+    Args:
+        heading: Heading as read from the file
+
+    Returns:
+        str: Lowercase heading with '_', '.' and repeated spaces collapsed
+    """
+    text = cell_text(heading).lower().replace('_', ' ').replace('.', ' ')
+    return ' '.join(text.split())
+
+def count_rows(path):
+    """
+    Estimate the number of data rows in a sheet without parsing it
+
+    Args:
+        path (str): Path of a .csv or .xlsx file
+
+    Returns:
+        int: Number of rows after the heading row
+    """
+    if path.lower().endswith('.xlsx'):
+        if openpyxl is None:
+            return 0
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            lines += block.count(b'\n')
+    return max(lines - 1, 0)
+
+def read_rows(path):
+    """
+    Stream the raw rows of a CSV file or of the first sheet of an XLSX file
+
+    Args:
+        path (str): Path of a .csv or .xlsx file
+
+    Yields:
+        tuple: Cell values of one row, the heading row first
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+    elif extension == '.xlsx':
+        if openpyxl is None:
+            raise ValueError("Reading .xlsx files needs the openpyxl package")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported file type '{extension}', use .csv or .xlsx")
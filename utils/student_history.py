@@ -0,0 +1,233 @@
+from db.data_access import results_data, student_results_data
+from db.database_utils import DatabaseUtils
+from firebase_admin import firestore
+import datetime
+
+def normalize_section(section):
+    """Section as compared between students and result sheets ('A' and ' a' match)"""
+    return str(section or '').strip().lower()
+
+def history_id(class_number, section, roll_no):
+    """
+    ID of a student's history document
+
+    Marks are keyed by roll number inside a result sheet, so a student is
+    identified by class, section and roll number. The section is lower
+    cased, so sheets entered as 'A' and 'a' share one history.
+
+    Args:
+        class_number: Class of the student
+        section (str): Section of the student
+        roll_no: Roll number of the student
+
+    Returns:
+        str: Document ID such as 10_mb-blue_12
+    """
+    parts = (str(class_number or ''), normalize_section(section), str(roll_no or ''))
+    return '_'.join(part.strip().replace('/', '-') for part in parts)
+
+def history_entry(result, roll_no):
+    """
+    Build one student's entry of a result for their history
+
+    Args:
+        result (dict): Result sheet data including its 'id'
+        roll_no (str): Roll number of the student
+
+    Returns:
+        dict: Test, marks, totals and percentage or None if the student has no marks
+    """
+    entry = (result.get('marks') or {}).get(str(roll_no))
+    if not entry:
+        return None
+
+    marks = dict(entry.get('result') or {})
+    max_marks = result.get('maxMarks') or {}
+
+    total = max_total = 0
+    for subject, mark in marks.items():
+        try:
+            total += float(mark)
+            max_total += float(max_marks.get(subject) or 0)
+        except (ValueError, TypeError):
+            pass
+
+    return {
+        'result_id': result.get('id'),
+        'test_name': result.get('test_name', ''),
+        'created_at': str(result.get('created_at') or ''),
+        'marks': marks,
+        'max_marks': {subject: max_marks.get(subject) for subject in marks},
+        'total': int(total) if float(total).is_integer() else total,
+        'max_total': int(max_total) if float(max_total).is_integer() else max_total,
+        'percentage': round(total / max_total * 100, 2) if max_total else 0,
+    }
+
+def history_fields(result_id):
+    """
+    Field paths a result writes in the history of its students
+
+    The entry of the result replaces results.<result id> as a whole, so
+    subjects removed from the sheet disappear from the history too.
+
+    Args:
+        result_id (str): ID of the result sheet
+
+    Returns:
+        list: Field paths
+    """
+    return ['class', 'section', 'roll_no', 'name', DatabaseUtils.field_path('results', result_id)]
+
+def history_documents(result, roll_nos=None):
+    """
+    Build the history documents of a result's students
+
+    Args:
+        result (dict): Result sheet data including its 'id'
+        roll_nos (Iterable): Students to include, every student of the sheet if not given
+
+    Returns:
+        dict: History document ID -> data holding the fields of history_fields
+    """
+    result_id = result.get('id')
+    marks = result.get('marks') or {}
+    if roll_nos is None:
+        roll_nos = marks.keys()
+
+    documents = {}
+    for roll_no in roll_nos:
+        roll_no = str(roll_no)
+        entry = history_entry(result, roll_no)
+        if entry is None:
+            continue
+        documents[history_id(result.get('class'), result.get('section'), roll_no)] = {
+            'class': str(result.get('class', '')),
+            'section': result.get('section', ''),
+            'roll_no': roll_no,
+            'name': marks[roll_no].get('name', ''),
+            'results': {result_id: entry},
+        }
+    return documents
+
+def history_writes(result, roll_nos=None):
+    """
+    Build the history writes of a result for DatabaseUtils.update_fields
+
+    Args:
+        result (dict): Result sheet data (as updated) including its 'id'
+        roll_nos (Iterable): Students to update, every student of the sheet if not given
+
+    Returns:
+        list: (collection, document ID, data, field paths) writes
+    """
+    now = datetime.datetime.now()
+    fields = history_fields(result.get('id')) + ['updated_at']
+    return [
+        (student_results_data.collection_name, document_id, dict(data, updated_at=now), fields)
+        for document_id, data in history_documents(result, roll_nos).items()
+    ]
+
+def update_history(result, roll_nos=None, on_progress=None):
+    """
+    Write a result's marks into the history of its students
+
+    Each student's history document keeps one entry per result under
+    results.<result id>; only that entry is replaced, so entries of other
+    results are kept.
+
+    Args:
+        result (dict): Result sheet data including its 'id'
+        roll_nos (Iterable): Students to update, every student of the sheet if not given
+        on_progress (Callable): Called with (written, total) after each batch
+
+    Returns:
+        int: Number of history documents written
+    """
+    result_id = result.get('id')
+    if not result_id:
+        return 0
+
+    documents = history_documents(result, roll_nos)
+    if not documents:
+        return 0
+    return student_results_data.set_many(documents, on_progress=on_progress, merge=history_fields(result_id))
+
+def remove_history(result, on_progress=None):
+    """
+    Remove a deleted result's entries from the history of its students
+
+    Args:
+        result (dict): Result sheet data including its 'id'
+        on_progress (Callable): Called with (written, total) after each batch
+
+    Returns:
+        int: Number of history documents written
+    """
+    result_id = result.get('id')
+    if not result_id:
+        return 0
+
+    documents = {
+        history_id(result.get('class'), result.get('section'), roll_no): {
+            'results': {result_id: firestore.DELETE_FIELD},
+        }
+        for roll_no in (result.get('marks') or {})
+    }
+    if not documents:
+        return 0
+    return student_results_data.set_many(documents, on_progress=on_progress, merge=True)
+
+def rebuild_history(results=None, on_progress=None):
+    """
+    Write every result sheet into the student histories, e.g. to backfill
+    the index for results saved before it existed
+
+    Args:
+        results (list): Result sheets, every sheet in the database if not given
+        on_progress (Callable): Called with (done, total) after each result
+
+    Returns:
+        int: Number of history documents written
+    """
+    if results is None:
+        results = results_data.get_all()
+
+    written = 0
+    for done, result in enumerate(results, 1):
+        written += update_history(result)
+        if on_progress:
+            on_progress(done, len(results))
+    return written
+
+def get_history(class_number, section, roll_no):
+    """
+    Get a student's results across tests in one read
+
+    Args:
+        class_number: Class of the student
+        section (str): Section of the student
+        roll_no: Roll number of the student
+
+    Returns:
+        list: History entries (see history_entry), oldest first
+    """
+    document = student_results_data.get_by_id(history_id(class_number, section, roll_no))
+    if not document:
+        return []
+    entries = list((document.get('results') or {}).values())
+    return sorted(entries, key=lambda entry: entry.get('created_at') or '')
+
+def get_student_history(student):
+    """
+    Get the results history of a student record
+
+    Args:
+        student: Student dict or record
+
+    Returns:
+        list: History entries, oldest first (empty without a roll number)
+    """
+    roll_no = student.get('roll_no')
+    if not roll_no:
+        return []
+    return get_history(student.get('class'), student.get('section'), roll_no)
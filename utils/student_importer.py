@@ -0,0 +1,223 @@
+from db.student_repository import StudentRepository
+from utils.spreadsheets import cell_text, normalize_header, count_rows, read_rows
+import csv
+import os
+
+# Rows validated and written per batch (Firestore allows 500 writes per batch)
+CHUNK_SIZE = 500
+
+# Roster column headings (normalized) -> student field
+COLUMN_ALIASES = {
+    'id': 'id',
+    'student id': 'id',
+    'studentid': 'id',
+    'name': 'name',
+    'student name': 'name',
+    'class': 'class',
+    'section': 'section',
+    'roll no': 'roll_no',
+    'rollno': 'roll_no',
+    'roll number': 'roll_no',
+    'phone': 'phone',
+    'phone no': 'phone',
+    'contact': 'phone',
+    'status': 'status',
+}
+
+VALID_STATUSES = ('Active', 'Inactive')
+
+def read_roster(path):
+    """
+    Stream the rows of a CSV or XLSX roster
+
+    Args:
+        path (str): Path of a .csv or .xlsx file
+
+    Yields:
+        tuple: (line number, dict of student field -> text)
+
+    Raises:
+        ValueError: If the file type is not supported or has no name/ID column
+    """
+    rows = read_rows(path)
+    headings = next(rows, None)
+    if headings is None:
+        return
+
+    fields = [COLUMN_ALIASES.get(normalize_header(heading)) for heading in headings]
+    if 'id' not in fields or 'name' not in fields:
+        raise ValueError("The roster must have 'ID' and 'Name' columns")
+
+    for line, values in enumerate(rows, start=2):
+        row = {}
+        for field, value in zip(fields, values):
+            if field:
+                row[field] = cell_text(value)
+        # Skip completely blank lines
+        if any(row.values()):
+            yield line, row
+
+def validate_student(row):
+    """
+    Validate a roster row and build the student data
+
+    Args:
+        row (dict): Student field -> text
+
+    Returns:
+        dict: Student data ready to be written
+
+    Raises:
+        ValueError: If the row is invalid
+    """
+    student_id = row.get('id', '')
+    name = row.get('name', '')
+    if not student_id:
+        raise ValueError("Missing student ID")
+    if '/' in student_id:
+        raise ValueError("Student ID cannot contain '/'")
+    if not name:
+        raise ValueError("Missing name")
+
+    phone = row.get('phone', '')
+    if phone and not phone.replace('+', '').replace('-', '').replace(' ', '').isdigit():
+        raise ValueError(f"Invalid phone number '{phone}'")
+
+    status = (row.get('status') or 'Active').capitalize()
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Invalid status '{row.get('status')}'")
+
+    student = {
+        'id': student_id,
+        'name': name,
+        'class': row.get('class', ''),
+        'phone': phone,
+        'status': status,
+    }
+    if row.get('section'):
+        student['section'] = row['section']
+    if row.get('roll_no'):
+        student['roll_no'] = row['roll_no']
+    return student
+
+class ImportReport:
+    """
+    Outcome of a roster import
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.processed = 0
+        self.imported = 0
+        self.rejected = []  # dicts with line, id, name and reason
+
+    def reject(self, line, row, reason):
+        """Record a rejected row"""
+        self.rejected.append({
+            'line': line,
+            'id': row.get('id', ''),
+            'name': row.get('name', ''),
+            'reason': reason,
+        })
+
+    def write_rejections(self, report_path=None):
+        """
+        Write the rejected rows to a CSV file
+
+        Args:
+            report_path (str): Where to write, defaults to <roster>_rejected.csv
+
+        Returns:
+            str: Path of the report, or None if nothing was rejected
+        """
+        if not self.rejected:
+            return None
+        if report_path is None:
+            report_path = os.path.splitext(self.path)[0] + '_rejected.csv'
+
+        with open(report_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=['line', 'id', 'name', 'reason'])
+            writer.writeheader()
+            writer.writerows(self.rejected)
+        return report_path
+
+class StudentImporter:
+    """
+    Streaming importer for CSV/XLSX student rosters.
+
+    Rows are read one at a time, validated, checked against an in-memory
+    index of existing student IDs and written in batches of CHUNK_SIZE,
+    so memory use and the number of round trips stay small even for
+    rosters with thousands of students.
+    """
+
+    def __init__(self, repository=None, chunk_size=CHUNK_SIZE, on_progress=None):
+        """
+        Initialize the importer
+
+        Args:
+            repository (StudentRepository): Repository to write to
+            chunk_size (int): Rows written per batch
+            on_progress (function): Called with (processed, total, imported)
+        """
+        self.repository = repository or StudentRepository()
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+
+    def run(self, path, existing_ids=None):
+        """
+        Import a roster
+
+        Args:
+            path (str): Path of a .csv or .xlsx file
+            existing_ids (iterable): IDs already in use, read from the
+                database if not given
+
+        Returns:
+            ImportReport: Imported count and rejected rows
+        """
+        report = ImportReport(path)
+        total = count_rows(path)
+
+        if existing_ids is None:
+            existing_ids = self.repository.get_ids()
+        known_ids = set(str(student_id) for student_id in existing_ids)
+
+        chunk = []
+        for line, row in read_roster(path):
+            report.processed += 1
+            try:
+                student = validate_student(row)
+            except ValueError as e:
+                report.reject(line, row, str(e))
+                continue
+
+            if student['id'] in known_ids:
+                report.reject(line, row, "Student ID already exists")
+                continue
+            known_ids.add(student['id'])
+
+            chunk.append((line, row, student))
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk, report)
+                chunk = []
+                self._report_progress(report, total)
+
+        if chunk:
+            self._write_chunk(chunk, report)
+        self._report_progress(report, total)
+        return report
+
+    def _write_chunk(self, chunk, report):
+        """Write one batch of validated students"""
+        written = self.repository.add_many([student for _, _, student in chunk])
+        report.imported += written
+
+        # A failed commit leaves the rest of the chunk unwritten
+        for line, row, _ in chunk[written:]:
+            report.reject(line, row, "Failed to save to the database")
+
+    def _report_progress(self, report, total):
+        """Pass progress to the callback"""
+        if self.on_progress:
+            self.on_progress(report.processed, max(total, report.processed), report.imported)